@@ -8,7 +8,10 @@ from .endpoints import (
     content,
     documents,
     forms,
-    search
+    search,
+    analytics,
+    navigation,
+    files
 )
 
 # Router principal pentru API v1
@@ -21,5 +24,8 @@ api_router.include_router(content.router, prefix="/content", tags=["Content Mana
 api_router.include_router(documents.router, prefix="/documents", tags=["Documents"])
 api_router.include_router(forms.router, prefix="/forms", tags=["Forms"])
 api_router.include_router(search.router, prefix="", tags=["Search"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+api_router.include_router(navigation.router, prefix="/navigation", tags=["Navigation"])
+api_router.include_router(files.router, prefix="/files", tags=["Files"])
 
 __all__ = ["api_router"]
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+Endpoint-uri pentru statistici de vizitare (colectare și rapoarte de transparență)
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import BaseModel, Field
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.database import get_async_session
+from ...models.admin import AdminUser
+from ...models.documents import PageViewDailyStat
+from ...services.page_view_service import page_view_ingestor
+from ..endpoints.auth import get_current_active_admin
+
+router = APIRouter()
+
+
+class PageViewTrack(BaseModel):
+    """Hit trimis de frontend la fiecare afișare de pagină"""
+    page_url: str = Field(..., min_length=1, max_length=500)
+    page_title: Optional[str] = Field(None, max_length=255)
+    referrer: Optional[str] = Field(None, max_length=500)
+    session_id: Optional[str] = Field(None, max_length=255)
+
+
+@router.post("/page-views", status_code=status.HTTP_202_ACCEPTED)
+async def track_page_view(hit: PageViewTrack, request: Request) -> Dict[str, Any]:
+    """
+    Înregistrează o vizualizare de pagină. Hit-ul este doar pus în coadă;
+    scrierea în baza de date se face în lot, în fundal.
+    """
+    accepted = page_view_ingestor.track(
+        page_url=hit.page_url,
+        page_title=hit.page_title,
+        visitor_ip=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent"),
+        referrer=hit.referrer or request.headers.get("referer"),
+        session_id=hit.session_id
+    )
+    return {"accepted": accepted}
+
+
+@router.get("/page-views/daily")
+async def get_daily_page_views(
+    date_from: Optional[date] = Query(None, description="Data de început (implicit: acum 30 de zile)"),
+    date_to: Optional[date] = Query(None, description="Data de sfârșit (implicit: azi)"),
+    page_url: Optional[str] = Query(None, description="Filtru după URL-ul paginii"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_session)
+) -> Dict[str, Any]:
+    """Agregate zilnice de vizualizări per pagină"""
+    date_to = date_to or date.today()
+    date_from = date_from or (date_to - timedelta(days=30))
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Data de început trebuie să fie înaintea datei de sfârșit"
+        )
+
+    query = select(PageViewDailyStat).where(
+        PageViewDailyStat.view_date.between(date_from, date_to)
+    )
+    if page_url:
+        query = query.where(PageViewDailyStat.page_url == page_url)
+    query = query.order_by(
+        PageViewDailyStat.view_date.desc(), PageViewDailyStat.views.desc()
+    ).limit(limit)
+
+    result = await db.execute(query)
+    stats = result.scalars().all()
+
+    return {
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "items": [
+            {
+                "date": stat.view_date.isoformat(),
+                "page_url": stat.page_url,
+                "views": stat.views,
+            }
+            for stat in stats
+        ]
+    }
+
+
+@router.get("/page-views/top")
+async def get_top_pages(
+    date_from: Optional[date] = Query(None, description="Data de început (implicit: acum 30 de zile)"),
+    date_to: Optional[date] = Query(None, description="Data de sfârșit (implicit: azi)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_session)
+) -> Dict[str, Any]:
+    """Cele mai vizitate pagini într-un interval"""
+    date_to = date_to or date.today()
+    date_from = date_from or (date_to - timedelta(days=30))
+
+    total_views = func.sum(PageViewDailyStat.views).label("views")
+    result = await db.execute(
+        select(PageViewDailyStat.page_url, total_views)
+        .where(PageViewDailyStat.view_date.between(date_from, date_to))
+        .group_by(PageViewDailyStat.page_url)
+        .order_by(total_views.desc())
+        .limit(limit)
+    )
+
+    return {
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "items": [{"page_url": url, "views": int(views)} for url, views in result.all()]
+    }
+
+
+@router.get("/page-views/ingestion-stats")
+async def get_ingestion_stats(
+    current_user: AdminUser = Depends(get_current_active_admin)
+) -> Dict[str, Any]:
+    """Starea cozii de colectare (pentru monitorizare)"""
+    return {
+        **page_view_ingestor.stats(),
+        "sample_rate": page_view_ingestor.sample_rate,
+    }
@@ -14,7 +14,7 @@ from ...models.appointments import (
     Appointment, AppointmentCategory, AppointmentTimeSlot, 
     AppointmentStats, AppointmentNotification
 )
-from ...models.admin import AdminUser, AdminAuditLog
+from ...models.admin import AdminUser
 from ...schemas.appointments import (
     AppointmentResponse, AppointmentCreate, AppointmentUpdate,
     AppointmentCategoryResponse, AppointmentCategoryCreate, AppointmentCategoryUpdate,
@@ -22,6 +22,7 @@ from ...schemas.appointments import (
     AppointmentPublicResponse, AvailableSlotResponse, BookingRequest, BookingConfirmation,
     TimeSlotCreate, TimeSlotResponse
 )
+from ...services.audit_service import audit_logger
 from ..endpoints.auth import get_current_active_admin
 
 router = APIRouter()
@@ -241,8 +242,11 @@ async def update_appointment_status(
         elif appointment_update.status == 'completed':
             appointment.completed_at = datetime.utcnow()
     
+    await db.commit()
+    await db.refresh(appointment)
+
     # Log audit
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="update",
         resource_type="appointment",
@@ -252,10 +256,6 @@ async def update_appointment_status(
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
-    await db.refresh(appointment)
     
     return appointment
 
@@ -291,19 +291,19 @@ async def create_appointment_category(
     category = AppointmentCategory(**category_create.dict())
     db.add(category)
     
+    await db.commit()
+    await db.refresh(category)
+
     # Log audit
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="create",
         resource_type="appointment_category",
+        resource_id=str(category.id),
         new_values=category_create.dict(),
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
-    await db.refresh(category)
     
     return category
 
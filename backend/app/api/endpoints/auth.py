@@ -8,33 +8,44 @@ import hashlib
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, update, and_
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 
 from ...core.config import get_settings
 from ...core.database import get_async_session
-from ...models.admin import AdminUser, AdminSession, AdminAuditLog
+from ...core.password_hasher import password_hasher, PasswordHasherBusy
+from ...models.admin import AdminUser, AdminSession
 from ...schemas.auth import Token, AdminUserResponse, LoginRequest, RefreshTokenRequest, TokenResponse
+from ...services.audit_service import audit_logger
+from ...services.session_cache import auth_session_cache
+from ...services import session_pruner  # noqa: F401 - înregistrează curățarea periodică a sesiunilor
 
 settings = get_settings()
 router = APIRouter()
 
-# Configurarea pentru criptarea parolelor
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme pentru JWT
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifică parola în text clar cu cea hash-uită"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verifică parola în text clar cu cea hash-uită (în pool-ul bcrypt)"""
+    return await _hash_call(password_hasher.verify(plain_password, hashed_password))
+
+
+async def get_password_hash(password: str) -> str:
+    """Generează hash pentru parolă (în pool-ul bcrypt)"""
+    return await _hash_call(password_hasher.hash(password))
 
 
-def get_password_hash(password: str) -> str:
-    """Generează hash pentru parolă"""
-    return pwd_context.hash(password)
+async def _hash_call(operation):
+    try:
+        return await operation
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prea multe autentificări simultane. Reîncercați în câteva secunde.",
+            headers={"Retry-After": "2"}
+        )
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -114,8 +125,14 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
     
-    # Verifică dacă sesiunea există și este validă
     token_hash = hash_token(token)
+
+    # Calea rapidă: sesiune validată recent de acest worker, fără interogări
+    cached = auth_session_cache.get(token_hash, user_id)
+    if cached is not None:
+        return _check_user_state(auth_session_cache.restore_user(cached, db))
+    
+    # Verifică dacă sesiunea există și este validă
     result = await db.execute(
         select(AdminSession).where(
             and_(
@@ -136,6 +153,12 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
     
+    _check_user_state(user)
+    auth_session_cache.put(token_hash, user, session)
+    return user
+
+
+def _check_user_state(user: AdminUser) -> AdminUser:
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -179,15 +202,13 @@ async def login(
     
     if not user:
         # Log tentativă de autentificare eșuată
-        audit_log = AdminAuditLog.create_log(
+        await audit_logger.log(
             user_id=None,
             action="login_failed",
             resource_type="auth",
             ip_address=request.client.host if request.client else None,
             user_agent=request.headers.get("user-agent")
         )
-        db.add(audit_log)
-        await db.commit()
         
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -201,8 +222,11 @@ async def login(
             detail=f"Cont blocat până la {user.locked_until}"
         )
     
-    # Verificarea parolei
-    if not verify_password(form_data.password, user.hashed_password):
+    # Verificarea parolei; hash-urile cu cost bcrypt depășit sunt refăcute
+    password_valid, new_hash = await _hash_call(
+        password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    )
+    if not password_valid:
         # Incrementarea încercărilor eșuate
         user.failed_login_attempts += 1
         
@@ -210,16 +234,19 @@ async def login(
         if user.failed_login_attempts >= 5:
             user.lock_account(30)  # 30 minute
         
+        await db.commit()
+
+        if user.is_locked:
+            await auth_session_cache.invalidate_user(user.id)
+
         # Log tentativă eșuată
-        audit_log = AdminAuditLog.create_log(
+        await audit_logger.log(
             user_id=user.id,
             action="login_failed",
             resource_type="auth",
             ip_address=request.client.host if request.client else None,
             user_agent=request.headers.get("user-agent")
         )
-        db.add(audit_log)
-        await db.commit()
         
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -233,6 +260,9 @@ async def login(
             detail="Cont dezactivat"
         )
     
+    if new_hash is not None:
+        user.hashed_password = new_hash
+
     # Resetarea încercărilor eșuate la autentificare cu succes
     user.failed_login_attempts = 0
     user.locked_until = None
@@ -254,18 +284,18 @@ async def login(
         expires_delta=refresh_token_expires
     )
     
-    # Revocă sesiunile vechi ale utilizatorului (opțional)
-    old_sessions_result = await db.execute(
-        select(AdminSession).where(
+    # Revocă sesiunile vechi ale utilizatorului printr-un singur UPDATE
+    revoke_result = await db.execute(
+        update(AdminSession)
+        .where(
             and_(
                 AdminSession.user_id == user.id,
                 AdminSession.is_revoked == False
             )
         )
+        .values(is_revoked=True)
+        .execution_options(synchronize_session=False)
     )
-    old_sessions = old_sessions_result.scalars().all()
-    for session in old_sessions:
-        session.revoke()
     
     # Salvarea sesiunii în baza de date
     session = AdminSession(
@@ -279,17 +309,20 @@ async def login(
     )
     db.add(session)
     
+    await db.commit()
+
+    # Sesiunile vechi tocmai au fost revocate
+    if revoke_result.rowcount:
+        await auth_session_cache.invalidate_user(user.id)
+
     # Log autentificare cu succes
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=user.id,
         action="login_success",
         resource_type="auth",
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
     
     return {
         "access_token": access_token,
@@ -368,20 +401,21 @@ async def refresh_token(
     )
     
     # Actualizează sesiunea cu noul access token
+    old_access_token_hash = session.access_token_hash
     session.access_token_hash = hash_token(new_access_token)
     session.access_expires_at = datetime.now(timezone.utc) + access_token_expires
     
+    await db.commit()
+    await auth_session_cache.invalidate_token(old_access_token_hash)
+
     # Log refresh token usage
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=user.id,
         action="token_refresh",
         resource_type="auth",
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
     
     return {
         "access_token": new_access_token,
@@ -400,6 +434,7 @@ async def logout(
     
     # Obținerea token-ului din header
     token = request.headers.get("authorization")
+    token_hash = None
     if token and token.startswith("Bearer "):
         token = token[7:]
         
@@ -418,16 +453,17 @@ async def logout(
         if session:
             session.revoke()
     
+    await db.commit()
+    await auth_session_cache.invalidate_token(token_hash)
+
     # Log logout
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="logout",
         resource_type="auth",
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    await db.commit()
     
     return {"message": "Logout efectuat cu succes"}
 
@@ -451,7 +487,7 @@ async def change_password(
     """Schimbarea parolei utilizatorului curent"""
     
     # Verificarea parolei curente
-    if not verify_password(current_password, current_user.hashed_password):
+    if not await verify_password(current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Parola curentă este incorectă"
@@ -465,20 +501,20 @@ async def change_password(
         )
     
     # Actualizarea parolei
-    current_user.hashed_password = get_password_hash(new_password)
+    current_user.hashed_password = await get_password_hash(new_password)
     current_user.password_changed_at = datetime.now(timezone.utc)
     
+    await db.commit()
+    await auth_session_cache.invalidate_user(current_user.id)
+
     # Log schimbarea parolei
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="password_changed",
         resource_type="auth",
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
     
     return {"message": "Parola a fost schimbată cu succes"}
 
@@ -532,7 +568,17 @@ async def revoke_session(
             detail="Sesiunea nu a fost găsită"
         )
     
+    token_hash = session.access_token_hash
     await db.delete(session)
     await db.commit()
+    await auth_session_cache.invalidate_token(token_hash)
     
-    return {"message": "Sesiunea a fost revocată cu succes"}
\ No newline at end of file
+    return {"message": "Sesiunea a fost revocată cu succes"}
+
+
+@router.get("/password-hasher/stats")
+async def get_password_hasher_stats(
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """Starea pool-ului bcrypt (pentru monitorizare)"""
+    return password_hasher.stats()
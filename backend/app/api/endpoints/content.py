@@ -8,8 +8,8 @@ from sqlalchemy import select, func, or_, and_
 from sqlalchemy.orm import selectinload
 
 from ...core.database import get_async_session
+from ...core.http_cache import response_cache, NAVIGATION_CACHE_TAG, CONTENT_CATEGORIES_CACHE_TAG
 from ...models.content import Page, Announcement, ContentCategory, AnnouncementCategory
-from ...models.admin import AdminAuditLog
 from ...schemas.content import (
     PageCreate, PageUpdate, PageResponse, PageListResponse,
     AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse, AnnouncementListResponse,
@@ -17,6 +17,8 @@ from ...schemas.content import (
 )
 from ..endpoints.auth import get_current_active_admin, get_current_user
 from ...models.admin import AdminUser
+from ...services.view_counter import announcement_view_counter, visitor_fingerprint
+from ...services.audit_service import audit_logger
 
 router = APIRouter()
 
@@ -27,9 +29,19 @@ router = APIRouter()
 
 @router.get("/categories", response_model=List[ContentCategoryResponse])
 async def get_content_categories(
+    request: Request,
     db: AsyncSession = Depends(get_async_session)
 ):
     """Obține toate categoriile de conținut active"""
+    return await response_cache.respond(
+        request,
+        lambda: _load_content_categories(db),
+        tags=(CONTENT_CATEGORIES_CACHE_TAG,),
+        response_model=List[ContentCategoryResponse]
+    )
+
+
+async def _load_content_categories(db: AsyncSession):
     result = await db.execute(
         select(ContentCategory)
         .where(ContentCategory.is_active == True)
@@ -168,19 +180,20 @@ async def create_page(
     
     db.add(page)
     
+    await db.commit()
+    await db.refresh(page)
+
     # Audit log
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="create",
         resource_type="page",
+        resource_id=str(page.id),
         new_values=page_data.dict(),
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
-    await db.refresh(page)
+    await response_cache.invalidate_tags(NAVIGATION_CACHE_TAG)
     
     return page
 
@@ -237,8 +250,11 @@ async def update_page(
         from datetime import datetime
         page.published_at = datetime.utcnow()
     
+    await db.commit()
+    await db.refresh(page)
+
     # Audit log
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="update",
         resource_type="page",
@@ -248,10 +264,7 @@ async def update_page(
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
-    await db.refresh(page)
+    await response_cache.invalidate_tags(NAVIGATION_CACHE_TAG)
     
     return page
 
@@ -274,8 +287,11 @@ async def delete_page(
             detail="Pagina nu a fost găsită"
         )
     
+    await db.delete(page)
+    await db.commit()
+
     # Audit log
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="delete",
         resource_type="page",
@@ -288,10 +304,7 @@ async def delete_page(
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.delete(page)
-    await db.commit()
+    await response_cache.invalidate_tags(NAVIGATION_CACHE_TAG)
     
     return {"message": "Pagina a fost ștearsă cu succes"}
 
@@ -302,9 +315,19 @@ async def delete_page(
 
 @router.get("/announcement-categories", response_model=List[AnnouncementCategoryResponse])
 async def get_announcement_categories(
+    request: Request,
     db: AsyncSession = Depends(get_async_session)
 ):
     """Obține toate categoriile de anunțuri active"""
+    return await response_cache.respond(
+        request,
+        lambda: _load_announcement_categories(db),
+        tags=(CONTENT_CATEGORIES_CACHE_TAG,),
+        response_model=List[AnnouncementCategoryResponse]
+    )
+
+
+async def _load_announcement_categories(db: AsyncSession):
     result = await db.execute(
         select(AnnouncementCategory)
         .where(AnnouncementCategory.is_active == True)
@@ -420,10 +443,15 @@ async def get_announcements(
 
 @router.get("/announcements/{slug}", response_model=AnnouncementResponse)
 async def get_announcement_by_slug(
+    request: Request,
     slug: str,
     db: AsyncSession = Depends(get_async_session)
 ):
-    """Obține un anunț după slug și incrementează view count"""
+    """
+    Obține un anunț după slug
+    Vizualizarea este contorizată în memorie și scrisă periodic în lot,
+    astfel încât citirea nu deschide o tranzacție de scriere
+    """
     result = await db.execute(
         select(Announcement)
         .options(selectinload(Announcement.category))
@@ -449,9 +477,14 @@ async def get_announcement_by_slug(
             detail="Anunțul a expirat"
         )
     
-    # Incrementează contorul de vizualizări
-    announcement.increment_view_count()
-    await db.commit()
+    # Contorizează vizualizarea (scrisă în lot de announcement_view_counter)
+    announcement_view_counter.record(
+        announcement.id,
+        visitor_fingerprint(
+            request.client.host if request.client else None,
+            request.headers.get("user-agent")
+        )
+    )
     
     return announcement
 
@@ -489,19 +522,19 @@ async def create_announcement(
     
     db.add(announcement)
     
+    await db.commit()
+    await db.refresh(announcement)
+
     # Audit log
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="create",
         resource_type="announcement",
+        resource_id=str(announcement.id),
         new_values=announcement_data.dict(),
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
-    await db.refresh(announcement)
     
     return announcement
 
@@ -564,8 +597,11 @@ async def update_announcement(
         from datetime import datetime
         announcement.published_at = datetime.utcnow()
     
+    await db.commit()
+    await db.refresh(announcement)
+
     # Audit log
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="update",
         resource_type="announcement",
@@ -575,10 +611,6 @@ async def update_announcement(
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
-    await db.refresh(announcement)
     
     return announcement
 
@@ -603,8 +635,11 @@ async def delete_announcement(
             detail="Anunțul nu a fost găsit"
         )
     
+    await db.delete(announcement)
+    await db.commit()
+
     # Audit log
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="delete",
         resource_type="announcement",
@@ -617,9 +652,5 @@ async def delete_announcement(
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.delete(announcement)
-    await db.commit()
     
     return {"message": "Anunțul a fost șters cu succes"}
\ No newline at end of file
@@ -2,18 +2,18 @@
 Endpoint-uri pentru managementul documentelor și MOL
 """
 import os
-import uuid
 from typing import List, Optional
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query, UploadFile, File
-from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_
 from sqlalchemy.orm import selectinload
 
 from ...core.database import get_async_session
 from ...core.config import get_settings
+from ...core.http_cache import response_cache, MOL_CACHE_TAG
+from ...core.file_delivery import file_download_response, is_new_download
 from ...models.documents import Document, DocumentCategory, MOLDocument, MOLCategory, DocumentDownload
-from ...models.admin import AdminAuditLog
 from ...schemas.documents import (
     DocumentResponse, DocumentListResponse, DocumentCreate, DocumentUpdate,
     MOLDocumentResponse, MOLDocumentListResponse, MOLDocumentCreate, MOLDocumentUpdate,
@@ -21,6 +21,11 @@ from ...schemas.documents import (
 )
 from ..endpoints.auth import get_current_active_admin
 from ...models.admin import AdminUser
+from ...services.audit_service import audit_logger
+from ...services.blob_store import blob_store, is_blob_path
+from ...services.resumable_upload import resumable_uploads
+from ...services.storage_manifest import storage_manifest
+from ...utils.file_handler import FileTooLargeError
 
 router = APIRouter()
 settings = get_settings()
@@ -117,7 +122,8 @@ async def get_documents(
 @router.post("/upload", response_model=DocumentResponse)
 async def upload_document(
     request: Request,
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[UUID] = None,
     title: str = None,
     description: str = None,
     category_id: int = None,
@@ -125,35 +131,47 @@ async def upload_document(
     current_user: AdminUser = Depends(get_current_active_admin),
     db: AsyncSession = Depends(get_async_session)
 ):
-    """Upload și creare document nou (admin only)"""
+    """Upload și creare document nou (admin only); fișierele mari pot veni printr-un upload reluabil (upload_id)"""
+    
+    if (file is None) == (upload_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Trimiteți fie fișierul, fie upload_id"
+        )
+    
+    if upload_id is not None:
+        # Fișierul a fost deja încărcat în fragmente; aici devine blob, cu referința în tranzacția documentului
+        upload = await resumable_uploads.get(db, upload_id)
+        file_name, content_type = upload.filename, upload.mime_type
+    else:
+        file_name, content_type = file.filename, file.content_type
     
     # Validarea tipului de fișier
-    if file.content_type not in settings.ALLOWED_FILE_TYPES:
+    if content_type not in settings.ALLOWED_FILE_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Tipul de fișier {file.content_type} nu este permis"
+            detail=f"Tipul de fișier {content_type} nu este permis"
         )
     
-    # Verificarea dimensiunii
-    content = await file.read()
-    if len(content) > settings.MAX_FILE_SIZE:
+    # Salvarea fișierului după conținut, cu verificarea dimensiunii în timpul copierii
+    try:
+        if upload_id is not None:
+            stored = await resumable_uploads.complete(upload, db)
+        else:
+            stored = await blob_store.store(
+                file,
+                settings.MAX_FILE_SIZE,
+                extension=os.path.splitext(file.filename)[1],
+                mime_type=file.content_type,
+                db=db
+            )
+    except FileTooLargeError:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"Fișierul este prea mare. Dimensiunea maximă: {settings.MAX_FILE_SIZE // (1024*1024)}MB"
         )
-    
-    # Generarea unui nume unic pentru fișier
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(settings.upload_path, "documents", unique_filename)
-    
-    # Crearea directorului dacă nu există
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    
-    # Salvarea fișierului
-    try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -162,24 +180,30 @@ async def upload_document(
     
     # Crearea înregistrării în baza de date
     document = Document(
-        title=title or file.filename,
+        title=title or file_name,
         description=description,
         category_id=category_id,
-        file_path=f"documents/{unique_filename}",
-        file_name=file.filename,
-        file_type=file.content_type,
-        file_size=len(content),
+        file_path=stored.storage_path,
+        file_name=file_name,
+        file_type=content_type,
+        file_size=stored.size,
         is_public=is_public,
         uploaded_by=current_user.id
     )
     
     db.add(document)
+    await db.flush()
+    await storage_manifest.claim(db, [document.file_path], "document", document.id)
     
+    await db.commit()
+    await db.refresh(document)
+
     # Audit log
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="upload",
         resource_type="document",
+        resource_id=str(document.id),
         new_values={
             "title": document.title,
             "file_name": document.file_name,
@@ -188,10 +212,6 @@ async def upload_document(
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
-    await db.refresh(document)
     
     return document
 
@@ -219,13 +239,15 @@ async def download_document(
             detail="Documentul nu este public"
         )
     
-    # Verificarea existenței fișierului
-    full_path = os.path.join(settings.upload_path, document.file_path)
-    if not os.path.exists(full_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Fișierul nu a fost găsit pe disk"
-        )
+    # Răspunsul (304, 206 sau transferul predat lui nginx) se stabilește înaintea contorizării
+    response = await file_download_response(
+        request,
+        os.path.join(settings.upload_path, document.file_path),
+        filename=document.file_name,
+        media_type=document.file_type
+    )
+    if not is_new_download(request, response):
+        return response
     
     # Incrementarea contorului de descărcări
     document.increment_download_count()
@@ -242,11 +264,7 @@ async def download_document(
     
     await db.commit()
     
-    return FileResponse(
-        path=full_path,
-        filename=document.file_name,
-        media_type=document.file_type
-    )
+    return response
 
 
 @router.delete("/{document_id}")
@@ -267,17 +285,22 @@ async def delete_document(
             detail="Documentul nu a fost găsit"
         )
     
-    # Ștergerea fișierului de pe disk
+    # Fișierele stocate după conținut pot fi partajate: se eliberează doar referința
     full_path = os.path.join(settings.upload_path, document.file_path)
-    if os.path.exists(full_path):
+    if is_blob_path(document.file_path):
+        await blob_store.release(db, [document.file_path])
+    elif os.path.exists(full_path):
         try:
             os.remove(full_path)
         except Exception as e:
             # Log error dar continuă cu ștergerea din DB
             print(f"Eroare la ștergerea fișierului {full_path}: {e}")
     
+    await db.delete(document)
+    await db.commit()
+
     # Audit log
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="delete",
         resource_type="document",
@@ -289,10 +312,6 @@ async def delete_document(
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.delete(document)
-    await db.commit()
     
     return {"message": "Documentul a fost șters cu succes"}
 
@@ -420,20 +439,23 @@ async def create_mol_document(
     )
     
     db.add(mol_document)
+    await db.flush()
+    await blob_store.acquire(db, [mol_document.file_path], owner=("mol_document", mol_document.id))
     
+    await db.commit()
+    await db.refresh(mol_document)
+
     # Audit log
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="create",
         resource_type="mol_document",
+        resource_id=str(mol_document.id),
         new_values=document_data.dict(),
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
-    await db.refresh(mol_document)
+    await response_cache.invalidate_tags(MOL_CACHE_TAG)
     
     return mol_document
 
@@ -467,13 +489,15 @@ async def download_mol_document(
             detail="Documentul nu are fișier atașat"
         )
     
-    # Verificarea existenței fișierului
-    full_path = os.path.join(settings.upload_path, document.file_path)
-    if not os.path.exists(full_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Fișierul nu a fost găsit pe disk"
-        )
+    # Răspunsul (304, 206 sau transferul predat lui nginx) se stabilește înaintea contorizării
+    response = await file_download_response(
+        request,
+        os.path.join(settings.upload_path, document.file_path),
+        filename=document.file_name or f"MOL_{document.document_number}.pdf",
+        media_type=document.file_type or "application/pdf"
+    )
+    if not is_new_download(request, response):
+        return response
     
     # Înregistrarea statisticii de download
     from datetime import date
@@ -487,11 +511,7 @@ async def download_mol_document(
     
     await db.commit()
     
-    return FileResponse(
-        path=full_path,
-        filename=document.file_name or f"MOL_{document.document_number}.pdf",
-        media_type=document.file_type or "application/pdf"
-    )
+    return response
 
 
 @router.get("/stats/downloads")
@@ -4,23 +4,38 @@ Endpoint-uri pentru managementul fișierelor și documentelor
 import os
 from pathlib import Path
 from typing import List, Optional, Dict, Any
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, BackgroundTasks, Request
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, or_, and_
 from ...core.database import get_async_session as get_db
-from ...services.file_service import FileService, DocumentService
+from ...services.file_service import FileService, DocumentService, BULK_INGEST_JOB_KIND
+from ...services.image_service import image_pool, variant_cache
+from ...services.blob_store import is_blob_path
+from ...services.resumable_upload import resumable_uploads
+from ...services import pdf_service
+from ...services.generated_documents import generated_documents
+from ...services.storage_manifest import storage_manifest
+from ...services.storage_reconciler import RECONCILE_JOB_KIND, storage_reconciler
+from ...core.file_delivery import file_download_response, is_new_download
+from ...services.job_queue import job_queue
+from ...schemas.jobs import BackgroundJobResponse
+from ...models.admin import AdminUser
 from ...models.documents import Document, DocumentCategory, DocumentDownload
 from ...schemas.files import (
     Document as DocumentSchema, DocumentList, DocumentCreate, DocumentUpdate,
     DocumentCategory as DocumentCategorySchema, DocumentCategoryCreate, DocumentCategoryUpdate,
     FileUploadResponse, FileValidationRequest, FileValidationResponse,
-    BulkUploadRequest, BulkUploadResponse, DocumentStats, CleanupStats,
+    BulkUploadRequest, BulkUploadResponse, BulkUploadFileResult, DocumentStats, CleanupStats, CleanupJobResponse,
     StorageStats, DocumentSearchRequest, DownloadTrackingRequest
 )
 from ...core.config import get_settings
+from ..endpoints.auth import get_current_active_admin
 import mimetypes
 import json
+import base64
+import binascii
 
 router = APIRouter()
 file_service = FileService()
@@ -34,16 +49,18 @@ document_service = DocumentService()
 @router.post("/upload", response_model=FileUploadResponse)
 async def upload_file(
     file: UploadFile = File(...),
-    subfolder: str = Form("documents"),
-    generate_thumbnail: bool = Form(False)
+    generate_thumbnail: bool = Form(False),
+    wait_for_processing: bool = Form(False)
 ):
-    """Upload un fișier"""
+    """
+    Upload un fișier (atașat ulterior unui document, MOL sau cereri).
+    Imaginile sunt procesate în fundal, iar cu wait_for_processing înainte de răspuns.
+    """
     try:
         file_info = await file_service.save_uploaded_file(
             file=file,
-            subfolder=subfolder,
-            prefix="upload",
-            generate_thumbnail=generate_thumbnail
+            generate_thumbnail=generate_thumbnail,
+            wait_for_images=wait_for_processing
         )
         
         return FileUploadResponse(**file_info)
@@ -57,7 +74,6 @@ async def upload_file(
 @router.post("/upload/multiple", response_model=List[FileUploadResponse])
 async def upload_multiple_files(
     files: List[UploadFile] = File(...),
-    subfolder: str = Form("documents"),
     generate_thumbnail: bool = Form(False)
 ):
     """Upload fișiere multiple"""
@@ -68,8 +84,6 @@ async def upload_multiple_files(
         try:
             file_info = await file_service.save_uploaded_file(
                 file=file,
-                subfolder=subfolder,
-                prefix="batch",
                 generate_thumbnail=generate_thumbnail
             )
             results.append(FileUploadResponse(**file_info))
@@ -82,6 +96,119 @@ async def upload_multiple_files(
     return results
 
 
+# ================================
+# UPLOAD-URI RELUABILE (protocol tus 1.0.0)
+# ================================
+
+TUS_VERSION = "1.0.0"
+
+
+def _tus_headers(**headers: Any) -> Dict[str, str]:
+    values = {"Tus-Resumable": TUS_VERSION, "Cache-Control": "no-store"}
+    values.update({name.replace("_", "-"): str(value) for name, value in headers.items()})
+    return values
+
+
+def _parse_upload_metadata(header: Optional[str]) -> Dict[str, str]:
+    """Upload-Metadata: perechi "cheie valoare-base64" separate prin virgulă"""
+    metadata = {}
+    for pair in (header or "").split(","):
+        parts = pair.strip().split(" ", 1)
+        if not parts[0]:
+            continue
+        try:
+            metadata[parts[0]] = base64.b64decode(parts[1]).decode("utf-8") if len(parts) > 1 else ""
+        except (binascii.Error, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail=f"Metadate invalide pentru '{parts[0]}'")
+    return metadata
+
+
+@router.options("/uploads")
+async def resumable_upload_options():
+    """Capabilitățile serverului pentru upload-urile reluabile"""
+    return Response(status_code=204, headers=_tus_headers(
+        Tus_Version=TUS_VERSION,
+        Tus_Extension="creation,termination",
+        Tus_Max_Size=resumable_uploads.max_size
+    ))
+
+
+@router.post("/uploads", status_code=201)
+async def create_resumable_upload(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Creează un upload reluabil pentru fișiere mari (scanări MOL, anexe).
+    Antete: Upload-Length și Upload-Metadata (filename, filetype în base64).
+    """
+    try:
+        total_size = int(request.headers.get("upload-length", ""))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Antetul Upload-Length lipsește sau este invalid")
+
+    metadata = _parse_upload_metadata(request.headers.get("upload-metadata"))
+    filename = metadata.get("filename")
+    mime_type = metadata.get("filetype") or (mimetypes.guess_type(filename or "")[0])
+    errors = FileService.validate_metadata(filename, mime_type)
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+
+    upload = await resumable_uploads.create(db, filename, mime_type, total_size)
+    return Response(status_code=201, headers=_tus_headers(
+        Location=str(request.url_for("get_resumable_upload_offset", upload_id=upload.id)),
+        Upload_Offset=0
+    ))
+
+
+@router.head("/uploads/{upload_id}", name="get_resumable_upload_offset")
+async def get_resumable_upload_offset(upload_id: UUID, db: AsyncSession = Depends(get_db)):
+    """Offset-ul de la care clientul reia upload-ul"""
+    upload = await resumable_uploads.get(db, upload_id)
+    offset = await resumable_uploads.offset(upload)
+    return Response(status_code=200, headers=_tus_headers(
+        Upload_Offset=offset,
+        Upload_Length=upload.total_size
+    ))
+
+
+@router.patch("/uploads/{upload_id}")
+async def append_resumable_upload(upload_id: UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    """Adaugă un fragment la offset-ul curent (corpul cererii este citit în flux)"""
+    if request.headers.get("content-type") != "application/offset+octet-stream":
+        raise HTTPException(status_code=415, detail="Content-Type trebuie să fie application/offset+octet-stream")
+    try:
+        offset = int(request.headers.get("upload-offset", ""))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Antetul Upload-Offset lipsește sau este invalid")
+
+    upload = await resumable_uploads.get(db, upload_id)
+    new_offset = await resumable_uploads.append(db, upload, offset, request.stream())
+    return Response(status_code=204, headers=_tus_headers(Upload_Offset=new_offset))
+
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+async def abort_resumable_upload(upload_id: UUID, db: AsyncSession = Depends(get_db)):
+    """Renunță la un upload neterminat"""
+    upload = await resumable_uploads.get(db, upload_id)
+    await resumable_uploads.abort(db, upload)
+    return Response(status_code=204, headers=_tus_headers())
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=FileUploadResponse)
+async def complete_resumable_upload(
+    upload_id: UUID,
+    generate_thumbnail: bool = Form(False),
+    wait_for_processing: bool = Form(False),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Finalizează upload-ul; fișierul se atașează ulterior prin file_path,
+    la fel ca după /upload (sau direct, cu upload_id la crearea documentului).
+    """
+    file_info = await file_service.save_resumable_upload(
+        db, upload_id, generate_thumbnail=generate_thumbnail, wait_for_images=wait_for_processing
+    )
+    return FileUploadResponse(**file_info)
+
+
 @router.post("/validate", response_model=FileValidationResponse)
 async def validate_file_info(request: FileValidationRequest):
     """Validează informațiile unui fișier fără upload"""
@@ -102,6 +229,32 @@ async def validate_file_info(request: FileValidationRequest):
     )
 
 
+@router.get("/jobs/{job_id}", response_model=BackgroundJobResponse)
+async def get_processing_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """Starea procesării în fundal a unui fișier încărcat"""
+    job = await job_queue.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sarcina nu a fost găsită")
+    return job
+
+
+@router.get("/processing-stats")
+async def get_processing_stats(current_user: AdminUser = Depends(get_current_active_admin)):
+    """Metricile pool-ului de procesare a imaginilor și ale cozii de sarcini"""
+    return {
+        "image_pool": image_pool.stats(),
+        "image_variants": variant_cache.stats(),
+        "jobs": job_queue.stats(),
+        "resumable_uploads": resumable_uploads.stats(),
+        "pdf_render": pdf_service.stats(),
+        "generated_documents": generated_documents.stats()
+    }
+
+
 # ================================
 # CATEGORII DOCUMENTE
 # ================================
@@ -248,10 +401,13 @@ async def create_document(
     tags: Optional[str] = Form(None),  # JSON string
     is_public: bool = Form(True),
     requires_auth: bool = Form(False),
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[UUID] = Form(None),  # upload reluabil, în locul fișierului
     db: AsyncSession = Depends(get_db)
 ):
     """Creează un document nou cu fișier atașat"""
+    if (file is None) == (upload_id is None):
+        raise HTTPException(status_code=400, detail="Trimiteți fie fișierul, fie upload_id")
     
     try:
         # Parse tags-urile dacă sunt furnizate
@@ -271,7 +427,8 @@ async def create_document(
             tags=parsed_tags,
             is_public=is_public,
             requires_auth=requires_auth,
-            uploaded_by=None  # TODO: get from JWT token
+            uploaded_by=None,  # TODO: get from JWT token
+            upload_id=upload_id
         )
         
         return document
@@ -457,11 +614,10 @@ async def download_document(
     upload_dir = Path(settings.UPLOAD_DIR if hasattr(settings, 'UPLOAD_DIR') else "uploads")
     file_path = upload_dir / document.file_path
     
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Fișierul nu a fost găsit pe disc")
+    response = await file_download_response(request, file_path, filename=document.file_name)
     
-    # Înregistrează descărcarea în background
-    if track:
+    # Înregistrează descărcarea în background (nu și reluările sau răspunsurile 304)
+    if track and is_new_download(request, response):
         client_ip = request.client.host if request.client else None
         user_agent = request.headers.get("user-agent")
         
@@ -473,18 +629,11 @@ async def download_document(
             user_agent=user_agent
         )
     
-    # Detectează tipul MIME
-    mime_type = mimetypes.guess_type(str(file_path))[0] or 'application/octet-stream'
-    
-    return FileResponse(
-        path=str(file_path),
-        filename=document.file_name,
-        media_type=mime_type
-    )
+    return response
 
 
 @router.get("/files/{file_path:path}")
-async def serve_file(file_path: str):
+async def serve_file(file_path: str, request: Request):
     """Servește un fișier static"""
     
     settings = get_settings()
@@ -497,12 +646,33 @@ async def serve_file(file_path: str):
     except ValueError:
         raise HTTPException(status_code=403, detail="Calea fișierului nu este permisă")
     
-    if not full_path.exists():
-        raise HTTPException(status_code=404, detail="Fișierul nu a fost găsit")
-    
-    mime_type = mimetypes.guess_type(str(full_path))[0] or 'application/octet-stream'
+    # Fișierele stocate după conținut nu se modifică sub aceeași cale
+    cache_control = "public, max-age=31536000, immutable" if is_blob_path(file_path) else "public, max-age=3600"
+    return await file_download_response(request, full_path, inline=True, cache_control=cache_control)
+
+
+@router.get("/images/{file_path:path}")
+async def get_image_variant(
+    file_path: str,
+    request: Request,
+    w: int = Query(..., ge=16, le=4096, description="Lățimea dorită (rotunjită la o lățime standard)"),
+    format: Optional[str] = Query(None, pattern="^(webp|jpeg)$", description="Implicit WebP dacă browserul îl acceptă"),
+    q: Optional[int] = Query(None, ge=1, le=100, description="Calitatea compresiei")
+):
+    """Servește o variantă redimensionată a unei imagini, generată o singură dată și păstrată pe disc"""
+    path, media_type = await file_service.get_image_variant(
+        file_path, w, image_format=format, quality=q, accept=request.headers.get("accept", "")
+    )
     
-    return FileResponse(path=str(full_path), media_type=mime_type)
+    # Sursa nu se modifică sub aceeași cale (blob-urile sunt adresate după conținut)
+    return await file_download_response(
+        request,
+        path,
+        media_type=media_type,
+        inline=True,
+        cache_control="public, max-age=31536000, immutable",
+        extra_headers={"vary": "Accept"} if format is None else None
+    )
 
 
 # ================================
@@ -557,72 +727,76 @@ async def get_document_stats(db: AsyncSession = Depends(get_db)):
     )
 
 
-@router.post("/cleanup", response_model=CleanupStats)
-async def cleanup_orphaned_files(db: AsyncSession = Depends(get_db)):
-    """Curăță fișierele orfane"""
+def _cleanup_response(job) -> CleanupJobResponse:
+    report = job.result or job.progress
+    return CleanupJobResponse(
+        job_id=str(job.id),
+        status=job.status,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        report=CleanupStats(**report) if report else None
+    )
+
+
+@router.post("/cleanup", response_model=CleanupJobResponse, status_code=202)
+async def cleanup_orphaned_files(
+    dry_run: bool = Query(True, description="Doar raport, fără ștergere"),
+    grace_hours: Optional[int] = Query(
+        None, ge=0, description="Fișierele mai noi nu sunt considerate orfane (cel puțin expirarea upload-urilor)"
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """Pornește reconcilierea fișierelor orfane în fundal (sau returnează reconcilierea în curs)"""
     
-    stats = await file_service.cleanup_orphaned_files(db)
+    job = await storage_reconciler.schedule(db, dry_run=dry_run, grace_hours=grace_hours)
     
-    return CleanupStats(**stats)
+    return _cleanup_response(job)
 
 
-@router.get("/storage-stats", response_model=StorageStats)
-async def get_storage_stats(db: AsyncSession = Depends(get_db)):
-    """Obține statistici despre stocarea fișierelor"""
+@router.get("/cleanup/{job_id}", response_model=CleanupJobResponse)
+async def get_cleanup_report(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """Progresul sau raportul final al unei reconcilieri"""
     
-    settings = get_settings()
-    upload_dir = Path(settings.UPLOAD_DIR if hasattr(settings, 'UPLOAD_DIR') else "uploads")
+    job = await job_queue.get(db, job_id)
+    if not job or job.kind != RECONCILE_JOB_KIND:
+        raise HTTPException(status_code=404, detail="Reconcilierea nu a fost găsită")
     
-    total_size = 0
-    files_count = 0
-    categories = {}
-    file_types = {}
-    largest_files = []
-    
-    # Scandează directorul de upload
-    for file_path in upload_dir.rglob("*"):
-        if file_path.is_file():
-            size = file_path.stat().st_size
-            total_size += size
-            files_count += 1
-            
-            # Categorie (subfolder)
-            relative_path = file_path.relative_to(upload_dir)
-            category = str(relative_path.parts[0]) if relative_path.parts else "root"
-            categories[category] = categories.get(category, 0) + size
-            
-            # Tip fișier
-            file_ext = file_path.suffix.lower()
-            file_types[file_ext] = file_types.get(file_ext, 0) + 1
-            
-            # Fișiere mari
-            largest_files.append({
-                "path": str(relative_path),
-                "size": size,
-                "size_formatted": file_service._format_file_size(size)
-            })
-    
-    # Sortează fișierele mari
-    largest_files.sort(key=lambda x: x["size"], reverse=True)
-    largest_files = largest_files[:10]
+    return _cleanup_response(job)
+
+
+@router.get("/storage-stats", response_model=StorageStats)
+async def get_storage_stats(db: AsyncSession = Depends(get_db)):
+    """Obține statistici despre stocarea fișierelor (din manifestul de stocare, fără scanarea discului)"""
     
-    def format_size(size_bytes: int) -> str:
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} TB"
+    usage = await storage_manifest.usage(db)
+    largest_files = [
+        {**entry, "size_formatted": file_service._format_file_size(entry["size"])}
+        for entry in await storage_manifest.largest(db, limit=10)
+    ]
     
     return StorageStats(
-        total_size=total_size,
-        total_size_formatted=format_size(total_size),
-        files_count=files_count,
-        categories=categories,
+        total_size=usage["total_size"],
+        total_size_formatted=file_service._format_file_size(usage["total_size"]),
+        files_count=usage["files_count"],
+        categories=usage["categories"],
         largest_files=largest_files,
-        file_types=file_types
+        file_types=usage["file_types"]
     )
 
 
+@router.post("/storage-manifest/rebuild")
+async def rebuild_storage_manifest(current_user: AdminUser = Depends(get_current_active_admin)):
+    """Adaugă în manifest fișierele salvate înainte de introducerea lui și recalculează totalurile"""
+    
+    return await storage_manifest.rebuild()
+
+
 # ================================
 # BULK OPERATIONS
 # ================================
@@ -633,46 +807,66 @@ async def bulk_upload_documents(
     request_data: str = Form(...),  # JSON string cu BulkUploadRequest
     db: AsyncSession = Depends(get_db)
 ):
-    """Upload în masă de documente"""
+    """
+    Upload în masă de documente: fișierele se salvează concurent, iar documentele
+    se creează într-o singură tranzacție (sau într-o sarcină de fundal, cu background)
+    """
     
     try:
         # Parse request data
         bulk_request = BulkUploadRequest.model_validate_json(request_data)
+        settings = get_settings()
         
-        results = []
-        errors = []
+        staged = await document_service.stage_files(files, concurrency=settings.BULK_UPLOAD_CONCURRENCY)
+        ready = [item for item in staged if "error" not in item]
+        errors = [{"filename": item["filename"], "error": item["error"]} for item in staged if "error" in item]
+        options = {
+            "category_id": bulk_request.category_id,
+            "tags": bulk_request.tags,
+            "is_public": bulk_request.is_public,
+            "requires_auth": bulk_request.requires_auth,
+            "uploaded_by": None  # TODO: get from JWT
+        }
         
-        for file in files:
-            try:
-                # Folosește numele fișierului ca titlu implicit
-                title = Path(file.filename).stem
-                
-                document = await document_service.create_document(
-                    db=db,
-                    file=file,
-                    title=title,
-                    description=None,
-                    category_id=bulk_request.category_id,
-                    tags=bulk_request.tags,
-                    is_public=bulk_request.is_public,
-                    requires_auth=bulk_request.requires_auth,
-                    uploaded_by=None  # TODO: get from JWT
-                )
-                
-                results.append(document)
-                
-            except Exception as e:
-                errors.append({
-                    "filename": file.filename,
-                    "error": str(e)
-                })
+        documents = []
+        processing_job_ids = []
+        job_id = None
+        if errors and bulk_request.atomic:
+            # Fișierele salvate rămân fără referințe și sunt colectate după perioada de grație
+            ready_status = "skipped"
+        elif bulk_request.background:
+            job = await job_queue.enqueue(db, BULK_INGEST_JOB_KIND, {"staged": ready, "options": options})
+            await db.commit()
+            job_id = str(job.id)
+            ready_status = "queued"
+        else:
+            documents, processing_job_ids = await document_service.create_documents_bulk(db, ready, **options)
+            ready_status = "created"
+        
+        # Documentele sunt în ordinea fișierelor salvate (ID-uri crescătoare)
+        document_ids = iter([document.id for document in documents])
+        results = [
+            BulkUploadFileResult(filename=item["filename"], status="failed", error=item["error"])
+            if "error" in item else
+            BulkUploadFileResult(
+                filename=item["filename"],
+                status=ready_status,
+                document_id=next(document_ids, None),
+                file_path=item["file_path"],
+                deduplicated=not item["created"]
+            )
+            for item in staged
+        ]
         
         return BulkUploadResponse(
             total_files=len(files),
-            successful=len(results),
+            successful=len(ready) if ready_status != "skipped" else 0,
             failed=len(errors),
             errors=errors,
-            documents=results
+            documents=documents,
+            results=results,
+            job_id=job_id,
+            processing_job_ids=processing_job_ids
         )
         
     except Exception as e:
@@ -682,32 +876,21 @@ async def bulk_upload_documents(
 @router.delete("/bulk-delete")
 async def bulk_delete_documents(
     document_ids: List[int],
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
-    """Șterge mai multe documente odată"""
+    """Șterge mai multe documente odată (o singură instrucțiune; fișierele se șterg după răspuns)"""
     
-    results = {
-        "deleted": 0,
-        "failed": 0,
-        "errors": []
-    }
+    deleted_ids, file_paths = await document_service.delete_documents_bulk(db, document_ids)
+    if file_paths:
+        background_tasks.add_task(file_service.remove_files, file_paths)
     
-    for document_id in document_ids:
-        try:
-            success = await document_service.delete_document(db, document_id)
-            if success:
-                results["deleted"] += 1
-            else:
-                results["failed"] += 1
-                results["errors"].append({
-                    "document_id": document_id,
-                    "error": "Document not found"
-                })
-        except Exception as e:
-            results["failed"] += 1
-            results["errors"].append({
-                "document_id": document_id,
-                "error": str(e)
-            })
-    
-    return results
\ No newline at end of file
+    missing = sorted(set(document_ids) - set(deleted_ids))
+    return {
+        "deleted": len(deleted_ids),
+        "failed": len(missing),
+        "errors": [
+            {"document_id": document_id, "error": "Document not found"}
+            for document_id in missing
+        ]
+    }
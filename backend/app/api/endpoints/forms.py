@@ -4,13 +4,14 @@ API endpoints pentru formulare online și cereri administrative
 import uuid
 from typing import List, Optional
 from datetime import datetime, date, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, or_, desc, asc, func
+from sqlalchemy import select, and_, or_, desc, asc, func
 
 from ...core.database import get_async_session
-from ...models.forms import FormType, FormSubmission, ComplaintCategory, Complaint
+from ...core.file_delivery import file_download_response
+from ...core.http_cache import response_cache, FORM_TYPES_CACHE_TAG
+from ...models.forms import FormType, FormSubmission, ComplaintCategory, Complaint, DocumentTemplate
 from ...models.admin import AdminUser
 from ...schemas.forms import (
     FormType as FormTypeSchema,
@@ -32,38 +33,73 @@ from ...schemas.forms import (
     ComplaintStats,
     ServiceStats,
     FileUploadResponse,
-    FileUploadError
+    FileUploadError,
+    GeneratedDocumentResponse,
+    GeneratedDocumentHistory,
+    GeneratedDocumentVersion,
+    DocumentBatchRequest,
+    DocumentBatchResponse,
+    DocumentTemplateInfo,
+    DocumentTemplateSource,
+    DocumentTemplateUpdate
 )
 from ...utils.reference_generator import generate_reference_number
-from ...utils.file_handler import save_uploaded_file, validate_file
+from ...utils.file_handler import FileTooLargeError, save_uploaded_file, validate_file
+from ...services.blob_store import blob_store, paths_from_upload_tokens
+from ...services import pdf_service
+from ...services.document_template_service import document_template_store
+from ...services.generated_documents import generated_documents
+from ...services.document_batch import DOCUMENT_BATCH_JOB_KIND, document_batches
+from ...services.job_queue import job_queue
+from ...utils.document_templates import STYLESHEET
+from ...utils.pdf_generator import document_templates, get_document_download_url
+from ...services.municipality_config_service import municipality_config_store
+from ...core.process_pool import ProcessPoolBusy
+from ..endpoints.auth import get_current_active_admin
 import os
+import re
 import secrets
+from pathlib import Path
 import logging
+from jinja2 import TemplateNotFound
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Șabloanele modificabile: un tip de document (.html), componentele (_*.html), layout-ul și CSS-ul
+DOCUMENT_TEMPLATE_NAME = re.compile(r"_?[a-z0-9][a-z0-9-]*\.html|documents\.css")
+
 # ========== FORMULARE ONLINE ==========
 
 @router.get("/form-types", response_model=List[FormTypeSchema])
 async def get_form_types(
+    request: Request,
     active_only: bool = True,
     db: AsyncSession = Depends(get_async_session)
 ):
     """Obține lista tipurilor de formulare disponibile"""
-    query = db.query(FormType)
+    return await response_cache.respond(
+        request,
+        lambda: _load_form_types(db, active_only),
+        tags=(FORM_TYPES_CACHE_TAG,),
+        response_model=List[FormTypeSchema]
+    )
+
+
+async def _load_form_types(db: AsyncSession, active_only: bool):
+    query = select(FormType)
     if active_only:
-        query = query.filter(FormType.is_active == True)
+        query = query.where(FormType.is_active == True)
     
-    form_types = query.order_by(FormType.name).all()
-    return form_types
+    result = await db.execute(query.order_by(FormType.name))
+    return result.scalars().all()
 
 
 @router.get("/form-types/{form_type_id}", response_model=FormTypeSchema)
 async def get_form_type(form_type_id: int, db: AsyncSession = Depends(get_async_session)):
     """Obține detaliile unui tip de formular"""
-    form_type = db.query(FormType).filter(FormType.id == form_type_id).first()
+    form_type = await db.get(FormType, form_type_id)
     if not form_type:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -80,7 +116,8 @@ async def create_form_type(
 ):
     """Creează un nou tip de formular (doar pentru administratori)"""
     # Verifică dacă slug-ul există deja
-    existing = db.query(FormType).filter(FormType.slug == form_type.slug).first()
+    result = await db.execute(select(FormType).where(FormType.slug == form_type.slug))
+    existing = result.scalar_one_or_none()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -90,8 +127,9 @@ async def create_form_type(
     # Creează formularul
     db_form_type = FormType(**form_type.dict())
     db.add(db_form_type)
-    db.commit()
-    db.refresh(db_form_type)
+    await db.commit()
+    await db.refresh(db_form_type)
+    await response_cache.invalidate_tags(FORM_TYPES_CACHE_TAG)
     
     logger.info(f"Created form type: {db_form_type.name} (ID: {db_form_type.id})")
     return db_form_type
@@ -104,7 +142,7 @@ async def update_form_type(
     db: AsyncSession = Depends(get_async_session)
 ):
     """Actualizează un tip de formular"""
-    db_form_type = db.query(FormType).filter(FormType.id == form_type_id).first()
+    db_form_type = await db.get(FormType, form_type_id)
     if not db_form_type:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -116,8 +154,9 @@ async def update_form_type(
     for field, value in update_data.items():
         setattr(db_form_type, field, value)
     
-    db.commit()
-    db.refresh(db_form_type)
+    await db.commit()
+    await db.refresh(db_form_type)
+    await response_cache.invalidate_tags(FORM_TYPES_CACHE_TAG)
     
     logger.info(f"Updated form type: {db_form_type.name} (ID: {db_form_type.id})")
     return db_form_type
@@ -130,9 +169,12 @@ async def submit_form(
 ):
     """Trimite o cerere completând un formular"""
     # Verifică dacă tipul de formular există și este activ
-    form_type = db.query(FormType).filter(
-        and_(FormType.id == submission.form_type_id, FormType.is_active == True)
-    ).first()
+    result = await db.execute(
+        select(FormType).where(
+            and_(FormType.id == submission.form_type_id, FormType.is_active == True)
+        )
+    )
+    form_type = result.scalar_one_or_none()
     
     if not form_type:
         raise HTTPException(
@@ -143,12 +185,14 @@ async def submit_form(
     # Verifică limita zilnică de submisii
     if form_type.max_submissions_per_day:
         today = date.today()
-        today_submissions = db.query(FormSubmission).filter(
-            and_(
-                FormSubmission.form_type_id == submission.form_type_id,
-                func.date(FormSubmission.submitted_at) == today
+        today_submissions = await db.scalar(
+            select(func.count(FormSubmission.id)).where(
+                and_(
+                    FormSubmission.form_type_id == submission.form_type_id,
+                    func.date(FormSubmission.submitted_at) == today
+                )
             )
-        ).count()
+        )
         
         if today_submissions >= form_type.max_submissions_per_day:
             raise HTTPException(
@@ -159,9 +203,11 @@ async def submit_form(
     # Generează numărul de referință
     reference_number = generate_reference_number("CERERE")
     
-    # Creează submisia
+    # Creează submisia; fișierele atașate vin ca tokenuri de upload
+    submission_data = submission.dict()
+    submission_data["attached_files"] = paths_from_upload_tokens(submission.attached_files) or None
     db_submission = FormSubmission(
-        **submission.dict(),
+        **submission_data,
         reference_number=reference_number,
         status="pending"
     )
@@ -170,8 +216,12 @@ async def submit_form(
     db_submission.set_data_retention(years=3)
     
     db.add(db_submission)
-    db.commit()
-    db.refresh(db_submission)
+    await db.flush()
+    await blob_store.acquire(
+        db, db_submission.attached_files or [], owner=("form_submission", db_submission.id)
+    )
+    await db.commit()
+    await db.refresh(db_submission)
     
     logger.info(f"Created form submission: {reference_number} for form type {form_type.name}")
     
@@ -250,6 +300,287 @@ async def list_form_submissions(
     return submissions
 
 
+@router.post("/form-submissions/{submission_id}/document", response_model=GeneratedDocumentResponse)
+async def generate_submission_document(
+    submission_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """Generează documentul oficial (PDF) pentru o cerere aprobată sau finalizată"""
+    result = await db.execute(
+        select(FormSubmission, FormType)
+        .join(FormType, FormType.id == FormSubmission.form_type_id)
+        .where(FormSubmission.id == submission_id)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cererea nu a fost găsită"
+        )
+    submission, form_type = row
+    
+    if submission.status not in ("approved", "completed"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Documentul poate fi generat doar pentru cererile aprobate/finalizate"
+        )
+    
+    submission_data = pdf_service.submission_document_data(submission, form_type.name)
+    municipality = await municipality_config_store.get(db)
+    
+    try:
+        return await pdf_service.render_official_document(
+            form_type.slug,
+            submission_data,
+            municipality.values,
+            db=db,
+            submission_id=submission.id,
+            generated_by=current_user.id
+        )
+    except ProcessPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serverul generează prea multe documente. Reîncercați în câteva secunde.",
+            headers={"Retry-After": "5"}
+        )
+
+
+def _batch_response(job) -> DocumentBatchResponse:
+    archive = (job.result or {}).get("archive")
+    return DocumentBatchResponse(
+        job_id=str(job.id),
+        status=job.status,
+        total=len(job.payload["submission_ids"]),
+        progress=job.progress,
+        result=job.result,
+        error=job.error,
+        archive_url=f"/api/v1/forms/document-batches/{job.id}/archive" if archive else None,
+        created_at=job.created_at,
+        finished_at=job.finished_at
+    )
+
+
+async def _get_batch_job(db: AsyncSession, job_id: uuid.UUID):
+    job = await job_queue.get(db, job_id)
+    if not job or job.kind != DOCUMENT_BATCH_JOB_KIND:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Generarea în lot nu a fost găsită"
+        )
+    return job
+
+
+@router.post("/document-batches", response_model=DocumentBatchResponse, status_code=202)
+async def create_document_batch(
+    batch: DocumentBatchRequest,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """
+    Generează în fundal documentele pentru mai multe cereri aprobate (ID-urile date
+    sau filtrul); cererile care au deja document sunt sărite, fără `regenerate`
+    """
+    submission_ids = batch.submission_ids
+    if not submission_ids:
+        submission_ids = await document_batches.select_submissions(
+            db,
+            statuses=batch.statuses,
+            form_type_id=batch.form_type_id,
+            processed_from=batch.processed_from,
+            processed_to=batch.processed_to
+        )
+    
+    job = await document_batches.schedule(
+        db,
+        submission_ids,
+        regenerate=batch.regenerate,
+        output=batch.output.value if batch.output else None,
+        requested_by=current_user.id
+    )
+    return _batch_response(job)
+
+
+@router.get("/document-batches/{job_id}", response_model=DocumentBatchResponse)
+async def get_document_batch(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """Progresul, documentele generate și eșecurile unei generări în lot"""
+    return _batch_response(await _get_batch_job(db, job_id))
+
+
+@router.get("/document-batches/{job_id}/archive")
+async def download_document_batch_archive(
+    job_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """Arhiva ZIP sau PDF-ul combinat al unei generări în lot terminate"""
+    job = await _get_batch_job(db, job_id)
+    archive = (job.result or {}).get("archive")
+    if job.status != "done" or not archive:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Arhiva nu este disponibilă"
+        )
+    
+    return await file_download_response(
+        request,
+        document_batches.archive_path(archive),
+        filename=archive["file_name"],
+        media_type=archive["mime_type"]
+    )
+
+
+def _generated_version(document) -> GeneratedDocumentVersion:
+    return GeneratedDocumentVersion(
+        version=document.version,
+        document_type=document.document_type,
+        file_name=document.file_name,
+        mime_type=document.mime_type,
+        file_size=document.file_size,
+        sha256=document.sha256,
+        generated_at=document.generated_at,
+        download_url=get_document_download_url(document.reference_number, document.version)
+    )
+
+
+@router.get("/generated-documents/{reference_number}", response_model=GeneratedDocumentHistory)
+async def get_generated_document(
+    reference_number: str,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Ultima versiune a documentului generat pentru o cerere și versiunile păstrate"""
+    versions = await generated_documents.history(db, reference_number)
+    if not versions:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Documentul nu a fost generat încă"
+        )
+    items = [_generated_version(document) for document in versions]
+    return GeneratedDocumentHistory(reference_number=reference_number, latest=items[0], versions=items)
+
+
+@router.get("/generated-documents/{reference_number}/download")
+async def download_generated_document(
+    reference_number: str,
+    request: Request,
+    version: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Descarcă ultima versiune a documentului generat (sau versiunea cerută)"""
+    if version is None:
+        document = await generated_documents.latest(db, reference_number)
+    else:
+        document = await generated_documents.get_version(db, reference_number, version)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Documentul nu a fost găsit"
+        )
+    
+    return await file_download_response(
+        request,
+        Path(generated_documents.root) / document.storage_path,
+        filename=document.file_name,
+        media_type=document.mime_type,
+        # O versiune anume nu se mai schimbă; ultima poate fi înlocuită de o nouă generare
+        cache_control=(
+            "private, max-age=31536000, immutable" if version is not None
+            else "private, max-age=0, must-revalidate"
+        ),
+        extra_headers={"X-Document-Version": str(document.version)}
+    )
+
+
+# ========== ȘABLOANE DOCUMENTE OFICIALE ==========
+
+@router.get("/document-templates", response_model=List[DocumentTemplateInfo])
+async def list_document_templates(
+    db: AsyncSession = Depends(get_async_session),
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """Șabloanele documentelor oficiale și originea lor (aplicație, disc sau DB)"""
+    overrides = await document_template_store.get(db)
+    document_templates.set_overrides(overrides)
+    names = sorted(set(document_templates.names()) | {STYLESHEET} | set(overrides))
+    templates = []
+    for name in names:
+        _, origin = document_templates.source(name)
+        templates.append(DocumentTemplateInfo(
+            name=name,
+            origin=origin,
+            updated_at=overrides[name][1] if name in overrides else None
+        ))
+    return templates
+
+
+@router.get("/document-templates/{name}", response_model=DocumentTemplateSource)
+async def get_document_template(
+    name: str,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """Sursa curentă a unui șablon"""
+    document_templates.set_overrides(await document_template_store.get(db))
+    try:
+        content, origin = document_templates.source(name)
+    except TemplateNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Șablonul nu a fost găsit")
+    return DocumentTemplateSource(name=name, origin=origin, content=content)
+
+
+@router.put("/document-templates/{name}", response_model=DocumentTemplateSource)
+async def update_document_template(
+    name: str,
+    template_data: DocumentTemplateUpdate,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """Salvează un șablon în DB; are prioritate față de cel de pe disc pe toate worker-ele"""
+    if not DOCUMENT_TEMPLATE_NAME.fullmatch(name):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Numele șablonului trebuie să fie de forma tip-document.html sau documents.css"
+        )
+    error = document_templates.validate(name, template_data.content)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Șablon invalid: {error}")
+    
+    result = await db.execute(select(DocumentTemplate).where(DocumentTemplate.name == name))
+    template = result.scalar_one_or_none()
+    if template is None:
+        template = DocumentTemplate(name=name, content=template_data.content)
+        db.add(template)
+    template.content = template_data.content
+    template.is_active = True
+    template.updated_by = current_user.id
+    await db.commit()
+    await document_template_store.publish()
+    
+    return DocumentTemplateSource(name=name, origin="db", content=template_data.content)
+
+
+@router.delete("/document-templates/{name}")
+async def delete_document_template(
+    name: str,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: AdminUser = Depends(get_current_active_admin)
+):
+    """Renunță la șablonul din DB; se revine la cel de pe disc"""
+    result = await db.execute(select(DocumentTemplate).where(DocumentTemplate.name == name))
+    template = result.scalar_one_or_none()
+    if template is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Șablonul nu a fost găsit")
+    await db.delete(template)
+    await db.commit()
+    await document_template_store.publish()
+    return {"message": "Șablonul a fost șters; se folosește versiunea de pe disc"}
+
+
 # ========== CATEGORII SESIZĂRI ==========
 
 @router.get("/complaint-categories", response_model=List[ComplaintCategorySchema])
@@ -323,9 +654,12 @@ async def create_complaint(
 ):
     """Creează o sesizare nouă"""
     # Verifică dacă categoria există și este activă
-    category = db.query(ComplaintCategory).filter(
-        and_(ComplaintCategory.id == complaint.category_id, ComplaintCategory.is_active == True)
-    ).first()
+    result = await db.execute(
+        select(ComplaintCategory).where(
+            and_(ComplaintCategory.id == complaint.category_id, ComplaintCategory.is_active == True)
+        )
+    )
+    category = result.scalar_one_or_none()
     
     if not category:
         raise HTTPException(
@@ -336,8 +670,10 @@ async def create_complaint(
     # Generează numărul de referință
     reference_number = generate_reference_number("SESIZARE")
     
-    # Creează sesizarea
+    # Creează sesizarea; fișierele atașate vin ca tokenuri de upload
     complaint_data = complaint.dict()
+    complaint_data["attached_photos"] = paths_from_upload_tokens(complaint.attached_photos) or None
+    complaint_data["attached_documents"] = paths_from_upload_tokens(complaint.attached_documents) or None
     db_complaint = Complaint(
         **complaint_data,
         reference_number=reference_number,
@@ -348,8 +684,14 @@ async def create_complaint(
     db_complaint.set_data_retention(years=5)
     
     db.add(db_complaint)
-    db.commit()
-    db.refresh(db_complaint)
+    await db.flush()
+    await blob_store.acquire(
+        db,
+        (db_complaint.attached_photos or []) + (db_complaint.attached_documents or []),
+        owner=("complaint", db_complaint.id)
+    )
+    await db.commit()
+    await db.refresh(db_complaint)
     
     logger.info(f"Created complaint: {reference_number} in category {category.name}")
     
@@ -704,6 +1046,11 @@ async def upload_file(
         
         return FileUploadResponse(**file_info)
         
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error uploading file: {str(e)}")
         raise HTTPException(
@@ -713,7 +1060,7 @@ async def upload_file(
 
 
 @router.get("/files/{file_path}")
-async def download_file(file_path: str):
+async def download_file(file_path: str, request: Request):
     """Download fișiere încărcate"""
     # Construiește calea completă și verifică securitatea
     safe_path = os.path.join("uploads", file_path)
@@ -725,7 +1072,8 @@ async def download_file(file_path: str):
             detail="Fișierul nu a fost găsit"
         )
     
-    return FileResponse(
-        path=safe_path,
+    return await file_download_response(
+        request,
+        Path(safe_path),
         filename=os.path.basename(file_path)
-    )
\ No newline at end of file
+    )
@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, desc
 
+from ...core.cache import cache, cached
 from ...core.database import get_async_session
 from ...models.admin import AdminUser
 from ...models.forms import FormType, FormSubmission, ComplaintCategory, Complaint
@@ -14,6 +15,9 @@ from ..endpoints.auth import get_current_user
 
 router = APIRouter()
 
+# Statisticile pentru dashboard sunt cache-uite și invalidate la schimbarea statusului
+FORM_SUBMISSIONS_CACHE_TAG = "form_submissions"
+
 @router.get("/form-submissions")
 async def get_form_submissions(
     limit: int = Query(50, ge=1, le=100, description="Maximum number of submissions to return"),
@@ -55,6 +59,7 @@ async def get_form_submissions(
 
 
 @router.get("/form-submissions/stats")
+@cached(ttl=60, tags=(FORM_SUBMISSIONS_CACHE_TAG,))
 async def get_form_submission_stats(
     current_user: AdminUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_session)
@@ -168,6 +173,7 @@ async def quick_approve_submission(
     submission.assigned_to = current_user.id
     
     await db.commit()
+    await cache.invalidate_tags(FORM_SUBMISSIONS_CACHE_TAG)
     
     return {
         "message": "Submission approved successfully",
@@ -207,5 +213,6 @@ async def update_submission_status(
             submission.processing_notes = status_data["notes"]
     
     await db.commit()
+    await cache.invalidate_tags(FORM_SUBMISSIONS_CACHE_TAG)
     
     return {"message": "Status updated successfully"}
\ No newline at end of file
@@ -2,13 +2,15 @@
 Endpoint-uri pentru Monitorul Oficial Local (MOL)
 """
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, extract, desc, and_, or_
 from sqlalchemy.orm import selectinload
 from datetime import datetime, date
 
 from ...core.database import get_async_session
+from ...core.cache import cached
+from ...core.http_cache import response_cache, MOL_CACHE_TAG
 from ...models.documents import MOLCategory, MOLDocument
 from ...schemas.mol import (
     MOLCategory as MOLCategorySchema,
@@ -29,13 +31,22 @@ router = APIRouter()
 
 @router.get("/categories", response_model=List[MOLCategoryWithDocuments])
 async def get_mol_categories(
+    request: Request,
     include_documents: bool = Query(False, description="Include documentele pentru fiecare categorie"),
     db: AsyncSession = Depends(get_async_session)
 ):
     """
     Obține toate categoriile MOL cu numărul de documente
     """
-    
+    return await response_cache.respond(
+        request,
+        lambda: _load_mol_categories(db, include_documents),
+        tags=(MOL_CACHE_TAG,),
+        response_model=List[MOLCategoryWithDocuments]
+    )
+
+
+async def _load_mol_categories(db: AsyncSession, include_documents: bool) -> List[Dict[str, Any]]:
     query = select(MOLCategory).order_by(MOLCategory.section_order, MOLCategory.name)
     
     if include_documents:
@@ -302,6 +313,7 @@ async def get_mol_document(
 
 
 @router.get("/stats", response_model=MOLStats)
+@cached(ttl=300, tags=(MOL_CACHE_TAG,))
 async def get_mol_stats(
     db: AsyncSession = Depends(get_async_session)
 ):
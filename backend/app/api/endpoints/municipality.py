@@ -8,7 +8,6 @@ from sqlalchemy import select
 
 from ...core.database import get_async_session
 from ...models.municipality import MunicipalityConfig
-from ...models.admin import AdminAuditLog
 from ...schemas.municipality import (
     MunicipalityConfigResponse,
     MunicipalityConfigUpdate,
@@ -16,34 +15,34 @@ from ...schemas.municipality import (
 )
 from ..endpoints.auth import get_current_active_admin
 from ...models.admin import AdminUser
+from ...services.audit_service import audit_logger
+from ...core.http_cache import response_cache, MUNICIPALITY_CACHE_TAG
+from ...services.municipality_config_service import municipality_config_store, create_default_config
 
 router = APIRouter()
 
 
 @router.get("/config", response_model=MunicipalityConfigResponse)
 async def get_municipality_config(
+    request: Request,
     db: AsyncSession = Depends(get_async_session)
 ):
     """
     Obține configurația curentă a primăriei
     Endpoint public pentru frontend
     """
-    result = await db.execute(select(MunicipalityConfig))
-    config = result.scalar_one_or_none()
-    
-    if not config:
-        # Creează o configurație implicită dacă nu există
-        config = MunicipalityConfig.create_default_config(
-            name="Primăria Exemplu",
-            official_name="Comuna Exemplu, Județul Exemplu", 
-            county="Exemplu",
-            address="Strada Principală nr. 1, Comuna Exemplu"
-        )
-        db.add(config)
-        await db.commit()
-        await db.refresh(config)
-    
-    return config
+    return await response_cache.respond(
+        request,
+        lambda: _load_snapshot_part(db, "values"),
+        tags=(MUNICIPALITY_CACHE_TAG,),
+        response_model=MunicipalityConfigResponse
+    )
+
+
+async def _load_snapshot_part(db: AsyncSession, part: str) -> dict:
+    # Dacă nu există configurație se servește cea implicită, fără a o salva
+    snapshot = await municipality_config_store.get(db)
+    return getattr(snapshot, part)
 
 
 @router.put("/config", response_model=MunicipalityConfigResponse)
@@ -61,10 +60,9 @@ async def update_municipality_config(
     config = result.scalar_one_or_none()
     
     if not config:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Configurația primăriei nu a fost găsită"
-        )
+        # Prima salvare pornește de la configurația implicită afișată până acum
+        config = create_default_config()
+        db.add(config)
     
     # Salvarea valorilor vechi pentru audit
     old_values = {
@@ -84,8 +82,11 @@ async def update_municipality_config(
     for field, value in update_data.items():
         setattr(config, field, value)
     
+    await db.commit()
+    await db.refresh(config)
+
     # Log audit pentru modificare
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="update",
         resource_type="municipality_config",
@@ -95,10 +96,7 @@ async def update_municipality_config(
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
-    await db.refresh(config)
+    await municipality_config_store.publish(config)
     
     return config
 
@@ -128,106 +126,67 @@ async def create_municipality_config(
     config = MunicipalityConfig(**config_create.dict())
     db.add(config)
     
+    await db.commit()
+    await db.refresh(config)
+
     # Log audit pentru creare
-    audit_log = AdminAuditLog.create_log(
+    await audit_logger.log(
         user_id=current_user.id,
         action="create",
         resource_type="municipality_config",
+        resource_id=str(config.id),
         new_values=config_create.dict(),
         ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent")
     )
-    db.add(audit_log)
-    
-    await db.commit()
-    await db.refresh(config)
+    await municipality_config_store.publish(config)
     
     return config
 
 
 @router.get("/info")
 async def get_public_info(
+    request: Request,
     db: AsyncSession = Depends(get_async_session)
 ):
     """
     Obține informațiile publice ale primăriei
     Endpoint optimizat pentru afișarea pe site
     """
-    result = await db.execute(select(MunicipalityConfig))
-    config = result.scalar_one_or_none()
-    
-    if not config:
-        return {
-            "name": "Primăria Exemplu",
-            "official_name": "Comuna Exemplu, Județul Exemplu",
-            "county": "Exemplu"
-        }
-    
-    return {
-        "name": config.name,
-        "official_name": config.official_name,
-        "county": config.county,
-        "mayor_name": config.mayor_name,
-        "contact_info": config.contact_info,
-        "working_hours": config.get_working_hours_display(),
-        "audience_hours": config.get_audience_hours_display(),
-        "brand_colors": config.brand_colors,
-        "logo_url": config.logo_url,
-        "coat_of_arms_url": config.coat_of_arms_url,
-        "website_url": config.website_url
-    }
+    return await response_cache.respond(
+        request,
+        lambda: _load_snapshot_part(db, "public_info"),
+        tags=(MUNICIPALITY_CACHE_TAG,)
+    )
 
 
 @router.get("/contact")
 async def get_contact_info(
+    request: Request,
     db: AsyncSession = Depends(get_async_session)
 ):
     """
     Obține doar informațiile de contact
     Pentru pagina de contact și footer
     """
-    result = await db.execute(select(MunicipalityConfig))
-    config = result.scalar_one_or_none()
-    
-    if not config:
-        return {
-            "message": "Informațiile de contact nu sunt configurate"
-        }
-    
-    return {
-        "contact_email": config.contact_email,
-        "contact_phone": config.contact_phone,
-        "fax": config.fax,
-        "address": config.full_address,
-        "working_hours": config.get_working_hours_display(),
-        "audience_hours": config.get_audience_hours_display()
-    }
+    return await response_cache.respond(
+        request,
+        lambda: _load_snapshot_part(db, "contact_info"),
+        tags=(MUNICIPALITY_CACHE_TAG,)
+    )
 
 
 @router.get("/branding")
 async def get_branding_info(
+    request: Request,
     db: AsyncSession = Depends(get_async_session)
 ):
     """
     Obține informațiile de branding pentru frontend
     Culori, logo, etc.
     """
-    result = await db.execute(select(MunicipalityConfig))
-    config = result.scalar_one_or_none()
-    
-    if not config:
-        return {
-            "primary_color": "#004990",
-            "secondary_color": "#0079C1",
-            "logo_url": None,
-            "coat_of_arms_url": None
-        }
-    
-    return {
-        "primary_color": config.primary_color,
-        "secondary_color": config.secondary_color,
-        "logo_url": config.logo_url,
-        "coat_of_arms_url": config.coat_of_arms_url,
-        "name": config.name,
-        "official_name": config.official_name
-    }
\ No newline at end of file
+    return await response_cache.respond(
+        request,
+        lambda: _load_snapshot_part(db, "branding"),
+        tags=(MUNICIPALITY_CACHE_TAG,)
+    )
@@ -0,0 +1,156 @@
+"""
+Scriitor asincron în lot: coadă limitată în memorie + consumator de fundal
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncBatchWriter(Generic[T]):
+    """
+    Primește elemente într-o coadă limitată și le scrie în loturi dintr-o
+    sarcină de fundal. Un lot pleacă la batch_size elemente sau după
+    flush_interval secunde, oricare vine primul. La oprire coada este golită.
+
+    Subclasele implementează write_batch().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_queue_size: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0
+    ):
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "asyncio.Queue[T]" = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrici
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed_batches = 0
+        self.last_batch_size = 0
+        self.last_batch_seconds = 0.0
+
+    async def write_batch(self, items: List[T]) -> None:
+        """Scrie un lot de elemente (de suprascris în subclase)"""
+        raise NotImplementedError
+
+    # ---------- producători ----------
+
+    def submit_nowait(self, item: T) -> bool:
+        """Adaugă fără așteptare; returnează False (și contorizează) dacă coada e plină"""
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    async def submit(self, item: T, timeout: Optional[float] = None) -> bool:
+        """
+        Adaugă cu backpressure: așteaptă loc în coadă cel mult `timeout` secunde.
+        Returnează False dacă timpul a expirat (apelantul decide ce face cu elementul).
+        """
+        try:
+            if timeout is None:
+                await self._queue.put(item)
+            else:
+                await asyncio.wait_for(self._queue.put(item), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.enqueued += 1
+        return True
+
+    # ---------- ciclul de viață ----------
+
+    async def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._consume(), name=self.name)
+        logger.info(f"Scriitorul în lot '{self.name}' a pornit")
+
+    async def stop(self):
+        """Oprește consumatorul și scrie tot ce a rămas în coadă"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while not self._queue.empty():
+            await self._write(self._drain(self.batch_size))
+
+        logger.info(f"Scriitorul în lot '{self.name}' oprit ({self.written} elemente scrise)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "queue_size": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed_batches": self.failed_batches,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_ms": round(self.last_batch_seconds * 1000, 2),
+        }
+
+    # ---------- intern ----------
+
+    def _drain(self, limit: int) -> List[T]:
+        items: List[T] = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return items
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Așteaptă primul element, apoi adună până la batch_size sau expirarea intervalului
+            first = await self._queue.get()
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                batch.extend(self._drain(self.batch_size - len(batch)))
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._write(batch)
+
+    async def _write(self, batch: List[T]):
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            await self.write_batch(batch)
+            self.written += len(batch)
+        except Exception:
+            self.failed_batches += 1
+            logger.exception(f"Eroare la scrierea unui lot de {len(batch)} elemente în '{self.name}'")
+        finally:
+            self.last_batch_size = len(batch)
+            self.last_batch_seconds = time.perf_counter() - started
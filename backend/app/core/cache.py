@@ -0,0 +1,551 @@
+"""
+Cache pe două niveluri: L1 LRU în memoria worker-ului și L2 partajat (Redis)
+
+- TTL per intrare (L1 păstrează intrările cel mult CACHE_L1_TTL secunde)
+- protecție la stampede: o singură recalculare per cheie în worker (single-flight)
+  și un lock scurt în Redis între worker-e
+- invalidare pe etichete, propagată către L1-ul celorlalte worker-e prin pub/sub
+- decoratorul @cached pentru funcții async din servicii și endpoint-uri
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import pickle
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import get_settings
+from .tasks import background_services
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis este opțional; fără el se folosește L2 în memorie
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_MISSING = object()
+
+# Argumente care nu influențează rezultatul și nu intră în cheia de cache
+CONTEXT_ARGUMENTS = {"db", "session", "request", "current_user"}
+
+
+# ====================================================================
+# L1 - LRU ÎN MEMORIE
+# ====================================================================
+
+class LocalLRUCache:
+    """LRU cu TTL și index de etichete; valorile sunt păstrate serializate"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, float, FrozenSet[str]]]" = OrderedDict()
+        self._tag_index: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()):
+        self.delete(key)
+        tags = frozenset(tags)
+        self._entries[key] = (value, time.monotonic() + ttl, tags)
+        for tag in tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self.delete(next(iter(self._entries)))
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        for tag in tags:
+            for key in list(self._tag_index.get(tag, ())):
+                self.delete(key)
+                removed += 1
+        return removed
+
+    def clear(self):
+        self._entries.clear()
+        self._tag_index.clear()
+
+
+# ====================================================================
+# L2 - BACKEND-URI PARTAJATE
+# ====================================================================
+
+class InMemoryBackend:
+    """
+    Înlocuitor în memorie pentru Redis (teste, dezvoltare, Redis indisponibil).
+    Partajat doar în interiorul procesului.
+    """
+
+    def __init__(self, sweep_interval: float = 60.0):
+        # Etichetele stau lângă valoare, ca în L1: orice eliminare curăță și indexul
+        self._values: Dict[str, Tuple[bytes, float, FrozenSet[str]]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._locks: Dict[str, float] = {}
+        self._subscribers: List["asyncio.Queue[dict]"] = []
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            self._remove(key)
+            return None
+        return entry[0]
+
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()):
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        self._remove(key)
+        tags = frozenset(tags)
+        self._values[key] = (value, now + ttl, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._remove(key)
+
+    async def invalidate_tags(self, tags: Iterable[str]):
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+
+    def _remove(self, key: str):
+        entry = self._values.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _sweep(self, now: float):
+        """Elimină intrările expirate care nu mai sunt citite (și lock-urile expirate)"""
+        for key in [key for key, entry in self._values.items() if entry[1] <= now]:
+            self._remove(key)
+        for key in [key for key, expires_at in self._locks.items() if expires_at <= now]:
+            del self._locks[key]
+        self._next_sweep = now + self.sweep_interval
+
+    async def acquire_lock(self, key: str, ttl: float) -> bool:
+        now = time.monotonic()
+        if self._locks.get(key, 0) > now:
+            return False
+        self._locks[key] = now + ttl
+        return True
+
+    async def release_lock(self, key: str):
+        self._locks.pop(key, None)
+
+    async def publish(self, message: dict):
+        for queue in self._subscribers:
+            queue.put_nowait(message)
+
+    async def listen(self):
+        queue: "asyncio.Queue[dict]" = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.remove(queue)
+
+    async def close(self):
+        pass
+
+
+class RedisBackend:
+    """L2 în Redis: valori cu PX, seturi pentru etichete, lock-uri SET NX, pub/sub"""
+
+    def __init__(self, url: str, namespace: str = "cache"):
+        self.namespace = namespace
+        self.channel = f"{namespace}:invalidate"
+        self._redis = aioredis.from_url(url)
+
+    def _value_key(self, key: str) -> str:
+        return f"{self.namespace}:v:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:t:{tag}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(self._value_key(key))
+
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()):
+        value_key = self._value_key(key)
+        ttl_ms = max(int(ttl * 1000), 1)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.set(value_key, value, px=ttl_ms)
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                pipe.sadd(tag_key, value_key)
+                # Setul trăiește cel puțin cât cea mai lungă intrare din el
+                pipe.pexpire(tag_key, ttl_ms, nx=True)
+                pipe.pexpire(tag_key, ttl_ms, gt=True)
+            await pipe.execute()
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._redis.delete(*(self._value_key(key) for key in keys))
+
+    async def invalidate_tags(self, tags: Iterable[str]):
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            members = await self._redis.smembers(tag_key)
+            async with self._redis.pipeline(transaction=False) as pipe:
+                if members:
+                    pipe.delete(*members)
+                pipe.delete(tag_key)
+                await pipe.execute()
+
+    async def acquire_lock(self, key: str, ttl: float) -> bool:
+        lock_key = f"{self.namespace}:l:{key}"
+        return bool(await self._redis.set(lock_key, b"1", nx=True, px=max(int(ttl * 1000), 1)))
+
+    async def release_lock(self, key: str):
+        await self._redis.delete(f"{self.namespace}:l:{key}")
+
+    async def publish(self, message: dict):
+        await self._redis.publish(self.channel, json.dumps(message))
+
+    async def listen(self):
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    yield json.loads(message["data"])
+                except (TypeError, ValueError):
+                    continue
+        finally:
+            await pubsub.unsubscribe(self.channel)
+            await pubsub.close()
+
+    async def close(self):
+        await self._redis.close()
+
+
+# ====================================================================
+# CACHE PE DOUĂ NIVELURI
+# ====================================================================
+
+class TwoTierCache:
+    """
+    Citire: L1 -> L2 -> loader. Scriere: L2 și L1.
+    Invalidarea pe etichete șterge din L2 și publică un mesaj pe care
+    celelalte worker-e îl folosesc pentru a-și curăța L1.
+    """
+
+    def __init__(
+        self,
+        backend: Union[InMemoryBackend, "RedisBackend"],
+        default_ttl: float = 300,
+        l1_ttl: float = 30,
+        l1_max_entries: int = 2048,
+        lock_timeout: float = 5.0
+    ):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.l1_ttl = l1_ttl
+        self.lock_timeout = lock_timeout
+        self.l1 = LocalLRUCache(l1_max_entries)
+        self.instance_id = uuid.uuid4().hex
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._invalidation_callbacks: List[Callable[[Iterable[str], Iterable[str]], None]] = []
+
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.l2_errors = 0
+
+    # ---------- operații de bază ----------
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        value = await self._get_raw(key)
+        return default if value is None else pickle.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        await self._set_raw(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ttl, tags)
+
+    async def delete(self, key: str):
+        self.l1.delete(key)
+        self._notify((), (key,))
+        await self._l2("delete", key)
+        await self._publish({"keys": [key]})
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = ()
+    ) -> Any:
+        """Returnează valoarea din cache sau o calculează o singură dată"""
+        raw = await self._get_raw(key)
+        if raw is not None:
+            return pickle.loads(raw)
+
+        # Single-flight în worker: cererile concurente așteaptă același calcul
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                return pickle.loads(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # Cererea care calcula a fost anulată; calculăm noi
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            raw = await self._load_with_lock(key, loader, ttl, tags)
+            future.set_result(raw)
+            return pickle.loads(raw)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Evităm avertismentul "exception was never retrieved" dacă nu așteaptă nimeni
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def invalidate_tags(self, *tags: str):
+        """Invalidează etichetele în L2, în L1-ul local și în L1-ul celorlalte worker-e"""
+        if not tags:
+            return
+        self.l1.invalidate_tags(tags)
+        self._notify(tags, ())
+        await self._l2("invalidate_tags", tags)
+        await self._publish({"tags": list(tags)})
+
+    def on_invalidate(self, callback: Callable[[Iterable[str], Iterable[str]], None]):
+        """
+        Înregistrează un callback (tags, keys) apelat la fiecare invalidare,
+        locală sau primită de la alt worker. Util pentru cache-uri locale
+        care nu trec prin L2, dar au nevoie de semnalul de invalidare.
+        Eticheta "*" înseamnă că tot conținutul local trebuie golit.
+        """
+        self._invalidation_callbacks.append(callback)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "l1_entries": len(self.l1),
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "l2_errors": self.l2_errors,
+            "inflight": len(self._inflight),
+        }
+
+    # ---------- ciclul de viață (ascultătorul de invalidări) ----------
+
+    async def start(self):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen(), name="cache-invalidation-listener")
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.backend.close()
+
+    # ---------- intern ----------
+
+    async def _get_raw(self, key: str) -> Optional[bytes]:
+        value = self.l1.get(key)
+        if value is not None:
+            self.l1_hits += 1
+            return value
+
+        value = await self._l2("get", key)
+        if value is not None:
+            self.l2_hits += 1
+            # Nu cunoaștem TTL-ul rămas în L2, deci L1 păstrează doar fereastra scurtă
+            self.l1.set(key, value, self.l1_ttl)
+            return value
+
+        self.misses += 1
+        return None
+
+    async def _set_raw(self, key: str, value: bytes, ttl: Optional[float], tags: Iterable[str]):
+        ttl = self.default_ttl if ttl is None else ttl
+        tags = tuple(tags)
+        await self._l2("set", key, value, ttl, tags)
+        self.l1.set(key, value, min(ttl, self.l1_ttl), tags)
+
+    async def _load_with_lock(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float],
+        tags: Iterable[str]
+    ) -> bytes:
+        """Între worker-e: cine obține lock-ul calculează, ceilalți așteaptă rezultatul în L2"""
+        locked = await self._l2("acquire_lock", key, self.lock_timeout)
+        if locked is False:
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                value = await self._l2("get", key)
+                if value is not None:
+                    self.l1.set(key, value, self.l1_ttl, tags)
+                    return value
+            # Deținătorul lock-ului a eșuat sau e prea lent; calculăm și noi
+
+        try:
+            raw = pickle.dumps(await loader(), protocol=pickle.HIGHEST_PROTOCOL)
+            await self._set_raw(key, raw, ttl, tags)
+            return raw
+        finally:
+            if locked:
+                await self._l2("release_lock", key)
+
+    async def _l2(self, operation: str, *args):
+        """Apel către L2; dacă L2 nu e disponibil continuăm doar cu L1"""
+        try:
+            return await getattr(self.backend, operation)(*args)
+        except Exception as e:
+            self.l2_errors += 1
+            logger.warning(f"Cache L2 indisponibil ({operation}): {e}")
+            return None
+
+    def _notify(self, tags: Iterable[str], keys: Iterable[str]):
+        for callback in self._invalidation_callbacks:
+            try:
+                callback(tags, keys)
+            except Exception:
+                logger.exception("Eroare în callback-ul de invalidare cache")
+
+    async def _publish(self, message: dict):
+        await self._l2("publish", {**message, "origin": self.instance_id})
+
+    async def _listen(self):
+        while True:
+            try:
+                async for message in self.backend.listen():
+                    if message.get("origin") == self.instance_id:
+                        continue
+                    tags = message.get("tags") or ()
+                    keys = message.get("keys") or ()
+                    self.l1.invalidate_tags(tags)
+                    for key in keys:
+                        self.l1.delete(key)
+                    self._notify(tags, keys)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Fără mesaje de invalidare, L1 se bazează doar pe TTL-ul scurt
+                logger.warning(f"Ascultătorul de invalidări cache s-a oprit: {e}; reîncercare")
+                # Putem pierde mesaje cât timp nu suntem abonați, deci golim tot ce e local
+                self.l1.clear()
+                self._notify(("*",), ())
+                await asyncio.sleep(5)
+
+
+# ====================================================================
+# DECORATOR
+# ====================================================================
+
+def _cache_key(prefix: str, arguments: Dict[str, Any]) -> str:
+    relevant = sorted(
+        (name, value) for name, value in arguments.items()
+        if name not in CONTEXT_ARGUMENTS and not isinstance(value, AsyncSession)
+    )
+    digest = hashlib.sha1(repr(relevant).encode("utf-8")).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def cached(
+    ttl: Optional[float] = None,
+    tags: Iterable[str] = (),
+    key_prefix: Optional[str] = None
+):
+    """
+    Decorator pentru funcții async. Cheia se formează din numele funcției și
+    argumente, ignorând sesiunea DB, request-ul și utilizatorul curent.
+    Funcționează și pe endpoint-uri FastAPI (semnătura este păstrată).
+    """
+    tags = tuple(tags)
+
+    def decorator(func):
+        prefix = key_prefix or f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = _cache_key(prefix, bound.arguments)
+            return await cache.get_or_set(key, lambda: func(*args, **kwargs), ttl=ttl, tags=tags)
+
+        return wrapper
+
+    return decorator
+
+
+def _create_backend():
+    if settings.CACHE_BACKEND == "redis":
+        if aioredis is None:
+            logger.warning("Pachetul redis nu este instalat; cache-ul L2 folosește memoria procesului")
+        else:
+            return RedisBackend(settings.REDIS_URL, namespace=settings.CACHE_NAMESPACE)
+    return InMemoryBackend()
+
+
+# Instanța globală per worker
+cache = background_services.register(
+    TwoTierCache(
+        _create_backend(),
+        default_ttl=settings.CACHE_DEFAULT_TTL,
+        l1_ttl=settings.CACHE_L1_TTL,
+        l1_max_entries=settings.CACHE_L1_MAX_ENTRIES,
+        lock_timeout=settings.CACHE_LOCK_TIMEOUT
+    )
+)
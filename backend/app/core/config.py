@@ -47,6 +47,44 @@ class Settings(BaseSettings):
     # File Upload
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB, memoria folosită per upload
+    BULK_UPLOAD_CONCURRENCY: int = 4  # fișiere salvate simultan la upload-ul în masă
+    RESUMABLE_UPLOAD_MAX_SIZE: int = 1024 * 1024 * 1024  # 1GB, upload-uri în fragmente (scanări, anexe)
+    RESUMABLE_UPLOAD_EXPIRE_HOURS: int = 24  # un upload neterminat expiră după atâtea ore fără fragmente
+    # Livrarea descărcărilor: "direct" (worker-ul trimite fișierul) sau "x-accel" (nginx, vezi nginx.conf)
+    FILE_DELIVERY_MODE: str = "direct"
+    FILE_DELIVERY_X_ACCEL_PREFIX: str = "/internal/uploads/"  # locația internă nginx mapată pe UPLOAD_DIR
+    FILE_DELIVERY_CHUNK_SIZE: int = 256 * 1024  # în modul direct, fără zerocopysend
+    BLOB_GC_INTERVAL: int = 3600  # secunde între colectările fișierelor fără referințe
+    BLOB_UNREFERENCED_GRACE_HOURS: int = 24  # cât se păstrează un fișier încărcat dar neatașat
+    BLOB_GC_BATCH_SIZE: int = 500
+    STORAGE_MANIFEST_BATCH_SIZE: int = 1000  # fișiere per lot la reconstruirea manifestului și la reconciliere
+    STORAGE_RECONCILE_GRACE_HOURS: int = 24  # fișierele mai noi nu sunt considerate orfane
+    IMAGE_PROCESS_WORKERS: int = 2  # procese pentru thumbnail-uri și optimizare
+    IMAGE_PROCESS_MAX_WAITING: int = 32  # peste limită, procesarea trece în coada persistentă
+    PDF_RENDER_WORKERS: int = 2  # procese pentru generarea PDF-urilor (fonturile se încarcă o dată per proces)
+    PDF_RENDER_MAX_WAITING: int = 64  # peste limită, generarea răspunde 503
+    PDF_FONT_DIR: Optional[str] = None  # fonturi suplimentare (.ttf/.otf) pentru documentele oficiale
+    DOCUMENT_TEMPLATE_DIR: Optional[str] = None  # șabloane de documente care le înlocuiesc pe cele livrate
+    DOCUMENT_TEMPLATE_CACHE_DIR: Optional[str] = None  # bytecode-ul compilat al șabloanelor (implicit în /tmp)
+    DOCUMENT_TEMPLATE_AUTO_RELOAD: bool = True  # șabloanele modificate pe disc se recompilează fără repornire
+    GENERATED_DOCUMENT_KEEP_VERSIONS: int = 5  # versiuni păstrate per număr de referință (ultima nu se șterge)
+    GENERATED_DOCUMENT_RETENTION_DAYS: int = 365  # versiunile înlocuite mai vechi se șterg (0 = fără limită de vârstă)
+    DOCUMENT_BATCH_MAX_SIZE: int = 500  # cereri per generare în lot
+    DOCUMENT_BATCH_CONCURRENCY: int = 2  # documente randate simultan de o generare în lot
+    DOCUMENT_BATCH_ARCHIVE_HOURS: int = 72  # arhivele ZIP/PDF combinate se șterg după atâtea ore
+    IMAGE_VARIANT_DIR: str = "generated/image-variants"
+    IMAGE_VARIANT_CACHE_MAX_MB: int = 1024  # peste limită se șterg variantele folosite cel mai demult
+    IMAGE_VARIANT_WIDTHS: List[int] = [160, 320, 480, 640, 960, 1280, 1920]  # lățimea cerută se rotunjește în sus
+    IMAGE_VARIANT_PREGENERATE_WIDTHS: List[int] = []  # generate la upload (WebP), ex. [320, 640, 1280]
+    IMAGE_VARIANT_DEFAULT_QUALITY: int = 80
+    IMAGE_VARIANT_EVICT_INTERVAL: int = 600  # secunde între verificările dimensiunii cache-ului
+    
+    # Sarcini de fundal (tabela background_jobs)
+    JOB_POLL_INTERVAL: int = 5
+    JOB_CONCURRENCY: int = 2  # sarcini simultane per worker
+    JOB_STALE_AFTER: int = 600  # o sarcină "running" mai veche este considerată întreruptă
+    JOB_MAX_ATTEMPTS: int = 3
     ALLOWED_FILE_TYPES: List[str] = [
         "image/jpeg", "image/png", "image/gif", "image/webp",
         "application/pdf", "application/msword",
@@ -74,6 +112,55 @@ class Settings(BaseSettings):
     PROMETHEUS_ENABLED: bool = False
     LOG_LEVEL: str = "INFO"
     
+    # Statistici vizualizări anunțuri (scriere în lot)
+    ANNOUNCEMENT_VIEWS_FLUSH_INTERVAL: int = 30  # seconds
+    ANNOUNCEMENT_VIEWS_DEDUP_WINDOW: int = 1800  # seconds, 0 = fără deduplicare
+
+    # Vizualizări pagini (coadă + inserări în lot)
+    PAGE_VIEWS_SAMPLE_RATE: float = 1.0  # fracțiunea de hit-uri păstrate ca rânduri în page_views
+    PAGE_VIEWS_QUEUE_SIZE: int = 50_000
+    PAGE_VIEWS_BATCH_SIZE: int = 1000
+    PAGE_VIEWS_FLUSH_INTERVAL: float = 2.0  # seconds
+    PAGE_VIEWS_MAX_URLS_PER_DAY: int = 2000  # paginile noi peste limită se adună la OTHER_PAGES_URL
+
+    # Jurnal de audit (scriere asincronă în lot)
+    AUDIT_LOG_QUEUE_SIZE: int = 10_000
+    AUDIT_LOG_BATCH_SIZE: int = 200
+    AUDIT_LOG_FLUSH_INTERVAL: float = 1.0  # seconds
+    AUDIT_LOG_ENQUEUE_TIMEOUT: float = 2.0  # seconds, apoi scriere directă
+
+    # Cache pe două niveluri (L1 în worker, L2 partajat)
+    CACHE_BACKEND: str = "redis"  # redis | memory
+    CACHE_NAMESPACE: str = "primarie"
+    CACHE_DEFAULT_TTL: int = 300  # seconds
+    CACHE_L1_TTL: int = 30  # seconds, limita de viață în memoria worker-ului
+    CACHE_L1_MAX_ENTRIES: int = 2048
+    CACHE_LOCK_TIMEOUT: float = 5.0  # seconds, așteptarea altui worker care recalculează
+
+    # Cache HTTP pentru endpoint-urile publice (ETag/304)
+    HTTP_CACHE_TTL: int = 60  # seconds, în cache-ul aplicației
+    HTTP_CACHE_MAX_AGE: int = 30  # seconds, Cache-Control pentru nginx/browser
+
+    # Cache pentru sesiunile autentificate (get_current_user)
+    AUTH_SESSION_CACHE_TTL: int = 30  # seconds, 0 = dezactivat
+    AUTH_SESSION_CACHE_MAX_ENTRIES: int = 4096
+
+    # Curățarea sesiunilor admin expirate
+    ADMIN_SESSION_PRUNE_INTERVAL: int = 3600  # seconds
+    ADMIN_SESSION_PRUNE_BATCH_SIZE: int = 1000
+    ADMIN_SESSION_REVOKED_RETENTION_DAYS: int = 7
+
+    # Hash-uirea parolelor (bcrypt în pool de thread-uri)
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # hash-urile mai slabe sunt refăcute la login
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_WAITING: int = 64  # peste limită, login-ul răspunde 503
+
+    # sitemap.xml pentru motoarele de căutare
+    SITEMAP_DIR: str = "generated/sitemaps"
+    SITEMAP_BASE_URL: Optional[str] = None  # implicit FRONTEND_URL
+    SITEMAP_CHUNK_SIZE: int = 1000  # rânduri citite per lot
+    SITEMAP_CHECK_INTERVAL: int = 300  # seconds, între verificările amprentei conținutului
+
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_REQUESTS: int = 100
@@ -0,0 +1,255 @@
+"""
+Livrarea fișierelor descărcate: Range, cereri condiționate și X-Accel-Redirect
+
+Autorizarea și contorizarea rămân în endpoint; transferul efectiv este fie
+predat lui nginx (X-Accel-Redirect către o locație internă), fie făcut direct
+de worker în bucăți mari (sendfile prin extensia ASGI zerocopysend, când
+serverul o oferă). În ambele moduri cererile If-None-Match/If-Modified-Since
+primesc 304 fără a atinge fișierul, iar Range/If-Range permit reluarea unei
+descărcări întrerupte.
+"""
+import asyncio
+import mimetypes
+import os
+import re
+import stat as stat_module
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request, Response, status
+from starlette.types import Receive, Scope, Send
+
+from .config import get_settings
+from .http_cache import etag_matches
+
+settings = get_settings()
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Crawlere și preview-uri de link-uri: descarcă documentele din sitemap, nu sunt vizitatori
+_CRAWLER_RE = re.compile(
+    r"bot\b|bot/|crawl|spider|slurp|archiver|facebookexternalhit|embedly|preview|"
+    r"curl/|wget/|python-requests|httpx|go-http-client|headless",
+    re.IGNORECASE
+)
+
+ByteRange = Tuple[int, int]  # [start, end] inclusiv
+
+
+def file_etag(st: os.stat_result) -> str:
+    """Același format ca nginx, ca validatorii să coincidă în ambele moduri"""
+    return f'"{int(st.st_mtime):x}-{st.st_size:x}"'
+
+
+def content_disposition(filename: str, inline: bool = False) -> str:
+    """Nume ASCII de rezervă plus filename* (RFC 6266) pentru diacritice"""
+    kind = "inline" if inline else "attachment"
+    fallback = filename.encode("ascii", "ignore").decode("ascii").replace('"', "") or "download"
+    return f'{kind}; filename="{fallback}"; filename*=UTF-8\'\'{quote(filename)}'
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[ByteRange]:
+    """
+    Un singur interval "bytes=a-b", "bytes=a-" sau "bytes=-n".
+    None dacă antetul lipsește sau nu e suportat (se servește tot fișierul);
+    HTTPException 416 dacă intervalul nu poate fi satisfăcut.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        # Intervalele multiple sunt opționale în RFC 9110; răspundem cu 200
+        return None
+
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        length = int(last)
+        if length == 0:
+            raise _range_not_satisfiable(size)
+        start, end = max(size - length, 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+
+    if start >= size:
+        raise _range_not_satisfiable(size)
+    return start, end
+
+
+def _range_not_satisfiable(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        detail="Intervalul cerut nu există în fișier",
+        headers={"Content-Range": f"bytes */{size}"}
+    )
+
+
+def is_not_modified(request: Request, etag: str, st: os.stat_result) -> bool:
+    """If-None-Match are prioritate; If-Modified-Since se compară la nivel de secundă"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(st.st_mtime) <= int(parsedate_to_datetime(if_modified_since).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _if_range_matches(request: Request, etag: str, last_modified: str) -> bool:
+    if_range = request.headers.get("if-range")
+    if not if_range:
+        return True
+    return if_range.strip() in (etag, last_modified)
+
+
+def is_crawler(user_agent: Optional[str]) -> bool:
+    """User-Agent de crawler sau de client automat (lipsa lui este tratată la fel)"""
+    return not user_agent or _CRAWLER_RE.search(user_agent) is not None
+
+
+def is_new_download(request: Request, response: Response) -> bool:
+    """
+    Pentru contorizare: un 304, o cerere care continuă o descărcare (Range
+    care nu începe de la 0) sau una făcută de un crawler nu este o descărcare nouă
+    """
+    if response.status_code == status.HTTP_304_NOT_MODIFIED:
+        return False
+    if is_crawler(request.headers.get("user-agent")):
+        return False
+    header = request.headers.get("range")
+    if not header:
+        return True
+    match = _RANGE_RE.match(header.strip())
+    return match is None or match.group(1) == "0"
+
+
+class RangeFileResponse(Response):
+    """Trimite [start, end] dintr-un fișier, în bucăți mari sau prin zerocopysend"""
+
+    def __init__(
+        self,
+        path: str,
+        st: os.stat_result,
+        byte_range: Optional[ByteRange],
+        headers: Dict[str, str],
+        media_type: str,
+        send_body: bool = True
+    ):
+        self.path = path
+        self.start, self.end = byte_range if byte_range else (0, st.st_size - 1)
+        self.send_body = send_body
+        self.chunk_size = settings.FILE_DELIVERY_CHUNK_SIZE
+        length = max(self.end - self.start + 1, 0)
+
+        headers = dict(headers)
+        headers["content-length"] = str(length)
+        if byte_range:
+            headers["content-range"] = f"bytes {self.start}-{self.end}/{st.st_size}"
+        super().__init__(
+            status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+            headers=headers,
+            media_type=media_type
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        remaining = self.end - self.start + 1
+        if not self.send_body or remaining <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        fd = await asyncio.to_thread(os.open, self.path, os.O_RDONLY)
+        try:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": fd,
+                    "offset": self.start,
+                    "count": remaining,
+                    "more_body": False
+                })
+                return
+
+            offset = self.start
+            while remaining > 0:
+                chunk = await asyncio.to_thread(os.pread, fd, min(self.chunk_size, remaining), offset)
+                if not chunk:
+                    break  # fișierul a fost trunchiat între timp
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            os.close(fd)
+
+
+def x_accel_location(path: Path) -> Optional[str]:
+    """URI-ul intern nginx pentru un fișier din UPLOAD_DIR; None pentru fișierele din afara lui"""
+    try:
+        relative = path.resolve().relative_to(Path(settings.UPLOAD_DIR).resolve())
+    except ValueError:
+        return None
+    return settings.FILE_DELIVERY_X_ACCEL_PREFIX.rstrip("/") + "/" + quote(relative.as_posix())
+
+
+async def file_download_response(
+    request: Request,
+    path,
+    filename: Optional[str] = None,
+    media_type: Optional[str] = None,
+    inline: bool = False,
+    cache_control: str = "private, max-age=0, must-revalidate",
+    extra_headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Răspunsul pentru descărcarea unui fișier de pe disc (după autorizare).
+    HTTPException 404 dacă fișierul lipsește.
+    """
+    path = Path(path)
+    try:
+        st = await asyncio.to_thread(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        st = None
+    if st is None or not stat_module.S_ISREG(st.st_mode):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fișierul nu a fost găsit pe disc")
+
+    etag = file_etag(st)
+    last_modified = formatdate(st.st_mtime, usegmt=True)
+    headers = {
+        "etag": etag,
+        "last-modified": last_modified,
+        "cache-control": cache_control,
+        "accept-ranges": "bytes",
+        **(extra_headers or {})
+    }
+    if filename:
+        headers["content-disposition"] = content_disposition(filename, inline)
+    media_type = media_type or mimetypes.guess_type(str(path))[0] or "application/octet-stream"
+
+    if is_not_modified(request, etag, st):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if settings.FILE_DELIVERY_MODE == "x-accel":
+        location = x_accel_location(path)
+        if location is not None:
+            # nginx servește fișierul (sendfile) și tratează el Range/If-Range
+            headers["x-accel-redirect"] = location
+            return Response(status_code=status.HTTP_200_OK, headers=headers, media_type=media_type)
+
+    byte_range = None
+    if _if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.headers.get("range"), st.st_size)
+
+    return RangeFileResponse(
+        str(path), st, byte_range, headers, media_type, send_body=request.method != "HEAD"
+    )
@@ -0,0 +1,131 @@
+"""
+Cache HTTP pentru endpoint-urile publice de citire: corpuri serializate,
+ETag-uri puternice, răspunsuri 304 și invalidare pe etichete
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from .cache import cache
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Etichete folosite de endpoint-urile publice și invalidate de cele de administrare
+MUNICIPALITY_CACHE_TAG = "municipality"
+NAVIGATION_CACHE_TAG = "navigation"
+CONTENT_CATEGORIES_CACHE_TAG = "content_categories"
+MOL_CACHE_TAG = "mol"
+FORM_TYPES_CACHE_TAG = "form_types"
+DOCUMENT_TEMPLATES_CACHE_TAG = "document_templates"
+
+
+def make_etag(body: bytes) -> str:
+    """ETag puternic derivat din conținut (identic pe toate worker-ele)"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparație slabă, conform RFC 9110 pentru If-None-Match"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def serialize_json(data: Any, response_model: Any = None) -> bytes:
+    """Serializează la fel ca JSONResponse, validând opțional prin response_model"""
+    if response_model is not None:
+        data = TypeAdapter(response_model).validate_python(data, from_attributes=True)
+    return json.dumps(
+        jsonable_encoder(data),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+class ResponseCache:
+    """
+    Cache pentru răspunsuri JSON publice, stocate în cache-ul pe două niveluri
+    (core.cache), deci partajate între worker-e prin Redis.
+
+    Cheia este calea + parametrii de query ai cererii. Fiecare intrare are
+    etichete (ex. "municipality", "navigation") invalidate de endpoint-urile
+    de administrare după commit; invalidarea ajunge la toate worker-ele.
+    """
+
+    def __init__(self, ttl: float = 60, max_age: int = 30):
+        self.ttl = ttl
+        self.max_age = max_age
+        self.not_modified = 0
+
+    @staticmethod
+    def request_key(request: Request) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"http:{request.url.path}?{query}"
+
+    async def respond(
+        self,
+        request: Request,
+        build: Callable[[], Awaitable[Any]],
+        tags: Iterable[str] = (),
+        response_model: Any = None,
+        ttl: Optional[float] = None,
+        max_age: Optional[int] = None
+    ) -> Response:
+        """
+        Returnează răspunsul din cache sau îl construiește cu `build()`.
+        Răspunde cu 304 dacă If-None-Match se potrivește cu ETag-ul curent.
+        """
+        async def build_entry() -> Tuple[bytes, str]:
+            body = serialize_json(await build(), response_model)
+            return body, make_etag(body)
+
+        body, etag = await cache.get_or_set(
+            self.request_key(request),
+            build_entry,
+            ttl=self.ttl if ttl is None else ttl,
+            tags=tags
+        )
+
+        headers = {
+            "ETag": etag,
+            "Cache-Control": self.cache_control(self.max_age if max_age is None else max_age),
+        }
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @staticmethod
+    def cache_control(max_age: int) -> str:
+        # stale-while-revalidate permite nginx/browserului să servească imediat și să revalideze în fundal
+        return f"public, max-age={max_age}, stale-while-revalidate={max_age}"
+
+    async def invalidate_tags(self, *tags: str):
+        """Elimină toate răspunsurile marcate cu oricare dintre etichete, pe toate worker-ele"""
+        await cache.invalidate_tags(*tags)
+
+
+# Instanța globală per worker
+response_cache = ResponseCache(
+    ttl=settings.HTTP_CACHE_TTL,
+    max_age=settings.HTTP_CACHE_MAX_AGE
+)
@@ -0,0 +1,144 @@
+"""
+Hash-uire și verificare bcrypt în afara event loop-ului
+
+bcrypt costă 100-300 ms per apel; rulat direct într-un endpoint async
+blochează toate celelalte cereri ale worker-ului. Apelurile merg într-un
+pool de thread-uri dedicat (bcrypt eliberează GIL-ul), cu o limită de
+concurență, o limită a cozii de așteptare și metrici pentru monitorizare.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from .config import get_settings
+from .tasks import background_services
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class PasswordHasherBusy(Exception):
+    """Prea multe operații în așteptare; cererea trebuie respinsă, nu pusă la coadă"""
+
+
+class PasswordHasher:
+    """
+    Pool mărginit pentru operațiile CryptContext.
+
+    - cel mult `max_workers` hash-uri rulează simultan
+    - cel mult `max_waiting` cereri așteaptă un loc; peste limită -> PasswordHasherBusy
+    - verify_and_update() întoarce și hash-ul nou când costul bcrypt e depășit
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int = 2, max_waiting: int = 64):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_waiting = max_waiting
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_run_time = 0.0
+
+    # ---------- API ----------
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(parolă corectă, hash nou sau None dacă hash-ul existent e încă actual)"""
+        valid, new_hash = await self._run(self.context.verify_and_update, password, hashed_password)
+        if valid and new_hash is not None:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_waiting": self.max_waiting,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "avg_wait_ms": round(self.total_wait_time / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait_time * 1000, 2),
+            "avg_run_ms": round(self.total_run_time / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+    # ---------- ciclul de viață ----------
+
+    async def start(self):
+        self._ensure_pool()
+
+    async def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._semaphore = None
+
+    # ---------- intern ----------
+
+    def _ensure_pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hasher"
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        self._ensure_pool()
+        if self._semaphore.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+
+        queued_at = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.monotonic()
+        wait_time = started_at - queued_at
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+            self.completed += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+            self.total_run_time += time.monotonic() - started_at
+
+
+# Contextul comun: hash-urile cu un cost mai mic decât cel configurat trebuie actualizate
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS
+)
+
+# Instanța globală per worker
+password_hasher = background_services.register(PasswordHasher(
+    pwd_context,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_waiting=settings.PASSWORD_HASH_MAX_WAITING
+))
@@ -0,0 +1,142 @@
+"""
+Pool de procese mărginit pentru operațiile CPU-bound
+
+Spre deosebire de bcrypt, PIL (și alte librării pur CPU) țin GIL-ul o bună
+parte din timp, deci un thread pool tot ar încetini event loop-ul. Lucrul
+rulează în procese separate, cu o limită de concurență, o limită a cozii de
+așteptare și metrici pentru monitorizare, la fel ca PasswordHasher.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessPoolBusy(Exception):
+    """Prea multe operații în așteptare; apelantul decide dacă respinge sau amână lucrul"""
+
+
+class BoundedProcessPool:
+    """
+    - cel mult `max_workers` operații rulează simultan (câte un proces fiecare)
+    - cel mult `max_waiting` apeluri așteaptă un loc; peste limită -> ProcessPoolBusy
+    - procesele pornesc cu "spawn": nu moștenesc starea worker-ului (event loop, conexiuni)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int = 2,
+        max_waiting: int = 32,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple[Any, ...] = ()
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_waiting = max_waiting
+        # Rulat o dată la pornirea fiecărui proces (resurse încărcate o singură dată, ex. fonturi)
+        self.initializer = initializer
+        self.initargs = initargs
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_run_time = 0.0
+        self.max_run_time = 0.0
+
+    async def run(self, func: Callable[..., Any], *args: Any, reject_when_full: bool = True) -> Any:
+        """
+        Rulează func(*args) într-un proces; func trebuie să fie o funcție de modul.
+        Cu reject_when_full=False apelul așteaptă un loc chiar dacă coada e plină
+        (pentru apelanți deja limitați, ca sarcinile de fundal).
+        """
+        self._ensure_pool()
+        semaphore = self._semaphore
+        if reject_when_full and semaphore.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise ProcessPoolBusy()
+
+        queued_at = time.monotonic()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.monotonic()
+        wait_time = started_at - queued_at
+        self.running += 1
+        try:
+            if self._executor is None:
+                # Pool-ul a fost oprit cât timp apelul aștepta
+                raise RuntimeError(f"Pool-ul {self.name} este oprit")
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        except BrokenProcessPool:
+            # Un proces a murit (ex. OOM); pool-ul nu mai poate fi folosit, îl recreăm la apelul următor
+            self.failed += 1
+            logger.error(f"Pool-ul {self.name} a fost întrerupt, va fi recreat")
+            self._executor = None
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            semaphore.release()
+
+        # Duratele medii sunt calculate doar pe apelurile reușite
+        run_time = time.monotonic() - started_at
+        self.completed += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+        self.total_run_time += run_time
+        self.max_run_time = max(self.max_run_time, run_time)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_waiting": self.max_waiting,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_time / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait_time * 1000, 2),
+            "avg_run_ms": round(self.total_run_time / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_run_ms": round(self.max_run_time * 1000, 2),
+        }
+
+    async def start(self):
+        self._ensure_pool()
+
+    async def stop(self):
+        if self._executor is not None:
+            # Nu blocăm event loop-ul cât timp se termină operațiile în curs
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown, True)
+        self._semaphore = None
+
+    def _ensure_pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+                initargs=self.initargs
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
@@ -0,0 +1,83 @@
+"""
+Instantanee per worker, invalidate prin etichetele cache-ului partajat
+
+O structură derivată din DB (configurație, arbore de navigare etc.) este
+construită o singură dată și servită din memorie. Când o etichetă asociată
+este invalidată prin cache.invalidate_tags, pe orice worker, instantaneul
+este eliminat și reconstruit la următoarea citire.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Generic, Iterable, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import cache
+from .database import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TaggedSnapshot(Generic[T]):
+    """
+    Subclasele implementează build(db). Citirea nu blochează decât la prima
+    construcție după o invalidare; cererile concurente așteaptă aceeași construcție.
+    """
+
+    def __init__(self, name: str, tags: Iterable[str]):
+        self.name = name
+        self.tags = frozenset(tags)
+        self._value: Optional[T] = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self.builds = 0
+        cache.on_invalidate(self._on_invalidate)
+
+    async def build(self, db: AsyncSession) -> T:
+        raise NotImplementedError
+
+    async def get(self, db: Optional[AsyncSession] = None) -> T:
+        value = self._value
+        if value is not None:
+            return value
+
+        async with self._lock:
+            if self._value is not None:
+                return self._value
+            version = self._version
+            value = await self._build(db)
+            # O invalidare sosită în timpul construcției face rezultatul învechit
+            if version == self._version:
+                self._value = value
+            return value
+
+    async def publish(self, value: Optional[T] = None):
+        """
+        Apelat după commit: invalidează etichetele pe toate worker-ele
+        (inclusiv răspunsurile HTTP din cache) și, opțional, instalează
+        local valoarea nouă, ca worker-ul curent să nu mai interogheze DB
+        """
+        await cache.invalidate_tags(*self.tags)
+        if value is not None:
+            self._value = value
+
+    def invalidate(self):
+        self._version += 1
+        self._value = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "loaded": self._value is not None, "builds": self.builds}
+
+    async def _build(self, db: Optional[AsyncSession]) -> T:
+        self.builds += 1
+        if db is not None:
+            return await self.build(db)
+        async with async_session_maker() as session:
+            return await self.build(session)
+
+    def _on_invalidate(self, tags: Iterable[str], keys: Iterable[str]):
+        tags = set(tags)
+        if "*" in tags or tags & self.tags:
+            self.invalidate()
@@ -0,0 +1,102 @@
+"""
+Sarcini periodice și registrul serviciilor de fundal ale aplicației
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Rulează o corutină la intervale regulate pe event loop-ul worker-ului.
+    La oprire rulează corutina încă o dată, pentru a nu pierde datele din memorie.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: float,
+        run_on_stop: bool = True
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.run_on_stop = run_on_stop
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Pornește bucla periodică (idempotent)"""
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._loop(), name=self.name)
+        logger.info(f"Sarcina periodică '{self.name}' pornită (interval {self.interval}s)")
+
+    async def stop(self):
+        """Oprește bucla și rulează o ultimă execuție dacă este cazul"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self.run_on_stop:
+            await self.run_once()
+
+    async def run_once(self):
+        """Rulează corutina o singură dată, fără a propaga erorile"""
+        try:
+            await self.func()
+        except Exception:
+            logger.exception(f"Eroare în sarcina periodică '{self.name}'")
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+
+class BackgroundServices:
+    """
+    Registrul serviciilor de fundal pornite și oprite în lifespan-ul aplicației.
+    Serviciile trebuie să expună metodele async start() și stop().
+    """
+
+    def __init__(self):
+        self._services: List[Any] = []
+        self._started = False
+
+    def register(self, service):
+        """Înregistrează un serviciu și îl returnează (util la definirea singleton-urilor)"""
+        if service not in self._services:
+            self._services.append(service)
+        return service
+
+    async def start_all(self):
+        """Pornește toate serviciile, în ordinea înregistrării"""
+        for service in self._services:
+            await service.start()
+        self._started = True
+
+    async def stop_all(self):
+        """Oprește serviciile în ordine inversă; o eroare nu blochează restul"""
+        if not self._started:
+            return
+        for service in reversed(self._services):
+            try:
+                await service.stop()
+            except Exception:
+                logger.exception(f"Eroare la oprirea serviciului {service!r}")
+        self._started = False
+
+
+# Instanța globală folosită de lifespan
+background_services = BackgroundServices()
@@ -15,6 +15,7 @@ import os
 
 from .core.config import get_settings, LOGGING_CONFIG, API_V1_PREFIX
 from .core.database import db_connection
+from .core.tasks import background_services
 from .api import api_router
 
 
@@ -38,12 +39,16 @@ async def lifespan(app: FastAPI):
     os.makedirs(settings.upload_path, exist_ok=True)
     logger.info(f"📁 Upload directory created: {settings.upload_path}")
     
+    # Pornirea serviciilor de fundal (scrieri în lot, curățări periodice)
+    await background_services.start_all()
+    
     logger.info(f"✅ API started successfully on {settings.ENVIRONMENT} environment")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down Primărie Digitală API...")
+    await background_services.stop_all()
     await db_connection.disconnect()
     logger.info("✅ Shutdown completed")
 
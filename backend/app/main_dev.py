@@ -340,6 +340,16 @@ for i in range(25):
 
 # Mock data storage
 def get_municipality_config():
+    """
+    Configurația curentă: încărcată o singură dată din ENV, apoi înlocuită
+    doar de PUT /municipality/config sau de încărcarea logo-ului
+    """
+    global global_municipality_config
+    if global_municipality_config is None:
+        global_municipality_config = _load_municipality_config_from_env()
+    return global_municipality_config
+
+def _load_municipality_config_from_env():
     """Generate fresh municipality config with current ENV values"""
     return MunicipalityConfig(
         id=1,
@@ -402,14 +412,7 @@ async def root():
 @app.get("/api/v1/municipality/config", response_model=MunicipalityConfig)
 async def get_municipality_config_endpoint():
     """Get municipality configuration"""
-    global global_municipality_config
-    if global_municipality_config:
-        return global_municipality_config
-    # Debug ENV values
-    print(f"DEBUG: MUNICIPALITY_NAME = {os.getenv('MUNICIPALITY_NAME', 'NOT_SET')}")
-    config = get_municipality_config()
-    global_municipality_config = config
-    return config
+    return get_municipality_config()
 
 @app.put("/api/v1/municipality/config", response_model=MunicipalityConfig)
 async def update_municipality_config(config: MunicipalityConfig, user = Depends(get_current_user)):
@@ -512,8 +515,7 @@ async def upload_logo(file: UploadFile = File(...), user = Depends(get_current_u
         
         # Update global config with new logo
         global global_municipality_config
-        if global_municipality_config:
-            global_municipality_config.logo_url = logo_url
+        global_municipality_config = get_municipality_config().copy(update={"logo_url": logo_url})
         
         print(f"✅ Logo uploaded by {user['email']}: {logo_url}")
         
@@ -1277,6 +1279,58 @@ async def upload_complaint_photos(
 
 # ========== GENERARE DOCUMENTE PDF ==========
 
+# Registrul documentelor generate: număr de referință -> versiuni (cea mai nouă ultima).
+# Construit o singură dată din directorul de documente, apoi actualizat la generare,
+# deci descărcarea, previzualizarea și statusul nu mai caută și nu mai citesc fișiere pe disc.
+GENERATED_DOCUMENTS_DIR = Path("uploads/documents")
+GENERATED_DOCUMENT_KEEP_VERSIONS = max(1, int(os.getenv("GENERATED_DOCUMENT_KEEP_VERSIONS", "5")))
+generated_documents_index = None
+
+def _generated_documents():
+    global generated_documents_index
+    if generated_documents_index is None:
+        index = {}
+        if GENERATED_DOCUMENTS_DIR.exists():
+            for path in GENERATED_DOCUMENTS_DIR.glob("*.html"):
+                # {referință}_{AAAALLZZ}_{HHMMSS}.html
+                parts = path.stem.rsplit("_", 2)
+                if len(parts) != 3:
+                    continue
+                stat = path.stat()
+                index.setdefault(parts[0], []).append({
+                    "filename": path.name,
+                    "path": path,
+                    "file_size": stat.st_size,
+                    "generated_at": datetime.fromtimestamp(stat.st_mtime)
+                })
+        for versions in index.values():
+            versions.sort(key=lambda v: v["generated_at"])
+            for number, entry in enumerate(versions, start=1):
+                entry["version"] = number
+        generated_documents_index = index
+    return generated_documents_index
+
+def _record_generated_document(reference_number: str, path: Path, file_size: int) -> dict:
+    """Adaugă o versiune nouă și șterge versiunile peste GENERATED_DOCUMENT_KEEP_VERSIONS"""
+    versions = _generated_documents().setdefault(reference_number, [])
+    entry = {
+        "filename": path.name,
+        "path": path,
+        "file_size": file_size,
+        "generated_at": datetime.now(),
+        "version": versions[-1]["version"] + 1 if versions else 1
+    }
+    versions.append(entry)
+    while len(versions) > GENERATED_DOCUMENT_KEEP_VERSIONS:
+        versions.pop(0)["path"].unlink(missing_ok=True)
+    return entry
+
+def _latest_generated_document(reference_number: str) -> dict:
+    versions = _generated_documents().get(reference_number)
+    if not versions:
+        raise HTTPException(status_code=404, detail="Documentul nu a fost găsit")
+    return versions[-1]
+
 @app.post("/api/v1/documents/generate/{submission_id}")
 async def generate_document(submission_id: str, user = Depends(get_current_user)):
     """Generează documentul oficial pentru o cerere finalizată"""
@@ -1298,101 +1352,37 @@ async def generate_document(submission_id: str, user = Depends(get_current_user)
         # Obține configurația primăriei
         municipality_config = get_municipality_config()
         
-        # Simulează generarea documentului (în producție va folosi utils/pdf_generator.py)
-        from pathlib import Path
-        import os
+        # Documentul de confirmare, din același șablon ca în aplicație (previzualizare HTML, fără PDF)
+        from .utils.pdf_generator import generate_html_template
         
         # Creează directorul dacă nu există
-        documents_dir = Path("uploads/documents")
-        documents_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generează HTML mock pentru document
-        document_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>{form_type.name}</title>
-            <style>
-                body {{ font-family: 'Times New Roman', serif; margin: 40px; line-height: 1.6; }}
-                .header {{ text-align: center; border-bottom: 3px solid #004990; padding-bottom: 20px; margin-bottom: 30px; }}
-                .municipality-name {{ font-size: 18px; font-weight: bold; color: #004990; }}
-                .document-title {{ font-size: 24px; font-weight: bold; text-transform: uppercase; margin: 30px 0; text-align: center; color: #004990; }}
-                .reference-number {{ text-align: right; font-weight: bold; margin-bottom: 20px; }}
-                .content {{ text-align: justify; margin: 20px 0; }}
-                .signature-section {{ margin-top: 50px; text-align: right; }}
-                .stamp-area {{ margin-top: 40px; text-align: center; border: 2px dashed #004990; padding: 30px; color: #666; }}
-                .footer {{ margin-top: 40px; text-align: center; font-size: 12px; color: #666; border-top: 1px solid #ccc; padding-top: 20px; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <div class="municipality-name">{municipality_config.official_name}</div>
-                <div>{municipality_config.address}</div>
-                <div>Tel: {municipality_config.contact_phone} | Email: {municipality_config.contact_email}</div>
-            </div>
-            
-            <div class="reference-number">
-                Nr. {submission.reference_number}<br>
-                Data: {datetime.now().strftime('%d.%m.%Y')}
-            </div>
-            
-            <div class="document-title">{form_type.name}</div>
-            
-            <div class="content">
-                <h3>Solicitant:</h3>
-                <p><strong>Nume:</strong> {submission.citizen_name}</p>
-                <p><strong>Email:</strong> {submission.citizen_email or 'N/A'}</p>
-                <p><strong>Telefon:</strong> {submission.citizen_phone or 'N/A'}</p>
-                <p><strong>Adresa:</strong> {submission.citizen_address or 'N/A'}</p>
-                
-                <h3>Detalii cerere:</h3>
-        """
-        
-        # Adaugă datele specifice formularului
-        for key, value in submission.submission_data.items():
-            if value:
-                field_name = key.replace('_', ' ').title()
-                document_html += f"<p><strong>{field_name}:</strong> {value}</p>"
-        
-        document_html += f"""
-                
-                <h3>Status cerere:</h3>
-                <p><strong>Status:</strong> {submission.status.upper()}</p>
-                <p><strong>Data submiterii:</strong> {submission.submitted_at[:10]}</p>
-                
-                <p style="margin-top: 30px;">Prin prezentul document se confirmă procesarea cererii cu numărul de referință <strong>{submission.reference_number}</strong>.</p>
-                
-                <p><strong>Observații:</strong> Documentul este generat automat și are valabilitate conform legislației în vigoare.</p>
-            </div>
-            
-            <div class="signature-section">
-                <div style="display: inline-block; text-align: center;">
-                    <div style="margin-bottom: 50px;">PRIMAR</div>
-                    <div style="border-top: 1px solid #000; padding-top: 5px; width: 200px;">
-                        {municipality_config.mayor_name}
-                    </div>
-                </div>
-            </div>
-            
-            <div class="stamp-area">
-                [ȘTAMPILA PRIMĂRIEI]
-            </div>
-            
-            <div class="footer">
-                Document generat electronic în data {datetime.now().strftime('%d.%m.%Y')}<br>
-                Verifică autenticitatea la: {municipality_config.website_url}/verificare/{submission.reference_number}
-            </div>
-        </body>
-        </html>
-        """
+        GENERATED_DOCUMENTS_DIR.mkdir(parents=True, exist_ok=True)
+        
+        document_html = generate_html_template(
+            "confirmare-cerere",
+            {
+                "reference_number": submission.reference_number,
+                "citizen_name": submission.citizen_name,
+                "citizen_email": submission.citizen_email,
+                "citizen_phone": submission.citizen_phone,
+                "citizen_address": submission.citizen_address,
+                "status": submission.status,
+                "submitted_at": submission.submitted_at,
+                "form_type_name": form_type.name,
+                "submission_data": submission.submission_data
+            },
+            municipality_config.model_dump()
+        )
         
         # Salvează documentul
         filename = f"{submission.reference_number}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        file_path = documents_dir / filename
+        file_path = GENERATED_DOCUMENTS_DIR / filename
         
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(document_html)
+        document = _record_generated_document(
+            submission.reference_number, file_path, len(document_html.encode('utf-8'))
+        )
         
         print(f"✅ Document generat pentru cererea {submission.reference_number}: {filename}")
         
@@ -1401,13 +1391,16 @@ async def generate_document(submission_id: str, user = Depends(get_current_user)
             "document_info": {
                 "filename": filename,
                 "reference_number": submission.reference_number,
+                "version": document["version"],
                 "form_type": form_type.name,
                 "download_url": f"/api/v1/documents/download/{submission.reference_number}",
                 "preview_url": f"/api/v1/documents/preview/{submission.reference_number}",
-                "generated_at": datetime.now().isoformat()
+                "generated_at": document["generated_at"].isoformat()
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Eroare la generarea documentului: {e}")
         raise HTTPException(status_code=500, detail="Eroare la generarea documentului")
@@ -1416,19 +1409,7 @@ async def generate_document(submission_id: str, user = Depends(get_current_user)
 async def download_document(reference_number: str):
     """Descarcă documentul generat"""
     try:
-        documents_dir = Path("uploads/documents")
-        
-        # Caută fișierul cu numărul de referință
-        matching_files = list(documents_dir.glob(f"{reference_number}_*.html"))
-        
-        if not matching_files:
-            raise HTTPException(status_code=404, detail="Documentul nu a fost găsit")
-        
-        # Ia cel mai recent fișier (ultimul generat)
-        latest_file = max(matching_files, key=lambda x: x.stat().st_mtime)
-        
-        if not latest_file.exists():
-            raise HTTPException(status_code=404, detail="Fișierul documentului nu a fost găsit")
+        latest_file = _latest_generated_document(reference_number)["path"]
         
         # Returnează fișierul
         from fastapi.responses import FileResponse
@@ -1438,6 +1419,8 @@ async def download_document(reference_number: str):
             media_type="text/html"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Eroare la descărcarea documentului: {e}")
         raise HTTPException(status_code=500, detail="Eroare la descărcarea documentului")
@@ -1446,19 +1429,7 @@ async def download_document(reference_number: str):
 async def preview_document(reference_number: str):
     """Previzualizează documentul generat (returnează HTML)"""
     try:
-        documents_dir = Path("uploads/documents")
-        
-        # Caută fișierul cu numărul de referință
-        matching_files = list(documents_dir.glob(f"{reference_number}_*.html"))
-        
-        if not matching_files:
-            raise HTTPException(status_code=404, detail="Documentul nu a fost găsit")
-        
-        # Ia cel mai recent fișier
-        latest_file = max(matching_files, key=lambda x: x.stat().st_mtime)
-        
-        if not latest_file.exists():
-            raise HTTPException(status_code=404, detail="Fișierul documentului nu a fost găsit")
+        latest_file = _latest_generated_document(reference_number)["path"]
         
         # Citește și returnează conținutul HTML
         with open(latest_file, 'r', encoding='utf-8') as f:
@@ -1467,6 +1438,8 @@ async def preview_document(reference_number: str):
         from fastapi.responses import HTMLResponse
         return HTMLResponse(content=html_content)
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Eroare la previzualizarea documentului: {e}")
         raise HTTPException(status_code=500, detail="Eroare la previzualizarea documentului")
@@ -1480,21 +1453,20 @@ async def get_document_status(submission_id: str):
         if not submission:
             raise HTTPException(status_code=404, detail="Cererea nu a fost găsită")
         
-        documents_dir = Path("uploads/documents")
-        
-        # Caută documentul generat
-        matching_files = list(documents_dir.glob(f"{submission.reference_number}_*.html"))
+        # Documentul generat, din registru
+        versions = _generated_documents().get(submission.reference_number)
         
-        if matching_files:
-            latest_file = max(matching_files, key=lambda x: x.stat().st_mtime)
-            file_stats = latest_file.stat()
+        if versions:
+            latest = versions[-1]
             
             return {
                 "document_exists": True,
                 "reference_number": submission.reference_number,
-                "filename": latest_file.name,
-                "generated_at": datetime.fromtimestamp(file_stats.st_mtime).isoformat(),
-                "file_size": file_stats.st_size,
+                "filename": latest["filename"],
+                "version": latest["version"],
+                "versions": len(versions),
+                "generated_at": latest["generated_at"].isoformat(),
+                "file_size": latest["file_size"],
                 "download_url": f"/api/v1/documents/download/{submission.reference_number}",
                 "preview_url": f"/api/v1/documents/preview/{submission.reference_number}"
             }
@@ -1506,6 +1478,8 @@ async def get_document_status(submission_id: str):
                 "status": submission.status
             }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Eroare la verificarea statusului documentului: {e}")
         raise HTTPException(status_code=500, detail="Eroare la verificarea statusului documentului")
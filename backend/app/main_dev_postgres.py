@@ -22,6 +22,7 @@ except Exception as e:
 # Import core modules
 from .core.config import get_settings
 from .core.database import engine, get_async_session
+from .core.tasks import background_services
 from .api.endpoints import auth, municipality, content, documents, forms, payments, search
 
 # Get settings
@@ -69,11 +70,13 @@ async def startup_event():
     print(f"🔧 Environment: {settings.ENVIRONMENT}")
     print(f"🗄️  Database: PostgreSQL")
     print(f"📊 Debug mode: {settings.DEBUG}")
+    await background_services.start_all()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler"""
     print("👋 Shutting down Template Primărie Digitală API")
+    await background_services.stop_all()
 
 @app.get("/")
 async def root():
@@ -21,6 +21,7 @@ except Exception as e:
 # Import core modules
 from .core.config import get_settings
 from .core.database import engine
+from .core.tasks import background_services
 from .api.endpoints.auth import router as auth_router
 from .api.endpoints.forms_simple import router as forms_router
 from .api.endpoints.municipality import router as municipality_router
@@ -31,6 +32,7 @@ from .api.endpoints.search import router as search_router
 from .api.endpoints.mol import router as mol_router
 from .api.endpoints.notifications import router as notifications_router
 from .api.endpoints.files import router as files_router
+from .api.endpoints.analytics import router as analytics_router
 
 # Get settings
 settings = get_settings()
@@ -63,6 +65,7 @@ app.include_router(search_router, prefix="/api/v1/search", tags=["Search", "Full
 app.include_router(mol_router, prefix="/api/v1/mol", tags=["MOL", "Monitorul Oficial Local"])
 app.include_router(notifications_router, prefix="/api/v1/notifications", tags=["Notifications", "Email"])
 app.include_router(files_router, prefix="/api/v1/files", tags=["Files", "Documents", "Upload"])
+app.include_router(analytics_router, prefix="/api/v1/analytics", tags=["Analytics"])
 
 @app.on_event("startup")
 async def startup_event():
@@ -70,6 +73,12 @@ async def startup_event():
     print(f"🚀 Starting Simple Primărie Digitală API")
     print(f"🗄️  Database: PostgreSQL")
     print(f"🔐 JWT Authentication enabled")
+    await background_services.start_all()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Shutdown event handler"""
+    await background_services.stop_all()
 
 @app.get("/")
 async def root():
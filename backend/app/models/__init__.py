@@ -10,14 +10,19 @@ from .documents import (
     DocumentCategory, Document, MOLCategory, MOLDocument
 )
 from .forms import (
-    FormType, FormSubmission, EmailTemplate, EmailQueue,
+    FormType, FormSubmission, EmailTemplate, EmailQueue, DocumentTemplate, GeneratedDocument,
     ComplaintCategory, Complaint, ComplaintUpdate
 )
 from .appointments import (
     AppointmentCategory, AppointmentTimeSlot, Appointment,
     AppointmentNotification, AppointmentStats
 )
-from .documents import SearchIndex, PageView, DocumentDownload
+from .documents import (
+    SearchIndex, PageView, PageViewDailyStat, DocumentDownload, StoredBlob,
+    StorageManifestEntry, StorageUsage
+)
+from .jobs import BackgroundJob
+from .uploads import ResumableUpload
 # Note: SearchIndex is defined in documents.py to avoid circular imports
 
 __all__ = [
@@ -40,12 +45,17 @@ __all__ = [
     "Document",
     "MOLCategory",
     "MOLDocument",
+    "StoredBlob",
+    "StorageManifestEntry",
+    "StorageUsage",
     
     # Form models
     "FormType",
     "FormSubmission",
     "EmailTemplate",
     "EmailQueue",
+    "DocumentTemplate",
+    "GeneratedDocument",
     
     # Complaint models
     "ComplaintCategory",
@@ -62,6 +72,13 @@ __all__ = [
     # Search and analytics
     "SearchIndex",
     "PageView",
+    "PageViewDailyStat",
     "DocumentDownload",
     
+    # Background jobs
+    "BackgroundJob",
+    
+    # Resumable uploads
+    "ResumableUpload",
+    
 ]
\ No newline at end of file
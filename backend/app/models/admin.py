@@ -4,7 +4,7 @@ Modele pentru administrarea sistemului
 import uuid
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, Text, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Text, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID, INET, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -74,7 +74,7 @@ class AdminSession(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("admin_users.id", ondelete="CASCADE"), nullable=False)
     
     # JWT Tokens
-    access_token_hash = Column(String(255), nullable=False, index=True)
+    access_token_hash = Column(String(255), nullable=False)
     refresh_token_hash = Column(String(255), nullable=False, index=True)
     
     # Informații despre sesiune
@@ -91,6 +91,16 @@ class AdminSession(Base):
     
     # Relații
     user = relationship("AdminUser", back_populates="sessions")
+
+    __table_args__ = (
+        # Doar sesiunile active sunt căutate după access token; indexul parțial rămâne mic
+        Index(
+            "idx_admin_sessions_active_access_token",
+            "access_token_hash",
+            postgresql_where=text("is_revoked = false")
+        ),
+        Index("idx_admin_sessions_refresh_expires_at", "refresh_expires_at"),
+    )
     
     def __repr__(self):
         return f"<AdminSession(user_id='{self.user_id}', access_expires_at='{self.access_expires_at}')>"
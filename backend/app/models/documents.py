@@ -3,8 +3,8 @@ Modele pentru managementul documentelor și MOL
 """
 import uuid
 from datetime import date, datetime
-from sqlalchemy import Column, String, Text, Boolean, DateTime, Integer, ForeignKey, Date, ARRAY
-from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy import Column, String, Text, Boolean, DateTime, Integer, BigInteger, ForeignKey, Date, ARRAY, Index, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR, INET
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -187,23 +187,102 @@ class SearchIndex(Base):
 
 
 class PageView(Base):
-    """Statistici vizitatori pentru pagini"""
+    """Statistici vizitatori pentru pagini (tabelă partiționată lunar după view_date)"""
     __tablename__ = "page_views"
     
+    # Cheia partiției trebuie să facă parte din cheia primară
     id = Column(Integer, primary_key=True, autoincrement=True)
+    view_date = Column(Date, primary_key=True, nullable=False)
     page_url = Column(String(500), nullable=False)
     page_title = Column(String(255), nullable=True)
-    visitor_ip = Column(String(45), nullable=True)  # IPv6 poate fi mai lung
+    visitor_ip = Column(INET, nullable=True)
     user_agent = Column(Text, nullable=True)
     referrer = Column(String(500), nullable=True)
     session_id = Column(String(255), nullable=True)
-    view_date = Column(Date, nullable=False)
     view_time = Column(DateTime(timezone=True), default=func.now(), nullable=False)
     
     def __repr__(self):
         return f"<PageView(url='{self.page_url}', date='{self.view_date}')>"
 
 
+class PageViewDailyStat(Base):
+    """Agregate zilnice de vizualizări per pagină (pentru rapoartele de transparență)"""
+    __tablename__ = "page_view_daily_stats"
+    
+    view_date = Column(Date, primary_key=True)
+    page_url = Column(String(500), primary_key=True)
+    views = Column(Integer, default=0, nullable=False)  # toate vizualizările (exact, fără eșantionare)
+    sampled_views = Column(Integer, default=0, nullable=False)  # rânduri efectiv scrise în page_views
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<PageViewDailyStat(url='{self.page_url}', date='{self.view_date}', views={self.views})>"
+
+
+class StoredBlob(Base):
+    """
+    Fișier stocat după conținut (SHA-256), partajat de toate înregistrările care îl referă.
+    ref_count numără referințele din documente, MOL, cereri și sesizări;
+    blob-urile fără referințe sunt șterse de colectorul din BlobStore.
+    """
+    __tablename__ = "stored_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    storage_path = Column(String(500), unique=True, nullable=False)  # relativă la UPLOAD_DIR
+    size = Column(Integer, nullable=False)
+    mime_type = Column(String(100), nullable=True)
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    last_referenced_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index("idx_stored_blobs_unreferenced", "last_referenced_at", postgresql_where=text("ref_count = 0")),
+    )
+    
+    def __repr__(self):
+        return f"<StoredBlob(sha256='{self.sha256[:12]}', refs={self.ref_count})>"
+
+
+class StorageManifestEntry(Base):
+    """
+    Un fișier din UPLOAD_DIR, înregistrat la salvare și eliminat la ștergere.
+    Statisticile de stocare se citesc de aici și din storage_usage, fără scanarea discului.
+    """
+    __tablename__ = "storage_manifest"
+    
+    path = Column(String(500), primary_key=True)  # relativă la UPLOAD_DIR
+    subfolder = Column(String(100), nullable=False)  # primul segment al căii (blobs, thumbnails...)
+    extension = Column(String(20), nullable=False, default="")
+    size = Column(BigInteger, nullable=False)
+    mime_type = Column(String(100), nullable=True)
+    sha256 = Column(String(64), nullable=True)
+    owner_type = Column(String(50), nullable=True)  # document, mol_document, form_submission, complaint, blob
+    owner_id = Column(String(100), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index("idx_storage_manifest_size", text("size DESC")),
+        Index("idx_storage_manifest_owner", "owner_type", "owner_id"),
+        Index("idx_storage_manifest_sha256", "sha256"),
+    )
+    
+    def __repr__(self):
+        return f"<StorageManifestEntry(path='{self.path}', size={self.size})>"
+
+
+class StorageUsage(Base):
+    """Totaluri per subfolder și extensie, actualizate în aceeași tranzacție cu storage_manifest"""
+    __tablename__ = "storage_usage"
+    
+    subfolder = Column(String(100), primary_key=True)
+    extension = Column(String(20), primary_key=True)
+    files_count = Column(BigInteger, default=0, nullable=False)
+    total_size = Column(BigInteger, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f"<StorageUsage(subfolder='{self.subfolder}', extension='{self.extension}', files={self.files_count})>"
+
+
 class DocumentDownload(Base):
     """Statistici download documente"""
     __tablename__ = "document_downloads"
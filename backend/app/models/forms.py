@@ -3,7 +3,7 @@ Modele pentru formulare online și servicii digitale
 """
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Text, Boolean, DateTime, Integer, ForeignKey, Date, ARRAY
+from sqlalchemy import Column, String, Text, Boolean, DateTime, Integer, BigInteger, ForeignKey, Date, ARRAY, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -185,6 +185,55 @@ class EmailTemplate(Base):
         return f"<EmailTemplate(name='{self.name}')>"
 
 
+class DocumentTemplate(Base):
+    """
+    Șabloane Jinja ale documentelor oficiale modificate din administrare;
+    au prioritate față de cele de pe disc (vezi utils/document_templates.py)
+    """
+    __tablename__ = "document_templates"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), unique=True, nullable=False)  # ex. "certificat-fiscal.html", "documents.css"
+    content = Column(Text, nullable=False)
+    is_active = Column(Boolean, default=True, nullable=False)
+    updated_by = Column(UUID(as_uuid=True), ForeignKey("admin_users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<DocumentTemplate(name='{self.name}')>"
+
+
+class GeneratedDocument(Base):
+    """
+    O versiune a unui document oficial generat (PDF), per număr de referință.
+    Ultima versiune se citește după (reference_number, version), fără căutări pe disc;
+    versiunile înlocuite se păstrează conform GENERATED_DOCUMENT_KEEP_VERSIONS/RETENTION_DAYS.
+    """
+    __tablename__ = "generated_documents"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    reference_number = Column(String(50), nullable=False)
+    version = Column(Integer, nullable=False)
+    document_type = Column(String(100), nullable=False)
+    storage_path = Column(String(500), unique=True, nullable=False)  # relativă la UPLOAD_DIR
+    file_name = Column(String(255), nullable=False)
+    mime_type = Column(String(100), default="application/pdf", nullable=False)
+    file_size = Column(BigInteger, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    submission_id = Column(UUID(as_uuid=True), ForeignKey("form_submissions.id", ondelete="SET NULL"), nullable=True)
+    generated_by = Column(UUID(as_uuid=True), ForeignKey("admin_users.id"), nullable=True)
+    generated_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint("reference_number", "version", name="uq_generated_documents_reference_version"),
+        Index("idx_generated_documents_generated_at", "generated_at"),
+    )
+    
+    def __repr__(self):
+        return f"<GeneratedDocument(reference_number='{self.reference_number}', version={self.version})>"
+
+
 class EmailQueue(Base):
     """Coada de email-uri de trimis"""
     __tablename__ = "email_queue"
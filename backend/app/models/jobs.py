@@ -0,0 +1,43 @@
+"""
+Modele pentru sarcinile de fundal persistente
+"""
+import uuid
+from sqlalchemy import Column, String, DateTime, Integer, Float, Text, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class BackgroundJob(Base):
+    """
+    Sarcină rulată după răspunsul HTTP (procesare imagini, generări în lot).
+    Starea este în DB, deci o sarcină întreruptă de o repornire este reluată.
+    """
+    __tablename__ = "background_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    
+    # pending -> running -> done | failed
+    status = Column(String(20), default="pending", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    progress = Column(JSONB, nullable=True)  # raportat de sarcinile lungi în timpul rulării
+    
+    # Timestamps și durată (metrici de procesare)
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # ultimul semn de viață al sarcinii
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_ms = Column(Float, nullable=True)
+    
+    __table_args__ = (
+        Index("idx_background_jobs_claimable", "created_at", postgresql_where=text("status IN ('pending', 'running')")),
+        Index("idx_background_jobs_kind_status", "kind", "status"),
+    )
+    
+    def __repr__(self):
+        return f"<BackgroundJob(kind='{self.kind}', status='{self.status}')>"
+
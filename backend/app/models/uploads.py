@@ -0,0 +1,38 @@
+"""
+Modele pentru upload-urile reluabile (în fragmente)
+"""
+import uuid
+from sqlalchemy import Column, String, DateTime, BigInteger, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class ResumableUpload(Base):
+    """
+    Upload în fragmente (protocol de tip tus). Octeții primiți sunt în
+    UPLOAD_DIR/temp/resumable/<id>.part, iar dimensiunea acestui fișier este
+    offset-ul curent; la finalizare fișierul devine un blob stocat după conținut.
+    """
+    __tablename__ = "resumable_uploads"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    filename = Column(String(255), nullable=False)
+    mime_type = Column(String(100), nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    
+    # uploading -> completed
+    status = Column(String(20), default="uploading", nullable=False)
+    storage_path = Column(String(500), nullable=True)  # blob-ul creat la finalizare
+    sha256 = Column(String(64), nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # prelungit la fiecare fragment
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index("idx_resumable_uploads_expires", "expires_at"),
+    )
+    
+    def __repr__(self):
+        return f"<ResumableUpload(filename='{self.filename}', status='{self.status}')>"
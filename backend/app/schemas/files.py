@@ -18,7 +18,10 @@ class FileUploadResponse(FileInfoBase):
     """Răspuns pentru upload fișier"""
     file_path: str = Field(..., description="Calea relativă a fișierului")
     file_hash: str = Field(..., description="Hash-ul fișierului")
+    upload_token: Optional[str] = Field(None, description="Tokenul cu care fișierul se atașează unei cereri sau sesizări")
+    deduplicated: bool = Field(False, description="Conținutul exista deja și nu a fost stocat din nou")
     thumbnail_path: Optional[str] = Field(None, description="Calea thumbnail-ului")
+    processing_job_id: Optional[str] = Field(None, description="Sarcina de procesare a imaginii, dacă rulează în fundal")
     upload_timestamp: str = Field(..., description="Timestamp upload")
 
 
@@ -151,6 +154,18 @@ class BulkUploadRequest(BaseModel):
     tags: Optional[List[str]] = Field(None, description="Tag-uri comune")
     is_public: bool = Field(True, description="Toate documentele publice")
     requires_auth: bool = Field(False, description="Toate documentele necesită autentificare")
+    atomic: bool = Field(False, description="Dacă un fișier eșuează, nu se creează niciun document")
+    background: bool = Field(False, description="Documentele se creează într-o sarcină de fundal (loturi mari)")
+
+
+class BulkUploadFileResult(BaseModel):
+    """Rezultatul unui fișier din upload-ul în masă"""
+    filename: str = Field(..., description="Numele fișierului")
+    status: str = Field(..., description="created, queued, skipped sau failed")
+    document_id: Optional[int] = Field(None, description="ID-ul documentului creat")
+    file_path: Optional[str] = Field(None, description="Calea fișierului stocat")
+    deduplicated: bool = Field(False, description="Conținutul exista deja pe disc")
+    error: Optional[str] = Field(None, description="Eroarea întâlnită")
 
 
 class BulkUploadResponse(BaseModel):
@@ -160,6 +175,9 @@ class BulkUploadResponse(BaseModel):
     failed: int = Field(..., description="Fișierele care au eșuat")
     errors: List[Dict[str, Any]] = Field(default_factory=list, description="Erorile întâlnite")
     documents: List[Document] = Field(default_factory=list, description="Documentele create")
+    results: List[BulkUploadFileResult] = Field(default_factory=list, description="Rezultatul fiecărui fișier")
+    job_id: Optional[str] = Field(None, description="Sarcina care creează documentele (mod background)")
+    processing_job_ids: List[str] = Field(default_factory=list, description="Sarcinile de procesare a imaginilor")
 
 
 class DocumentStats(BaseModel):
@@ -181,6 +199,23 @@ class CleanupStats(BaseModel):
     deleted_files: int = Field(..., description="Fișiere șterse")
     errors: int = Field(..., description="Erori întâlnite")
     freed_space: Optional[int] = Field(None, description="Spațiu eliberat (bytes)")
+    orphaned_size: int = Field(0, description="Dimensiunea fișierelor orfane (bytes)")
+    skipped_recent: int = Field(0, description="Fișiere nereferite, dar mai noi decât perioada de grație")
+    referenced_paths: int = Field(0, description="Căi referite de înregistrări")
+    dry_run: bool = Field(True, description="Doar raport, fără ștergere")
+    grace_hours: int = Field(0, description="Perioada de grație (ore)")
+    orphan_samples: List[str] = Field(default_factory=list, description="Exemple de fișiere orfane")
+    finished: bool = Field(False, description="Parcurgerea s-a încheiat")
+
+
+class CleanupJobResponse(BaseModel):
+    """Starea unei reconcilieri a fișierelor (sarcină de fundal)"""
+    job_id: str = Field(..., description="ID-ul sarcinii")
+    status: str = Field(..., description="pending, running, done sau failed")
+    error: Optional[str] = Field(None, description="Eroarea ultimei încercări")
+    created_at: datetime = Field(..., description="Data creării")
+    finished_at: Optional[datetime] = Field(None, description="Data finalizării")
+    report: Optional[CleanupStats] = Field(None, description="Raportul final sau progresul curent")
 
 
 class DownloadTrackingRequest(BaseModel):
@@ -3,6 +3,7 @@ Schema pentru validarea formularelor și sesizărilor
 """
 from datetime import datetime
 from typing import List, Optional, Dict, Any
+from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field, validator
 from enum import Enum
 
@@ -97,6 +98,9 @@ class ComplaintBase(BaseModel):
 class ComplaintCreate(ComplaintBase):
     category_id: int
     consent_given: bool = Field(..., description="Consimțământul GDPR este obligatoriu")
+    # Tokenurile upload_token returnate de /files/upload, nu căi
+    attached_photos: Optional[List[str]] = Field(None, max_length=10)
+    attached_documents: Optional[List[str]] = Field(None, max_length=10)
 
     @validator('consent_given')
     def validate_consent(cls, v):
@@ -229,6 +233,8 @@ class FormSubmissionBase(BaseModel):
 class FormSubmissionCreate(FormSubmissionBase):
     form_type_id: int
     consent_given: bool = Field(..., description="Consimțământul GDPR este obligatoriu")
+    # Tokenurile upload_token returnate de /files/upload, nu căi
+    attached_files: Optional[List[str]] = Field(None, max_length=10)
 
     @validator('consent_given')
     def validate_consent(cls, v):
@@ -316,6 +322,88 @@ class FileUploadResponse(BaseModel):
     upload_id: str
 
 
+class GeneratedDocumentResponse(BaseModel):
+    """Document oficial generat pentru o cerere"""
+    reference_number: str
+    document_type: str
+    version: int
+    file_path: str
+    download_url: str
+    filename: str
+    mime_type: str
+    file_size: int
+    file_hash: str
+    render_ms: float
+    generated_at: str
+
+
+class GeneratedDocumentVersion(BaseModel):
+    """O versiune păstrată a unui document generat"""
+    version: int
+    document_type: str
+    file_name: str
+    mime_type: str
+    file_size: int
+    sha256: str
+    generated_at: datetime
+    download_url: str
+
+
+class GeneratedDocumentHistory(BaseModel):
+    """Ultima versiune a documentului generat și istoricul versiunilor păstrate"""
+    reference_number: str
+    latest: GeneratedDocumentVersion
+    versions: List[GeneratedDocumentVersion]
+
+
+class DocumentBatchOutput(str, Enum):
+    ZIP = "zip"
+    PDF = "pdf"
+
+
+class DocumentBatchRequest(BaseModel):
+    """Generare în lot: cererile date sau, fără ele, cele care corespund filtrului"""
+    submission_ids: Optional[List[UUID]] = None
+    form_type_id: Optional[int] = None
+    statuses: List[str] = Field(default_factory=lambda: ["approved"])
+    processed_from: Optional[datetime] = None
+    processed_to: Optional[datetime] = None
+    regenerate: bool = False  # regenerează și documentele existente
+    output: Optional[DocumentBatchOutput] = None  # arhivă ZIP sau un singur PDF pentru tipărire
+
+
+class DocumentBatchResponse(BaseModel):
+    """Starea unei generări în lot (sarcină de fundal)"""
+    job_id: str
+    status: str  # pending, running, done sau failed
+    total: int
+    progress: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    archive_url: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class DocumentTemplateInfo(BaseModel):
+    """Șablon de document oficial și originea lui"""
+    name: str
+    origin: str  # builtin, disk sau db
+    updated_at: Optional[datetime] = None
+
+
+class DocumentTemplateSource(BaseModel):
+    """Sursa unui șablon de document oficial"""
+    name: str
+    origin: str
+    content: str
+
+
+class DocumentTemplateUpdate(BaseModel):
+    """Conținutul nou al unui șablon (Jinja2 sau CSS)"""
+    content: str = Field(..., min_length=1, max_length=200_000)
+
+
 class FileUploadError(BaseModel):
     """Eroare la upload fișiere"""
     error: str
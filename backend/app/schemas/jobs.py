@@ -0,0 +1,24 @@
+"""
+Scheme Pydantic pentru sarcinile de fundal
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class BackgroundJobResponse(BaseModel):
+    """Starea unei sarcini de fundal"""
+    id: UUID = Field(..., description="ID-ul sarcinii")
+    kind: str = Field(..., description="Tipul sarcinii")
+    status: str = Field(..., description="pending, running, done sau failed")
+    attempts: int = Field(..., description="Numărul de încercări")
+    result: Optional[Dict[str, Any]] = Field(None, description="Rezultatul (inclusiv duratele de procesare)")
+    error: Optional[str] = Field(None, description="Eroarea ultimei încercări")
+    progress: Optional[Dict[str, Any]] = Field(None, description="Progresul raportat în timpul rulării")
+    created_at: datetime = Field(..., description="Data creării")
+    started_at: Optional[datetime] = Field(None, description="Începutul ultimei încercări")
+    finished_at: Optional[datetime] = Field(None, description="Data finalizării")
+    duration_ms: Optional[float] = Field(None, description="Durata ultimei încercări (ms)")
+    
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,104 @@
+"""
+Jurnalul de audit administrativ, scris asincron în lot
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert
+
+from ..core.batch_writer import AsyncBatchWriter
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..core.tasks import background_services
+from ..models.admin import AdminAuditLog
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class AuditLogSink(AsyncBatchWriter[Dict[str, Any]]):
+    """
+    Intrările de audit sunt puse într-o coadă limitată și scrise în loturi.
+    Dacă coada rămâne plină mai mult de enqueue_timeout, intrarea se scrie
+    direct, deci o intrare de audit nu se pierde niciodată din cauza cozii.
+    La oprirea aplicației coada este golită.
+    """
+
+    def __init__(self, enqueue_timeout: float = 2.0, **kwargs):
+        super().__init__("audit-log-sink", **kwargs)
+        self.enqueue_timeout = enqueue_timeout
+        self.inline_writes = 0
+
+    async def log(
+        self,
+        user_id: Optional[uuid.UUID],
+        action: str,
+        resource_type: str,
+        resource_id: Optional[str] = None,
+        old_values: Optional[dict] = None,
+        new_values: Optional[dict] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ):
+        """Aceeași semnătură ca AdminAuditLog.create_log, dar fără sesiunea apelantului"""
+        entry = {
+            "user_id": user_id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            # Copie serializabilă: apelantul poate modifica dicționarele după apel
+            "old_values": jsonable_encoder(old_values) if old_values is not None else None,
+            "new_values": jsonable_encoder(new_values) if new_values is not None else None,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "created_at": datetime.now(timezone.utc),
+        }
+
+        if await self.submit(entry, timeout=self.enqueue_timeout):
+            return
+
+        logger.warning("Coada de audit este plină, intrarea se scrie direct")
+        self.inline_writes += 1
+        await self.write_batch([entry])
+
+    async def write_batch(self, items: List[Dict[str, Any]]) -> None:
+        try:
+            async with async_session_maker() as session:
+                await session.execute(insert(AdminAuditLog).values(items))
+                await session.commit()
+            return
+        except Exception:
+            if len(items) == 1:
+                self._log_lost(items[0])
+                return
+            logger.exception(f"Lotul de audit ({len(items)} intrări) a eșuat, se reîncearcă individual")
+
+        # O intrare invalidă nu trebuie să compromită tot lotul
+        for item in items:
+            try:
+                async with async_session_maker() as session:
+                    await session.execute(insert(AdminAuditLog).values(item))
+                    await session.commit()
+            except Exception:
+                self._log_lost(item)
+
+    def _log_lost(self, item: Dict[str, Any]):
+        """Ultima soluție: intrarea ajunge măcar în log-ul aplicației"""
+        logger.exception(f"Intrare de audit nescrisă în baza de date: {item!r}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "inline_writes": self.inline_writes}
+
+
+# Instanța globală per worker
+audit_logger = background_services.register(
+    AuditLogSink(
+        enqueue_timeout=settings.AUDIT_LOG_ENQUEUE_TIMEOUT,
+        max_queue_size=settings.AUDIT_LOG_QUEUE_SIZE,
+        batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+        flush_interval=settings.AUDIT_LOG_FLUSH_INTERVAL
+    )
+)
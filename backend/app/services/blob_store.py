@@ -0,0 +1,344 @@
+"""
+Stocarea fișierelor încărcate după conținut (SHA-256), cu numărarea referințelor
+
+Același fișier încărcat de mai multe ori (aceeași HCL în MOL și în documente,
+reîncărcări) ocupă un singur loc pe disc, la blobs/ab/cd/<sha256><ext>.
+Un upload duplicat devine doar o actualizare a rândului din stored_blobs.
+
+Referințele vin din Document, MOLDocument, cereri (attached_files) și
+sesizări (attached_photos, attached_documents). Un blob fără referințe este
+păstrat BLOB_UNREFERENCED_GRACE_HOURS (un fișier încărcat este atașat abia la
+trimiterea cererii), apoi este șters de colectorul periodic.
+
+Cetățenii atașează fișierele la cereri și sesizări prin tokenul de upload
+(semnat, valabil cât perioada de grație), nu prin cale: altfel oricine ar
+putea referi și revendica blob-urile încărcate de alții.
+"""
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import logging
+import os
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import delete, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..core.tasks import PeriodicTask, background_services
+from ..models.documents import StoredBlob
+from . import image_service
+from .storage_manifest import storage_manifest
+from ..utils.file_handler import stream_upload_to_path
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+BLOB_PREFIX = "blobs"
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    """Rezultatul unui upload: blob-ul (nou sau existent) care conține fișierul"""
+    sha256: str
+    storage_path: str  # relativă la UPLOAD_DIR
+    size: int
+    mime_type: Optional[str]
+    created: bool  # False dacă același conținut era deja stocat
+
+    @property
+    def deduplicated(self) -> bool:
+        return not self.created
+
+
+def is_blob_path(path: Optional[str]) -> bool:
+    """Fișierele salvate înainte de stocarea după conținut au alte căi și nu au referințe"""
+    return bool(path) and path.replace("\\", "/").startswith(BLOB_PREFIX + "/")
+
+
+def _token_signature(payload: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), f"upload:{payload}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def upload_token(path: str) -> str:
+    """Tokenul returnat la upload, cu care fișierul poate fi atașat la o cerere sau sesizare"""
+    expires = int(time.time()) + settings.BLOB_UNREFERENCED_GRACE_HOURS * 3600
+    encoded = base64.urlsafe_b64encode(path.encode("utf-8")).decode("ascii").rstrip("=")
+    payload = f"{expires}.{encoded}"
+    return f"{payload}.{_token_signature(payload)}"
+
+
+def paths_from_upload_tokens(tokens: Optional[Iterable[str]]) -> List[str]:
+    """Căile fișierelor din tokenurile de upload; 400 pentru un token invalid sau expirat"""
+    paths = []
+    for token in tokens or ():
+        try:
+            expires, encoded, signature = token.split(".")
+            valid = hmac.compare_digest(signature, _token_signature(f"{expires}.{encoded}")) and int(expires) > time.time()
+            path = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode("utf-8") if valid else None
+        except (ValueError, binascii.Error, UnicodeDecodeError):
+            path = None
+        if not path:
+            raise HTTPException(
+                status_code=400,
+                detail="Fișierul atașat nu este valid sau a expirat. Vă rugăm să îl încărcați din nou."
+            )
+        paths.append(path)
+    return paths
+
+
+class BlobStore:
+    """Stocare după conținut sub `root`; colectează blob-urile fără referințe la fiecare `gc_interval` secunde"""
+
+    def __init__(self, root: str, gc_interval: float = 3600, grace_hours: int = 24, gc_batch_size: int = 500):
+        self.root = Path(root)
+        self.grace = timedelta(hours=grace_hours)
+        self.gc_batch_size = gc_batch_size
+        self.uploads = 0
+        self.deduplicated = 0
+        self.bytes_saved = 0
+        self.collected = 0
+        self._task = PeriodicTask("blob-gc", self.collect_garbage, gc_interval, run_on_stop=False)
+
+    def blob_path(self, sha256: str, extension: str = "") -> str:
+        return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension.lower()}"
+
+    def absolute_path(self, storage_path: str) -> Path:
+        return self.root / storage_path
+
+    async def store(
+        self,
+        file: UploadFile,
+        max_bytes: int,
+        extension: str = "",
+        mime_type: Optional[str] = None,
+        db: Optional[AsyncSession] = None
+    ) -> StoredFile:
+        """
+        Copiază upload-ul pe disc o singură dată și îl înregistrează după hash.
+        Cu `db`, adaugă o referință în tranzacția apelantului (care face commit);
+        fără `db`, blob-ul este înregistrat fără referințe, pentru atașare ulterioară.
+        """
+        temp_dir = self.root / "temp"
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = temp_dir / f"{uuid.uuid4().hex}.upload"
+
+        size, sha256 = await stream_upload_to_path(file, temp_path, max_bytes)
+        return await self.adopt(temp_path, size, sha256, extension, mime_type, db)
+
+    async def adopt(
+        self,
+        temp_path: Path,
+        size: int,
+        sha256: str,
+        extension: str = "",
+        mime_type: Optional[str] = None,
+        db: Optional[AsyncSession] = None
+    ) -> StoredFile:
+        """
+        Înregistrează un fișier deja scris sub root (cu hash-ul calculat la scriere),
+        de exemplu un upload reluabil finalizat. Imaginile prea mari sunt întâi
+        redimensionate (cu hash-ul recalculat). Fișierul temporar este mutat sau șters.
+        """
+        source = temp_path
+        try:
+            # Conținutul este final înainte de înregistrare: blob-ul nu se mai modifică
+            optimized = await image_service.optimize_upload(temp_path, mime_type)
+            if optimized is not None:
+                source, size, sha256 = optimized
+            if db is not None:
+                stored = await self._register(db, sha256, size, mime_type, extension, source, refs=1)
+            else:
+                async with async_session_maker() as session:
+                    stored = await self._register(session, sha256, size, mime_type, extension, source, refs=0)
+                    await session.commit()
+        finally:
+            # Rămân doar dacă blob-ul exista deja sau înregistrarea a eșuat
+            temp_path.unlink(missing_ok=True)
+            source.unlink(missing_ok=True)
+
+        self.uploads += 1
+        if stored.deduplicated:
+            self.deduplicated += 1
+            self.bytes_saved += size
+        return stored
+
+    async def _register(
+        self,
+        db: AsyncSession,
+        sha256: str,
+        size: int,
+        mime_type: Optional[str],
+        extension: str,
+        temp_path: Path,
+        refs: int
+    ) -> StoredFile:
+        now = datetime.now(timezone.utc)
+        stmt = insert(StoredBlob).values(
+            sha256=sha256,
+            storage_path=self.blob_path(sha256, extension),
+            size=size,
+            mime_type=mime_type,
+            ref_count=refs,
+            created_at=now,
+            last_referenced_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StoredBlob.sha256],
+            set_={"ref_count": StoredBlob.ref_count + refs, "last_referenced_at": now}
+        ).returning(
+            StoredBlob.storage_path,
+            StoredBlob.size,
+            StoredBlob.mime_type,
+            literal_column("(xmax = 0)").label("created")
+        )
+        row = (await db.execute(stmt)).one()
+
+        # Rândul rămâne blocat până la commit, deci colectorul nu poate șterge
+        # fișierul între timp; dacă l-a șters chiar înainte, îl recreăm aici
+        target = self.absolute_path(row.storage_path)
+        if row.created or not await asyncio.to_thread(target.exists):
+            await asyncio.to_thread(self._place, temp_path, target)
+        if row.created:
+            await storage_manifest.record(row.storage_path, row.size, row.mime_type, sha256=sha256, db=db)
+
+        return StoredFile(
+            sha256=sha256,
+            storage_path=row.storage_path,
+            size=row.size,
+            mime_type=row.mime_type,
+            created=bool(row.created)
+        )
+
+    @staticmethod
+    def _place(temp_path: Path, target: Path):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, target)
+
+    async def acquire(
+        self,
+        db: AsyncSession,
+        paths: Iterable[Optional[str]],
+        owner: Optional[Tuple[str, Any]] = None
+    ):
+        """
+        Adaugă câte o referință pentru fiecare cale (în tranzacția apelantului).
+        `owner` (tip, id) devine proprietarul din manifest al fișierelor încă neatașate.
+        """
+        paths = list(paths)
+        await self._adjust(db, paths, +1)
+        if owner is not None:
+            await storage_manifest.claim(db, paths, *owner)
+
+    async def release(self, db: AsyncSession, paths: Iterable[Optional[str]]):
+        """Eliberează referințele; blob-urile rămase fără referințe sunt colectate după perioada de grație"""
+        await self._adjust(db, paths, -1)
+
+    async def _adjust(self, db: AsyncSession, paths: Iterable[Optional[str]], sign: int):
+        counts = Counter(path for path in paths if is_blob_path(path))
+        if not counts:
+            return
+
+        # Un singur UPDATE pentru toate căile cu același număr de apariții
+        by_count: Dict[int, List[str]] = defaultdict(list)
+        for path, count in counts.items():
+            by_count[count].append(path)
+
+        now = datetime.now(timezone.utc)
+        for count, group in by_count.items():
+            await db.execute(
+                update(StoredBlob)
+                .where(StoredBlob.storage_path.in_(group))
+                .values(
+                    ref_count=func.greatest(StoredBlob.ref_count + sign * count, 0),
+                    last_referenced_at=now
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    async def collect_garbage(self) -> int:
+        """Șterge blob-urile fără referințe mai vechi decât perioada de grație; returnează numărul lor"""
+        cutoff = datetime.now(timezone.utc) - self.grace
+        collected = 0
+        while True:
+            unreferenced = (
+                select(StoredBlob.sha256)
+                .where(StoredBlob.ref_count == 0, StoredBlob.last_referenced_at < cutoff)
+                .limit(self.gc_batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    delete(StoredBlob)
+                    .where(StoredBlob.sha256.in_(unreferenced), StoredBlob.ref_count == 0)
+                    .returning(StoredBlob.storage_path)
+                    .execution_options(synchronize_session=False)
+                )
+                paths = result.scalars().all()
+                await storage_manifest.remove(
+                    [path for storage_path in paths for path in self._files_of(storage_path)], db=db
+                )
+                # Fișierele se șterg înainte de commit: un upload concurent cu același
+                # conținut așteaptă rândul blocat și apoi recreează fișierul
+                await asyncio.to_thread(self._unlink_many, paths)
+                await db.commit()
+
+            collected += len(paths)
+            if len(paths) < self.gc_batch_size:
+                break
+
+        if collected:
+            self.collected += collected
+            logger.info(f"Șterse {collected} fișiere fără referințe")
+        return collected
+
+    @staticmethod
+    def _files_of(storage_path: str) -> List[str]:
+        """Blob-ul și thumbnail-ul lui, relative la UPLOAD_DIR"""
+        return [storage_path, f"thumbnails/thumb_{Path(storage_path).name}"]
+
+    def _unlink_many(self, paths: List[str]):
+        for storage_path in paths:
+            for relative_path in self._files_of(storage_path):
+                path = self.root / relative_path
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning(f"Nu s-a putut șterge {path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "uploads": self.uploads,
+            "deduplicated": self.deduplicated,
+            "bytes_saved": self.bytes_saved,
+            "collected": self.collected
+        }
+
+    async def start(self):
+        await self._task.start()
+
+    async def stop(self):
+        await self._task.stop()
+
+
+# Instanța globală per worker
+blob_store = background_services.register(
+    BlobStore(
+        root=settings.UPLOAD_DIR,
+        gc_interval=settings.BLOB_GC_INTERVAL,
+        grace_hours=settings.BLOB_UNREFERENCED_GRACE_HOURS,
+        gc_batch_size=settings.BLOB_GC_BATCH_SIZE
+    )
+)
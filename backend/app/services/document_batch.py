@@ -0,0 +1,369 @@
+"""
+Generarea în lot a documentelor oficiale pentru cererile aprobate
+
+Lista cererilor se stabilește la programare (ID-uri date sau un filtru) și se
+salvează în sarcina de fundal (background_jobs), deci lotul continuă după o
+repornire: sarcina rămasă în "running" este reluată de orice worker. Documentele
+se randează concurent în pool-ul de procese PDF, iar progresul și eșecurile
+per cerere sunt raportate în sarcină.
+
+Generarea este idempotentă per număr de referință: o cerere care are deja un
+document este sărită (cu `regenerate`, doar dacă documentul a fost generat
+după programarea lotului, adică la o reluare). Opțional, la final se creează
+o arhivă ZIP cu documentele sau un singur PDF pentru tipărire, ambele din
+fișierele înregistrate (exact versiunile din registru), șterse după
+`archive_hours`.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from pypdf import PdfWriter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..core.tasks import PeriodicTask, background_services
+from ..models.forms import FormSubmission, FormType
+from ..models.jobs import BackgroundJob
+from . import pdf_service
+from .generated_documents import generated_documents
+from .job_queue import job_queue
+from .municipality_config_service import municipality_config_store
+from .storage_manifest import storage_manifest
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DOCUMENT_BATCH_JOB_KIND = "documents.generate_batch"
+BATCH_ARCHIVE_DIR = "documents/batches"
+BATCH_OUTPUTS = ("zip", "pdf")
+GENERATABLE_STATUSES = ("approved", "completed")
+# Documente adăugate în arhivă între două raportări de progres
+ARCHIVE_CHUNK_SIZE = 25
+
+
+class DocumentBatchService:
+    """Programează și rulează generările în lot; șterge arhivele expirate"""
+
+    def __init__(
+        self,
+        root: str,
+        max_size: int = 500,
+        concurrency: int = 2,
+        archive_hours: int = 72,
+        progress_interval: float = 2,
+        cleanup_interval: float = 3600
+    ):
+        self.root = Path(root)
+        self.max_size = max_size
+        self.concurrency = max(1, concurrency)
+        self.archive_hours = archive_hours
+        self.progress_interval = progress_interval
+        self._task = PeriodicTask("document-batch-archive-cleanup", self.cleanup, cleanup_interval, run_on_stop=False)
+
+    async def select_submissions(
+        self,
+        db: AsyncSession,
+        statuses: Sequence[str] = ("approved",),
+        form_type_id: Optional[int] = None,
+        processed_from: Optional[datetime] = None,
+        processed_to: Optional[datetime] = None
+    ) -> List[uuid.UUID]:
+        """ID-urile cererilor care corespund filtrului, cel mult `max_size` + 1 (pentru verificarea limitei)"""
+        invalid = set(statuses) - set(GENERATABLE_STATUSES)
+        if invalid or not statuses:
+            raise HTTPException(
+                status_code=400,
+                detail="Documentele pot fi generate doar pentru cererile aprobate/finalizate"
+            )
+        query = select(FormSubmission.id).where(FormSubmission.status.in_(list(statuses)))
+        if form_type_id is not None:
+            query = query.where(FormSubmission.form_type_id == form_type_id)
+        if processed_from is not None:
+            query = query.where(FormSubmission.processed_at >= processed_from)
+        if processed_to is not None:
+            query = query.where(FormSubmission.processed_at <= processed_to)
+        result = await db.execute(query.order_by(FormSubmission.submitted_at).limit(self.max_size + 1))
+        return list(result.scalars())
+
+    async def schedule(
+        self,
+        db: AsyncSession,
+        submission_ids: Sequence[uuid.UUID],
+        regenerate: bool = False,
+        output: Optional[str] = None,
+        requested_by: Any = None
+    ) -> BackgroundJob:
+        """Salvează lotul ca sarcină de fundal (commit) și o returnează"""
+        # Ordinea este păstrată, duplicatele eliminate
+        submission_ids = list(dict.fromkeys(str(submission_id) for submission_id in submission_ids))
+        if not submission_ids:
+            raise HTTPException(status_code=400, detail="Nicio cerere de generat")
+        if len(submission_ids) > self.max_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Prea multe cereri într-un lot. Maxim permis: {self.max_size}"
+            )
+        if output is not None and output not in BATCH_OUTPUTS:
+            raise HTTPException(status_code=400, detail="Formatul arhivei trebuie să fie zip sau pdf")
+
+        job = await job_queue.enqueue(db, DOCUMENT_BATCH_JOB_KIND, {
+            "batch_id": uuid.uuid4().hex,
+            "submission_ids": submission_ids,
+            "regenerate": regenerate,
+            "output": output,
+            "requested_by": str(requested_by) if requested_by is not None else None,
+            "requested_at": datetime.now(timezone.utc).isoformat()
+        })
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        submission_ids = payload["submission_ids"]
+        requested_at = datetime.fromisoformat(payload["requested_at"])
+        progress = {"total": len(submission_ids), "processed": 0, "generated": 0, "skipped": 0, "failed": 0}
+        reported_at = 0.0
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with async_session_maker() as db:
+            municipality = (await municipality_config_store.get(db)).values
+
+        async def generate(submission_id: str) -> Dict[str, Any]:
+            nonlocal reported_at
+            async with semaphore:
+                try:
+                    item = await self._generate_one(
+                        submission_id, municipality, payload["regenerate"], requested_at, payload.get("requested_by")
+                    )
+                except Exception as e:
+                    logger.warning(f"Generarea documentului pentru cererea {submission_id} a eșuat: {e}")
+                    item = {"submission_id": submission_id, "status": "failed", "error": str(e)}
+
+            progress["processed"] += 1
+            progress[item["status"]] += 1
+            # Progresul (și semnul de viață al sarcinii) se salvează cel mult o dată la `progress_interval`
+            if time.monotonic() - reported_at >= self.progress_interval:
+                reported_at = time.monotonic()
+                await job_queue.report_progress(dict(progress))
+            return item
+
+        items = list(await asyncio.gather(*(generate(submission_id) for submission_id in submission_ids)))
+        await job_queue.report_progress(dict(progress))
+
+        archive = None
+        ready = [item for item in items if item["status"] != "failed"]
+        if payload.get("output") and ready:
+            archive = await self._build_archive(payload["batch_id"], payload["output"], ready, progress)
+
+        return {
+            **progress,
+            "documents": [
+                {key: item.get(key) for key in ("submission_id", "reference_number", "status", "version", "file_path")}
+                for item in ready
+            ],
+            "failures": [
+                {key: item.get(key) for key in ("submission_id", "reference_number", "error")}
+                for item in items if item["status"] == "failed"
+            ],
+            "archive": archive,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def archive_path(self, archive: Dict[str, Any]) -> Path:
+        return self.root / archive["file_path"]
+
+    async def cleanup(self) -> int:
+        """Șterge arhivele loturilor mai vechi de `archive_hours`"""
+        cutoff = time.time() - self.archive_hours * 3600
+        expired = await asyncio.to_thread(self._expired_archives, cutoff)
+        if expired:
+            await asyncio.to_thread(self._unlink_files, expired)
+            await storage_manifest.remove(expired)
+            logger.info(f"Șterse {len(expired)} arhive ale generărilor în lot")
+        return len(expired)
+
+    async def start(self):
+        await self._task.start()
+
+    async def stop(self):
+        await self._task.stop()
+
+    # ---------- intern ----------
+
+    async def _generate_one(
+        self,
+        submission_id: str,
+        municipality: Dict[str, Any],
+        regenerate: bool,
+        requested_at: datetime,
+        requested_by: Optional[str]
+    ) -> Dict[str, Any]:
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(FormSubmission, FormType)
+                .join(FormType, FormType.id == FormSubmission.form_type_id)
+                .where(FormSubmission.id == uuid.UUID(submission_id))
+            )
+            row = result.first()
+            if not row:
+                return {"submission_id": submission_id, "status": "failed", "error": "Cererea nu a fost găsită"}
+            submission, form_type = row
+            item = {
+                "submission_id": submission_id,
+                "reference_number": submission.reference_number,
+                "document_type": form_type.slug,
+                "data": pdf_service.submission_document_data(submission, form_type.name)
+            }
+            if submission.status not in GENERATABLE_STATUSES:
+                return {
+                    **item,
+                    "status": "failed",
+                    "error": "Documentul poate fi generat doar pentru cererile aprobate/finalizate"
+                }
+
+            # Lacătul este ținut până la commit-ul din record(): un alt lot (sau o reluare a
+            # acestuia cât timp prima rulare încă randează) vede documentul abia după ce există
+            await generated_documents.lock(db, submission.reference_number)
+            # Un document existent (sau generat de o încercare anterioară a lotului) nu se regenerează
+            latest = await generated_documents.latest(db, submission.reference_number)
+            if latest is not None and (not regenerate or latest.generated_at >= requested_at):
+                return {
+                    **item,
+                    "status": "skipped",
+                    "version": latest.version,
+                    "file_path": latest.storage_path,
+                    "file_name": latest.file_name
+                }
+
+            document = await pdf_service.render_official_document(
+                form_type.slug,
+                item["data"],
+                municipality,
+                reject_when_full=False,
+                db=db,
+                submission_id=submission.id,
+                generated_by=uuid.UUID(requested_by) if requested_by else None
+            )
+        return {
+            **item,
+            "status": "generated",
+            "version": document["version"],
+            "file_path": document["file_path"],
+            "file_name": document["filename"]
+        }
+
+    async def _build_archive(
+        self,
+        batch_id: str,
+        output: str,
+        items: List[Dict[str, Any]],
+        progress: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        storage_path = f"{BATCH_ARCHIVE_DIR}/{batch_id}.{output}"
+        path = self.root / storage_path
+        temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        try:
+            if output == "pdf":
+                # PDF-urile înregistrate se concatenează, fără o nouă randare
+                writer = PdfWriter()
+                await self._add_in_chunks(items, progress, lambda chunk: self._append_pdfs(writer, chunk))
+                await asyncio.to_thread(self._write_pdf, writer, temp_path)
+                mime_type = "application/pdf"
+            else:
+                # PDF-urile sunt deja comprimate
+                with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_STORED) as archive:
+                    await self._add_in_chunks(items, progress, lambda chunk: self._append_zip(archive, chunk))
+                mime_type = "application/zip"
+            size, sha256 = await asyncio.to_thread(self._publish, temp_path, path)
+        finally:
+            await asyncio.to_thread(temp_path.unlink, missing_ok=True)
+
+        await storage_manifest.record(
+            storage_path, size, mime_type, sha256=sha256, owner=("document_batch", batch_id)
+        )
+        return {
+            "file_path": storage_path,
+            "file_name": f"Documente_{batch_id[:8]}.{output}",
+            "mime_type": mime_type,
+            "file_size": size,
+            "documents": len(items),
+            "expires_at": (datetime.now(timezone.utc) + timedelta(hours=self.archive_hours)).isoformat()
+        }
+
+    async def _add_in_chunks(self, items: List[Dict[str, Any]], progress: Dict[str, Any], add):
+        """Adaugă documentele în fir separat, pe bucăți; progresul ține sarcina activă (nu este preluată din nou)"""
+        for start in range(0, len(items), ARCHIVE_CHUNK_SIZE):
+            await asyncio.to_thread(add, items[start:start + ARCHIVE_CHUNK_SIZE])
+            progress["archived"] = min(start + ARCHIVE_CHUNK_SIZE, len(items))
+            await job_queue.report_progress(dict(progress))
+
+    def _append_pdfs(self, writer: PdfWriter, items: List[Dict[str, Any]]):
+        for item in items:
+            writer.append(str(self.root / item["file_path"]))
+
+    def _append_zip(self, archive: zipfile.ZipFile, items: List[Dict[str, Any]]):
+        for item in items:
+            archive.write(self.root / item["file_path"], arcname=item["file_name"])
+
+    @staticmethod
+    def _write_pdf(writer: PdfWriter, path: Path):
+        with open(path, "wb") as f:
+            writer.write(f)
+
+    @staticmethod
+    def _publish(temp_path: Path, path: Path) -> Tuple[int, str]:
+        """Hash-ul și dimensiunea arhivei; apoi o mută atomic la calea finală"""
+        digest = hashlib.sha256()
+        size = 0
+        with open(temp_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        os.replace(temp_path, path)
+        return size, digest.hexdigest()
+
+    def _expired_archives(self, cutoff: float) -> List[str]:
+        directory = self.root / BATCH_ARCHIVE_DIR
+        if not directory.is_dir():
+            return []
+        return [
+            f"{BATCH_ARCHIVE_DIR}/{entry.name}"
+            for entry in os.scandir(directory)
+            if entry.is_file() and entry.stat().st_mtime < cutoff
+        ]
+
+    def _unlink_files(self, paths: Sequence[str]):
+        for path in paths:
+            try:
+                (self.root / path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Nu s-a putut șterge arhiva {path}: {e}")
+
+
+# Instanța globală per worker
+document_batches = background_services.register(
+    DocumentBatchService(
+        root=settings.UPLOAD_DIR,
+        max_size=settings.DOCUMENT_BATCH_MAX_SIZE,
+        concurrency=settings.DOCUMENT_BATCH_CONCURRENCY,
+        archive_hours=settings.DOCUMENT_BATCH_ARCHIVE_HOURS
+    )
+)
+
+
+@job_queue.handler(DOCUMENT_BATCH_JOB_KIND)
+async def _run_document_batch_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await document_batches.run(payload)
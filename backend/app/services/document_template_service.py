@@ -0,0 +1,64 @@
+"""
+Șabloanele documentelor oficiale modificate din administrare (tabelul document_templates)
+
+Setul de șabloane active este un instantaneu per worker: încărcat o dată din DB
+și reîncărcat doar după o modificare, pe toate worker-ele (eticheta
+document_templates). La fiecare versiune nouă registrul Jinja își golește
+șabloanele compilate, deci modificările se văd fără deploy sau repornire.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Mapping, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.http_cache import DOCUMENT_TEMPLATES_CACHE_TAG
+from ..core.snapshot import TaggedSnapshot
+from ..core.tasks import background_services
+from ..models.forms import DocumentTemplate
+from ..utils.document_templates import Override
+from ..utils.pdf_generator import document_templates
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentTemplateStore(TaggedSnapshot[Mapping[str, Override]]):
+    """Înlocuirile active din DB, instalate în registrul de șabloane al procesului"""
+
+    def __init__(self):
+        super().__init__("document_templates", tags=(DOCUMENT_TEMPLATES_CACHE_TAG,))
+
+    async def build(self, db: AsyncSession) -> Mapping[str, Override]:
+        result = await db.execute(
+            select(DocumentTemplate.name, DocumentTemplate.content, DocumentTemplate.updated_at)
+            .where(DocumentTemplate.is_active.is_(True))
+        )
+        return {row.name: (row.content, row.updated_at) for row in result}
+
+    async def render(
+        self,
+        document_type: str,
+        data: Dict[str, Any],
+        municipality_config: Mapping[str, Any],
+        inline_css: bool = False
+    ) -> Tuple[str, str]:
+        """HTML-ul documentului și foaia de stil, cu șabloanele din DB la zi"""
+        document_templates.set_overrides(await self.get())
+        html = document_templates.render(document_type, data, municipality_config, inline_css=inline_css)
+        return html, document_templates.stylesheet()
+
+    async def start(self):
+        # Șabloanele livrate se compilează la pornire (din bytecode-ul de pe disc, dacă există)
+        try:
+            durations = await asyncio.to_thread(document_templates.precompile)
+            logger.info(f"Șabloane de documente compilate: {len(durations)} în {sum(durations.values()):.1f} ms")
+        except Exception as e:
+            logger.error(f"Eroare la compilarea șabloanelor de documente: {e}")
+
+    async def stop(self):
+        pass
+
+
+# Instanța globală per worker
+document_template_store = background_services.register(DocumentTemplateStore())
@@ -1,20 +1,33 @@
 """
 Servicii pentru upload și managementul fișierelor
 """
+import asyncio
 import os
 import uuid
 import mimetypes
 import shutil
 import hashlib
+import logging
 from pathlib import Path
 from typing import List, Optional, Dict, Any, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi import UploadFile, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_
-from PIL import Image
+from sqlalchemy import Integer, any_, bindparam, delete, select, func, or_, and_
+from sqlalchemy.dialects.postgresql import ARRAY as PG_ARRAY
+from sqlalchemy.orm import selectinload
 from ..models.documents import Document, DocumentCategory, DocumentDownload
 from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..utils.file_handler import FileTooLargeError
+from .blob_store import StoredFile, blob_store, is_blob_path, upload_token
+from .storage_manifest import storage_manifest
+from ..core.process_pool import ProcessPoolBusy
+from . import image_service
+from .job_queue import job_queue
+from .resumable_upload import resumable_uploads
+
+logger = logging.getLogger(__name__)
 
 
 class FileService:
@@ -58,10 +71,6 @@ class FileService:
         'audio/ogg': ['.ogg']
     }
     
-    # Dimensiuni maxime pentru imagini
-    MAX_IMAGE_SIZE = (2048, 2048)  # 2048x2048 px
-    THUMBNAIL_SIZE = (300, 300)    # thumbnail 300x300 px
-    
     def __init__(self):
         self.settings = get_settings()
         self.upload_dir = Path(self.settings.UPLOAD_DIR if hasattr(self.settings, 'UPLOAD_DIR') 
@@ -90,29 +99,39 @@ class FileService:
             if size > max_size_bytes:
                 errors.append(f"Fișierul este prea mare. Maxim permis: {max_size_mb}MB")
         
-        # Verifică tipul MIME
         mime_type = file.content_type
+        file_ext = Path(file.filename).suffix.lower()
+        errors.extend(FileService.validate_metadata(file.filename, mime_type))
+        
+        return {
+            "is_valid": len(errors) == 0,
+            "errors": errors,
+            "size": size if 'size' in locals() else 0,
+            "mime_type": mime_type,
+            "extension": file_ext
+        }
+    
+    @staticmethod
+    def validate_metadata(filename: Optional[str], mime_type: Optional[str]) -> List[str]:
+        """Verificările de tip, extensie și nume (și pentru upload-urile reluabile, înainte de primul octet)"""
+        errors = []
+        
+        # Verifică tipul MIME
         if mime_type not in FileService.ALLOWED_MIME_TYPES:
             errors.append(f"Tipul de fișier '{mime_type}' nu este permis")
         
         # Verifică extensia
-        file_ext = Path(file.filename).suffix.lower()
+        file_ext = Path(filename or "").suffix.lower()
         if mime_type in FileService.ALLOWED_MIME_TYPES:
             allowed_extensions = FileService.ALLOWED_MIME_TYPES[mime_type]
             if file_ext not in allowed_extensions:
                 errors.append(f"Extensia '{file_ext}' nu corespunde tipului MIME '{mime_type}'")
         
         # Verifică numele fișierului
-        if not file.filename or len(file.filename) > 255:
+        if not filename or len(filename) > 255:
             errors.append("Numele fișierului este invalid sau prea lung")
         
-        return {
-            "is_valid": len(errors) == 0,
-            "errors": errors,
-            "size": size if 'size' in locals() else 0,
-            "mime_type": mime_type,
-            "extension": file_ext
-        }
+        return errors
     
     def generate_secure_filename(self, original_filename: str, prefix: str = "") -> str:
         """Generează nume securizat pentru fișier"""
@@ -143,105 +162,149 @@ class FileService:
     async def save_uploaded_file(
         self, 
         file: UploadFile, 
-        subfolder: str = "documents",
-        prefix: str = "",
-        generate_thumbnail: bool = False
+        generate_thumbnail: bool = False,
+        max_size_mb: int = 50,
+        db: Optional[AsyncSession] = None,
+        wait_for_images: bool = False
     ) -> Dict[str, Any]:
-        """Salvează fișierul uploadat și returnează informațiile"""
+        """
+        Salvează fișierul uploadat și returnează informațiile.
+        Fișierul este stocat după conținut: un duplicat nu mai ocupă spațiu pe disc.
+        Cu `db`, referința către fișier este adăugată în tranzacția apelantului.
+        Imaginile sunt procesate după răspuns (processing_job_id) sau, cu
+        wait_for_images, înainte de răspuns, fără a bloca event loop-ul.
+        """
         
         # Validează fișierul
-        validation = self.validate_file(file)
+        validation = self.validate_file(file, max_size_mb)
         if not validation["is_valid"]:
             raise HTTPException(status_code=400, detail=validation["errors"])
         
-        # Generează numele securizat
-        secure_filename = self.generate_secure_filename(file.filename, prefix)
-        
-        # Calea completă
-        file_dir = self.upload_dir / subfolder
-        file_dir.mkdir(exist_ok=True)
-        file_path = file_dir / secure_filename
-        
         try:
-            # Salvează fișierul
-            with open(file_path, 'wb') as f:
-                content = await file.read()
-                f.write(content)
-            
-            # Calculează hash-ul
-            file_hash = self.calculate_file_hash(file_path)
-            
-            # Generează thumbnail pentru imagini
-            thumbnail_path = None
-            if generate_thumbnail and validation["mime_type"].startswith("image/"):
-                thumbnail_path = await self._generate_thumbnail(file_path, secure_filename)
-            
-            # Optimizează imaginile
-            if validation["mime_type"].startswith("image/"):
-                await self._optimize_image(file_path)
-            
-            file_info = {
-                "original_filename": file.filename,
-                "secure_filename": secure_filename,
-                "file_path": str(file_path.relative_to(self.upload_dir)),
-                "absolute_path": str(file_path),
-                "file_size": file_path.stat().st_size,
-                "mime_type": validation["mime_type"],
-                "extension": validation["extension"],
-                "file_hash": file_hash,
-                "thumbnail_path": thumbnail_path,
-                "upload_timestamp": datetime.now().isoformat()
-            }
-            
-            return file_info
+            # Salvează fișierul în bucăți; hash-ul se calculează în aceeași trecere
+            stored = await blob_store.store(
+                file,
+                max_size_mb * 1024 * 1024,
+                extension=validation["extension"],
+                mime_type=validation["mime_type"],
+                db=db
+            )
+            return await self._stored_file_info(
+                stored, file.filename, validation["mime_type"], validation["extension"],
+                generate_thumbnail, db, wait_for_images
+            )
             
+        except FileTooLargeError:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Fișierul este prea mare. Maxim permis: {max_size_mb}MB"
+            )
+        except HTTPException:
+            raise
         except Exception as e:
-            # Șterge fișierul dacă salvarea a eșuat
-            if file_path.exists():
-                file_path.unlink()
+            # Blob-ul poate fi partajat, deci nu se șterge aici; fără referințe, va fi colectat
             raise HTTPException(status_code=500, detail=f"Eroare la salvarea fișierului: {str(e)}")
     
-    async def _generate_thumbnail(self, image_path: Path, filename: str) -> Optional[str]:
-        """Generează thumbnail pentru imagine"""
-        try:
-            thumbnail_filename = f"thumb_{filename}"
-            thumbnail_path = self.upload_dir / "thumbnails" / thumbnail_filename
-            
-            with Image.open(image_path) as img:
-                # Convertește la RGB dacă e necesar
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Redimensionează păstrând proporțiile
-                img.thumbnail(self.THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
-                
-                # Salvează thumbnail-ul
-                img.save(thumbnail_path, 'JPEG', quality=85, optimize=True)
-            
-            return str(thumbnail_path.relative_to(self.upload_dir))
-            
-        except Exception as e:
-            print(f"Eroare la generarea thumbnail-ului: {e}")
-            return None
+    async def save_resumable_upload(
+        self,
+        db: AsyncSession,
+        upload_id: uuid.UUID,
+        generate_thumbnail: bool = False,
+        reference: bool = False,
+        wait_for_images: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Finalizează un upload reluabil și returnează aceleași informații ca save_uploaded_file.
+        Cu `reference`, referința și sarcina de procesare sunt în tranzacția lui `db`
+        (apelantul face commit); altfel fișierul așteaptă să fie atașat prin file_path.
+        """
+        upload = await resumable_uploads.get(db, upload_id)
+        stored = await resumable_uploads.complete(upload, db if reference else None)
+        return await self._stored_file_info(
+            stored, upload.filename, upload.mime_type, Path(upload.filename).suffix.lower(),
+            generate_thumbnail, db if reference else None, wait_for_images
+        )
     
-    async def _optimize_image(self, image_path: Path) -> None:
-        """Optimizează imaginea (redimensionare și compresie)"""
+    async def _stored_file_info(
+        self,
+        stored: StoredFile,
+        original_filename: str,
+        mime_type: str,
+        extension: str,
+        generate_thumbnail: bool,
+        db: Optional[AsyncSession],
+        wait_for_images: bool
+    ) -> Dict[str, Any]:
+        file_path = blob_store.absolute_path(stored.storage_path)
+        
+        # Thumbnail-ul și variantele se fac o singură dată per conținut, în pool-ul de procese
+        thumbnail_path = None
+        processing_job_id = None
+        if image_service.can_process(mime_type):
+            plan = image_service.processing_plan(stored.storage_path, mime_type, stored.created, generate_thumbnail)
+            if plan:
+                processing = await image_service.schedule(
+                    db, stored.storage_path, thumbnail=plan["thumbnail"], pregenerate=plan["pregenerate"],
+                    wait=wait_for_images
+                )
+                processing_job_id = processing["job_id"]
+            if generate_thumbnail:
+                thumbnail_path = image_service.thumbnail_path_for(stored.storage_path)
+        
+        return {
+            "filename": file_path.name,
+            "original_filename": original_filename,
+            "secure_filename": file_path.name,
+            "file_path": stored.storage_path,
+            "absolute_path": str(file_path),
+            "size": stored.size,
+            "file_size": stored.size,
+            "mime_type": mime_type,
+            "extension": extension,
+            "file_hash": stored.sha256,
+            "upload_token": upload_token(stored.storage_path),
+            "deduplicated": stored.deduplicated,
+            "thumbnail_path": thumbnail_path,
+            "processing_job_id": processing_job_id,
+            "upload_timestamp": datetime.now().isoformat()
+        }
+    
+    async def get_image_variant(
+        self,
+        file_path: str,
+        width: int,
+        image_format: Optional[str] = None,
+        quality: Optional[int] = None,
+        accept: str = ""
+    ) -> Tuple[Path, str]:
+        """
+        Varianta redimensionată a unei imagini încărcate (cale și tip MIME).
+        Fără format explicit se alege WebP dacă clientul îl acceptă, altfel JPEG.
+        """
+        full_path = self.upload_dir / file_path
         try:
-            with Image.open(image_path) as img:
-                # Verifică dacă imaginea e prea mare
-                if img.size[0] > self.MAX_IMAGE_SIZE[0] or img.size[1] > self.MAX_IMAGE_SIZE[1]:
-                    # Redimensionează păstrând proporțiile
-                    img.thumbnail(self.MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
-                    
-                    # Convertește la RGB dacă e necesar
-                    if img.mode in ('RGBA', 'P'):
-                        img = img.convert('RGB')
-                    
-                    # Salvează imaginea optimizată
-                    img.save(image_path, 'JPEG', quality=90, optimize=True)
-                    
-        except Exception as e:
-            print(f"Eroare la optimizarea imaginii: {e}")
+            relative_path = full_path.resolve().relative_to(self.upload_dir.resolve()).as_posix()
+        except ValueError:
+            raise HTTPException(status_code=403, detail="Calea fișierului nu este permisă")
+        
+        if not image_service.can_process(mimetypes.guess_type(relative_path)[0]):
+            raise HTTPException(status_code=400, detail="Fișierul nu este o imagine care poate fi redimensionată")
+        
+        if image_format is None:
+            image_format = "webp" if "image/webp" in accept else "jpeg"
+        
+        try:
+            return await image_service.variant_cache.get(relative_path, width, image_format, quality)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Fișierul nu a fost găsit")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ProcessPoolBusy:
+            raise HTTPException(
+                status_code=503,
+                detail="Serverul procesează prea multe imagini. Reîncercați în câteva secunde.",
+                headers={"Retry-After": "2"}
+            )
     
     async def get_file_info(self, file_path: str) -> Optional[Dict[str, Any]]:
         """Returnează informații despre fișier"""
@@ -272,10 +335,16 @@ class FileService:
             size_bytes /= 1024.0
         return f"{size_bytes:.1f} TB"
     
-    async def delete_file(self, file_path: str, delete_thumbnail: bool = True) -> bool:
-        """Șterge un fișier și thumbnail-ul asociat"""
+    async def delete_file(
+        self,
+        file_path: str,
+        delete_thumbnail: bool = True,
+        db: Optional[AsyncSession] = None
+    ) -> bool:
+        """Șterge un fișier și thumbnail-ul asociat (și din manifestul de stocare, în tranzacția `db`)"""
         try:
             full_path = self.upload_dir / file_path
+            removed = [file_path]
             
             if full_path.exists():
                 full_path.unlink()
@@ -283,52 +352,27 @@ class FileService:
             # Șterge și thumbnail-ul dacă există
             if delete_thumbnail:
                 thumbnail_path = self.upload_dir / "thumbnails" / f"thumb_{full_path.name}"
+                removed.append(f"thumbnails/{thumbnail_path.name}")
                 if thumbnail_path.exists():
                     thumbnail_path.unlink()
             
+            await storage_manifest.remove(removed, db=db)
             return True
             
         except Exception as e:
             print(f"Eroare la ștergerea fișierului {file_path}: {e}")
             return False
-    
-    async def cleanup_orphaned_files(self, db: AsyncSession) -> Dict[str, int]:
-        """Curăță fișierele orfane (fără înregistrări în baza de date)"""
-        stats = {
-            "total_files": 0,
-            "orphaned_files": 0,
-            "deleted_files": 0,
-            "errors": 0
-        }
-        
-        try:
-            # Obține toate fișierele din baza de date
-            result = await db.execute(
-                select(Document.file_path).where(Document.file_path.isnot(None))
-            )
-            db_files = set(row[0] for row in result.fetchall())
-            
-            # Scandează directorul de upload
-            for file_path in self.upload_dir.rglob("*"):
-                if file_path.is_file() and not file_path.name.startswith('.'):
-                    stats["total_files"] += 1
-                    relative_path = str(file_path.relative_to(self.upload_dir))
-                    
-                    if relative_path not in db_files:
-                        stats["orphaned_files"] += 1
-                        try:
-                            file_path.unlink()
-                            stats["deleted_files"] += 1
-                        except Exception as e:
-                            print(f"Eroare la ștergerea fișierului orfan {relative_path}: {e}")
-                            stats["errors"] += 1
-            
-            return stats
-            
-        except Exception as e:
-            print(f"Eroare la curățarea fișierelor orfane: {e}")
-            stats["errors"] += 1
-            return stats
+
+
+    def remove_files(self, file_paths: List[str]):
+        """Șterge de pe disc fișierele (și thumbnail-urile lor); rulat ca sarcină după răspuns"""
+        for file_path in file_paths:
+            full_path = self.upload_dir / file_path
+            for path in (full_path, self.upload_dir / "thumbnails" / f"thumb_{full_path.name}"):
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning(f"Eroare la ștergerea fișierului {path}: {e}")
 
 
 class DocumentService:
@@ -340,24 +384,29 @@ class DocumentService:
     async def create_document(
         self,
         db: AsyncSession,
-        file: UploadFile,
+        file: Optional[UploadFile],
         title: str,
         description: Optional[str] = None,
         category_id: Optional[int] = None,
         tags: Optional[List[str]] = None,
         is_public: bool = True,
         requires_auth: bool = False,
-        uploaded_by: Optional[str] = None
+        uploaded_by: Optional[str] = None,
+        upload_id: Optional[uuid.UUID] = None
     ) -> Document:
-        """Creează un document nou cu fișier"""
-        
-        # Salvează fișierul
-        file_info = await self.file_service.save_uploaded_file(
-            file, 
-            subfolder="documents",
-            prefix="doc",
-            generate_thumbnail=True
-        )
+        """Creează un document nou cu fișier (din cerere sau dintr-un upload reluabil finalizat aici)"""
+        
+        # Salvează fișierul și adaugă referința în aceeași tranzacție
+        if upload_id is not None:
+            file_info = await self.file_service.save_resumable_upload(
+                db, upload_id, generate_thumbnail=True, reference=True
+            )
+        else:
+            file_info = await self.file_service.save_uploaded_file(
+                file, 
+                generate_thumbnail=True,
+                db=db
+            )
         
         # Creează înregistrarea în baza de date
         document = Document(
@@ -375,11 +424,119 @@ class DocumentService:
         )
         
         db.add(document)
+        await db.flush()
+        await storage_manifest.claim(db, [document.file_path], "document", document.id)
         await db.commit()
         await db.refresh(document)
         
         return document
     
+    async def stage_files(
+        self,
+        files: List[UploadFile],
+        max_size_mb: int = 50,
+        concurrency: int = 4
+    ) -> List[Dict[str, Any]]:
+        """
+        Salvează fișierele concurent (cel mult `concurrency` simultan), fără referințe:
+        documentele se creează apoi toate odată. Un fișier invalid sau eșuat are "error".
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        max_bytes = max_size_mb * 1024 * 1024
+        
+        async def stage(file: UploadFile) -> Dict[str, Any]:
+            validation = self.file_service.validate_file(file, max_size_mb)
+            if not validation["is_valid"]:
+                return {"filename": file.filename, "error": "; ".join(validation["errors"])}
+            
+            async with semaphore:
+                try:
+                    stored = await blob_store.store(
+                        file, max_bytes, extension=validation["extension"], mime_type=validation["mime_type"]
+                    )
+                except FileTooLargeError:
+                    return {"filename": file.filename, "error": f"Fișierul este prea mare. Maxim permis: {max_size_mb}MB"}
+                except Exception as e:
+                    return {"filename": file.filename, "error": f"Eroare la salvarea fișierului: {str(e)}"}
+            
+            return {
+                "filename": file.filename,
+                "file_path": stored.storage_path,
+                "file_size": stored.size,
+                "mime_type": validation["mime_type"],
+                "extension": validation["extension"],
+                "created": stored.created
+            }
+        
+        return list(await asyncio.gather(*(stage(file) for file in files)))
+    
+    async def create_documents_bulk(
+        self,
+        db: AsyncSession,
+        staged: List[Dict[str, Any]],
+        category_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        is_public: bool = True,
+        requires_auth: bool = False,
+        uploaded_by: Optional[str] = None
+    ) -> Tuple[List[Document], List[str]]:
+        """
+        Creează documentele pentru fișierele salvate de stage_files într-o singură
+        tranzacție: referințele, rândurile și sarcinile de procesare a imaginilor
+        sunt salvate împreună sau deloc. Returnează documentele și job_id-urile.
+        """
+        staged = [item for item in staged if "error" not in item]
+        if not staged:
+            return [], []
+        
+        await blob_store.acquire(db, [item["file_path"] for item in staged])
+        
+        now = datetime.now(timezone.utc)
+        documents = [
+            Document(
+                title=Path(item["filename"]).stem,
+                category_id=category_id,
+                tags=tags,
+                file_path=item["file_path"],
+                file_name=item["filename"],
+                file_type=item["extension"],
+                file_size=item["file_size"],
+                is_public=is_public,
+                requires_auth=requires_auth,
+                uploaded_by=uploaded_by,
+                uploaded_at=now,
+                updated_at=now
+            )
+            for item in staged
+        ]
+        db.add_all(documents)
+        await db.flush()
+        
+        await storage_manifest.claim_many(
+            db, [(document.file_path, "document", document.id) for document in documents]
+        )
+        
+        # Imaginile sunt procesate după commit, în pool-ul de procese
+        plans = [
+            plan for plan in (
+                image_service.processing_plan(item["file_path"], item["mime_type"], item["created"], True)
+                for item in staged
+            ) if plan
+        ]
+        job_ids = await image_service.schedule_many(db, plans)
+        
+        await db.commit()
+        
+        # Documentele cu categoria încărcată, pentru serializare
+        result = await db.execute(
+            select(Document)
+            .options(selectinload(Document.category))
+            .where(Document.id.in_([document.id for document in documents]))
+            .order_by(Document.id)
+            .execution_options(populate_existing=True)
+        )
+        return list(result.scalars().all()), job_ids
+    
     async def get_document(self, db: AsyncSession, document_id: int) -> Optional[Document]:
         """Obține un document după ID"""
         result = await db.execute(
@@ -466,9 +623,11 @@ class DocumentService:
         if not document:
             return False
         
-        # Șterge fișierul
-        if document.file_path:
-            await self.file_service.delete_file(document.file_path)
+        # Eliberează fișierul (cele stocate după conținut pot fi partajate)
+        if is_blob_path(document.file_path):
+            await blob_store.release(db, [document.file_path])
+        elif document.file_path:
+            await self.file_service.delete_file(document.file_path, db=db)
         
         # Șterge înregistrarea
         await db.delete(document)
@@ -476,6 +635,43 @@ class DocumentService:
         
         return True
     
+    async def delete_documents_bulk(self, db: AsyncSession, document_ids: List[int]) -> Tuple[List[int], List[str]]:
+        """
+        Șterge documentele cu un singur DELETE ... WHERE id = ANY(...) RETURNING.
+        Statisticile de descărcare ale documentelor sunt șterse în aceeași instrucțiune.
+        Returnează ID-urile șterse și fișierele (în afara celor stocate după conținut)
+        care trebuie șterse de pe disc, după commit.
+        """
+        if not document_ids:
+            return [], []
+        
+        ids = bindparam("document_ids", list(set(document_ids)), type_=PG_ARRAY(Integer))
+        downloads = (
+            delete(DocumentDownload)
+            .where(DocumentDownload.document_id == any_(ids))
+            .returning(DocumentDownload.id)
+            .cte("deleted_downloads")
+        )
+        result = await db.execute(
+            delete(Document)
+            .where(Document.id == any_(ids))
+            .add_cte(downloads)
+            .returning(Document.id, Document.file_path)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        
+        # Blob-urile își pierd referința (colectorul le șterge); celelalte fișiere se șterg după răspuns
+        paths = [row.file_path for row in rows if row.file_path]
+        await blob_store.release(db, paths)
+        legacy_paths = [path for path in paths if not is_blob_path(path)]
+        await storage_manifest.remove(
+            legacy_paths + [f"thumbnails/thumb_{Path(path).name}" for path in legacy_paths], db=db
+        )
+        await db.commit()
+        
+        return [row.id for row in rows], legacy_paths
+    
     async def track_download(
         self,
         db: AsyncSession,
@@ -530,4 +726,18 @@ class DocumentService:
         )
         
         result = await db.execute(query)
-        return [row[0] for row in result.fetchall()]
\ No newline at end of file
+        return [row[0] for row in result.fetchall()]
+
+
+BULK_INGEST_JOB_KIND = "documents.bulk_ingest"
+
+
+@job_queue.handler(BULK_INGEST_JOB_KIND)
+async def _run_bulk_ingest_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Crearea documentelor pentru un upload în masă mare, după răspunsul HTTP"""
+    async with async_session_maker() as db:
+        documents, job_ids = await DocumentService().create_documents_bulk(db, payload["staged"], **payload["options"])
+    return {
+        "document_ids": [document.id for document in documents],
+        "processing_job_ids": job_ids
+    }
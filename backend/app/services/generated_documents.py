@@ -0,0 +1,218 @@
+"""
+Registrul documentelor oficiale generate (tabelul generated_documents)
+
+Fiecare generare adaugă o versiune nouă pentru numărul de referință; ultima
+versiune, istoricul și o versiune anume se citesc din indexul unic
+(reference_number, version), fără căutări și stat() pe disc. Versiunile
+înlocuite se păstrează conform politicii: cel mult `keep_versions` per
+document, iar cele mai vechi de `retention_days` sunt șterse periodic.
+Ultima versiune a unui document nu este ștearsă niciodată.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..core.tasks import PeriodicTask, background_services
+from ..models.forms import GeneratedDocument
+from .storage_manifest import storage_manifest
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class GeneratedDocumentRegistry:
+    """Număr de referință -> versiunile documentului generat"""
+
+    def __init__(
+        self,
+        root: str,
+        keep_versions: int = 5,
+        retention_days: int = 365,
+        cleanup_interval: float = 24 * 3600,
+        cleanup_batch_size: int = 500
+    ):
+        self.root = Path(root)
+        self.keep_versions = max(1, keep_versions)
+        self.retention_days = retention_days
+        self.cleanup_batch_size = cleanup_batch_size
+        self.recorded = 0
+        self.pruned = 0
+        self._task = PeriodicTask("generated-document-retention", self.cleanup, cleanup_interval, run_on_stop=False)
+
+    async def record(
+        self,
+        db: AsyncSession,
+        reference_number: str,
+        document_type: str,
+        storage_path: str,
+        file_name: str,
+        file_size: int,
+        sha256: str,
+        mime_type: str = "application/pdf",
+        submission_id: Any = None,
+        generated_by: Any = None
+    ) -> GeneratedDocument:
+        """
+        Adaugă versiunea următoare și elimină versiunile peste `keep_versions`;
+        face commit. Generările simultane pentru aceeași referință sunt serializate.
+        """
+        # Lacăt pe numărul de referință până la commit: versiunile rămân consecutive
+        await self.lock(db, reference_number)
+        current = await db.scalar(
+            select(func.max(GeneratedDocument.version))
+            .where(GeneratedDocument.reference_number == reference_number)
+        )
+        document = GeneratedDocument(
+            reference_number=reference_number,
+            version=(current or 0) + 1,
+            document_type=document_type,
+            storage_path=storage_path,
+            file_name=file_name,
+            mime_type=mime_type,
+            file_size=file_size,
+            sha256=sha256,
+            submission_id=submission_id,
+            generated_by=generated_by,
+            generated_at=datetime.now(timezone.utc)
+        )
+        db.add(document)
+        await db.flush()
+
+        pruned = await self._delete(
+            db,
+            (GeneratedDocument.reference_number == reference_number)
+            & (GeneratedDocument.version <= document.version - self.keep_versions)
+        )
+        await db.commit()
+        await self._unlink(pruned)
+        self.recorded += 1
+        return document
+
+    async def lock(self, db: AsyncSession, reference_number: str):
+        """
+        Serializează generările pentru numărul de referință până la sfârșitul
+        tranzacției lui `db` (reentrant în aceeași tranzacție, deci record() îl poate relua)
+        """
+        await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"generated:{reference_number}"})
+
+    async def latest(self, db: AsyncSession, reference_number: str) -> Optional[GeneratedDocument]:
+        result = await db.execute(
+            select(GeneratedDocument)
+            .where(GeneratedDocument.reference_number == reference_number)
+            .order_by(GeneratedDocument.version.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_version(self, db: AsyncSession, reference_number: str, version: int) -> Optional[GeneratedDocument]:
+        result = await db.execute(
+            select(GeneratedDocument).where(
+                GeneratedDocument.reference_number == reference_number,
+                GeneratedDocument.version == version
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def history(self, db: AsyncSession, reference_number: str) -> List[GeneratedDocument]:
+        """Versiunile păstrate, de la cea mai nouă"""
+        result = await db.execute(
+            select(GeneratedDocument)
+            .where(GeneratedDocument.reference_number == reference_number)
+            .order_by(GeneratedDocument.version.desc())
+        )
+        return list(result.scalars())
+
+    async def cleanup(self) -> int:
+        """Șterge în loturi versiunile înlocuite mai vechi decât perioada de retenție"""
+        if self.retention_days <= 0:
+            return 0
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        newer = aliased(GeneratedDocument)
+        removed = 0
+        while True:
+            expired_ids = (
+                select(GeneratedDocument.id)
+                .where(
+                    GeneratedDocument.generated_at < cutoff,
+                    # Doar versiunile care au o versiune mai nouă
+                    select(newer.id).where(
+                        newer.reference_number == GeneratedDocument.reference_number,
+                        newer.version > GeneratedDocument.version
+                    ).exists()
+                )
+                .limit(self.cleanup_batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            async with async_session_maker() as db:
+                paths = await self._delete(db, GeneratedDocument.id.in_(expired_ids))
+                await db.commit()
+
+            await self._unlink(paths)
+            removed += len(paths)
+            if len(paths) < self.cleanup_batch_size:
+                break
+
+        if removed:
+            logger.info(f"Șterse {removed} versiuni vechi ale documentelor generate")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "recorded": self.recorded,
+            "pruned": self.pruned,
+            "keep_versions": self.keep_versions,
+            "retention_days": self.retention_days
+        }
+
+    async def start(self):
+        await self._task.start()
+
+    async def stop(self):
+        await self._task.stop()
+
+    # ---------- intern ----------
+
+    async def _delete(self, db: AsyncSession, condition) -> List[str]:
+        """Șterge versiunile și intrările lor din manifest, în tranzacția lui `db`"""
+        result = await db.execute(
+            delete(GeneratedDocument)
+            .where(condition)
+            .returning(GeneratedDocument.storage_path)
+            .execution_options(synchronize_session=False)
+        )
+        paths = list(result.scalars())
+        await storage_manifest.remove(paths, db=db)
+        return paths
+
+    async def _unlink(self, paths: Sequence[str]):
+        # Fișierele se șterg după commit: un rollback nu lasă înregistrări fără fișier
+        if not paths:
+            return
+        await asyncio.to_thread(self._unlink_files, paths)
+        self.pruned += len(paths)
+
+    def _unlink_files(self, paths: Sequence[str]):
+        for path in paths:
+            try:
+                (self.root / path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Nu s-a putut șterge versiunea documentului {path}: {e}")
+
+
+# Instanța globală per worker
+generated_documents = background_services.register(
+    GeneratedDocumentRegistry(
+        root=settings.UPLOAD_DIR,
+        keep_versions=settings.GENERATED_DOCUMENT_KEEP_VERSIONS,
+        retention_days=settings.GENERATED_DOCUMENT_RETENTION_DAYS
+    )
+)
@@ -0,0 +1,379 @@
+"""
+Procesarea imaginilor încărcate (optimizare, thumbnail, variante) în afara event loop-ului
+
+Operațiile PIL rulează într-un pool de procese mărginit. Implicit procesarea
+este o sarcină persistentă (background_jobs), rulată după răspunsul HTTP;
+process() așteaptă rezultatul fără a bloca worker-ul, iar dacă pool-ul este
+plin lucrul trece tot în coada persistentă.
+
+Variantele responsive (lățime, WebP/JPEG, calitate) sunt generate o singură
+dată, la prima cerere, și păstrate pe disc sub o cheie deterministă; cache-ul
+este limitat ca dimensiune și golit în ordinea ultimei folosiri.
+
+Imaginile prea mari sunt redimensionate la upload, înainte de calculul
+hash-ului (optimize_upload): blob-urile sunt imutabile, servite cu cache
+`immutable`, iar variantele sunt păstrate după calea blob-ului.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.process_pool import BoundedProcessPool, ProcessPoolBusy
+from ..core.tasks import PeriodicTask, background_services
+from ..utils import image_ops
+from .job_queue import job_queue
+from .storage_manifest import storage_manifest
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+IMAGE_JOB_KIND = "image.process"
+
+# Formatele pe care PIL le poate citi (SVG nu se procesează)
+PROCESSABLE_MIME_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "image/tiff", "image/bmp"}
+
+# Dimensiuni maxime pentru imagini
+MAX_IMAGE_SIZE = (2048, 2048)  # 2048x2048 px
+THUMBNAIL_SIZE = (300, 300)    # thumbnail 300x300 px
+
+image_pool = background_services.register(
+    BoundedProcessPool(
+        "image-processing",
+        max_workers=settings.IMAGE_PROCESS_WORKERS,
+        max_waiting=settings.IMAGE_PROCESS_MAX_WAITING
+    )
+)
+
+
+def can_process(mime_type: Optional[str]) -> bool:
+    return mime_type in PROCESSABLE_MIME_TYPES
+
+
+def thumbnail_path_for(storage_path: str) -> str:
+    """Calea thumbnail-ului (relativă la UPLOAD_DIR) pentru un fișier stocat"""
+    return f"thumbnails/thumb_{Path(storage_path).name}"
+
+
+async def optimize_upload(path: Path, mime_type: Optional[str]) -> Optional[Tuple[Path, int, str]]:
+    """
+    Redimensionează o imagine prea mare înainte de înregistrarea ei ca blob, deci
+    hash-ul, dimensiunea și calea reflectă conținutul final (un blob nu se modifică
+    după înregistrare). Returnează (fișierul optimizat, dimensiunea, sha256) sau
+    None: imagine în limite, neprocesabilă sau pool plin (se păstrează originalul).
+    """
+    if not can_process(mime_type):
+        return None
+    try:
+        width, height = await asyncio.to_thread(image_ops.image_dimensions, str(path))
+    except Exception:
+        return None
+    if width <= MAX_IMAGE_SIZE[0] and height <= MAX_IMAGE_SIZE[1]:
+        return None
+
+    output = path.with_name(f"{path.name}.optimized")
+    try:
+        result = await image_pool.run(image_ops.optimize_image, str(path), str(output), MAX_IMAGE_SIZE)
+    except ProcessPoolBusy:
+        logger.info(f"Pool-ul de imagini este plin, imaginea {path.name} se păstrează neoptimizată")
+        return None
+    except Exception as e:
+        logger.warning(f"Optimizarea imaginii {path.name} a eșuat: {e}")
+        output.unlink(missing_ok=True)
+        return None
+    if not result["resized"]:
+        return None
+    return output, result["size"], result["sha256"]
+
+
+async def process(storage_path: str, thumbnail: bool, pregenerate: bool, reject_when_full: bool = True) -> Dict[str, Any]:
+    """Rulează procesarea în pool și returnează duratele; ProcessPoolBusy dacă pool-ul este plin"""
+    root = Path(settings.UPLOAD_DIR)
+    thumbnail_path = thumbnail_path_for(storage_path) if thumbnail else None
+    result: Dict[str, Any] = {"thumbnail_path": thumbnail_path}
+    if thumbnail_path:
+        result.update(await image_pool.run(
+            image_ops.generate_thumbnail,
+            str(root / storage_path),
+            str(root / thumbnail_path),
+            THUMBNAIL_SIZE,
+            reject_when_full=reject_when_full
+        ))
+        # Thumbnail-ul nou ajunge în manifestul de stocare
+        size = (await asyncio.to_thread(os.stat, root / thumbnail_path)).st_size
+        await storage_manifest.record(thumbnail_path, size, "image/jpeg", owner=("blob", storage_path))
+
+    # Variantele comune se generează doar pentru conținut nou
+    if pregenerate and settings.IMAGE_VARIANT_PREGENERATE_WIDTHS:
+        result["variants"] = await variant_cache.pregenerate(
+            storage_path, settings.IMAGE_VARIANT_PREGENERATE_WIDTHS, reject_when_full=reject_when_full
+        )
+    return result
+
+
+def processing_plan(storage_path: str, mime_type: Optional[str], created: bool, thumbnail: bool) -> Optional[Dict[str, Any]]:
+    """
+    Payload-ul procesării pentru un fișier încărcat sau None dacă nu e nimic de făcut:
+    thumbnail-ul și variantele se fac o singură dată per conținut
+    """
+    if not can_process(mime_type):
+        return None
+    if thumbnail and not created:
+        thumbnail = not (Path(settings.UPLOAD_DIR) / thumbnail_path_for(storage_path)).exists()
+    if not (thumbnail or created):
+        return None
+    return {"storage_path": storage_path, "thumbnail": thumbnail, "pregenerate": created}
+
+
+async def schedule_many(db: AsyncSession, plans: List[Dict[str, Any]]) -> List[str]:
+    """Sarcini persistente pentru mai multe fișiere, în tranzacția apelantului; returnează job_id-urile"""
+    jobs = await job_queue.enqueue_many(db, IMAGE_JOB_KIND, plans)
+    return [str(job.id) for job in jobs]
+
+
+async def schedule(
+    db: Optional[AsyncSession],
+    storage_path: str,
+    thumbnail: bool,
+    pregenerate: bool,
+    wait: bool = False
+) -> Dict[str, Any]:
+    """
+    Procesează imaginea: cu `wait` așteaptă rezultatul (dacă pool-ul are loc),
+    altfel adaugă o sarcină persistentă. Returnează thumbnail_path și, pentru
+    sarcini, job_id (starea se citește din /files/jobs/{job_id}).
+    """
+    if wait:
+        try:
+            result = await process(storage_path, thumbnail, pregenerate)
+            return {"thumbnail_path": result["thumbnail_path"], "job_id": None, "result": result}
+        except ProcessPoolBusy:
+            logger.info("Pool-ul de imagini este plin, procesarea trece în coada de sarcini")
+
+    job = await job_queue.enqueue(
+        db,
+        IMAGE_JOB_KIND,
+        {"storage_path": storage_path, "thumbnail": thumbnail, "pregenerate": pregenerate}
+    )
+    return {
+        "thumbnail_path": thumbnail_path_for(storage_path) if thumbnail else None,
+        "job_id": str(job.id),
+        "result": None
+    }
+
+
+VARIANT_FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+VARIANT_QUALITY_RANGE = (30, 95)
+# Accesul actualizează mtime (ordinea LRU) cel mult o dată pe oră per fișier
+VARIANT_TOUCH_INTERVAL = 3600
+
+
+class ImageVariantCache:
+    """
+    Variante pe disc, partajate de toate worker-ele. Parametrii sunt normalizați
+    (lățimi dintr-o listă fixă, calitate în trepte de 5), ca un client să nu poată
+    umple cache-ul cu combinații arbitrare. Ordinea LRU este mtime-ul fișierelor.
+    """
+
+    def __init__(self, root: str, max_bytes: int, widths: List[int], evict_interval: float = 600):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.widths = sorted(widths)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._estimated_bytes: Optional[int] = None
+        self._evicting = False
+        self._evict_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.evicted = 0
+        self.total_render_time = 0.0
+        self._task = PeriodicTask("image-variant-eviction", self.evict, evict_interval, run_on_stop=False)
+
+    def normalize(self, width: int, image_format: str, quality: Optional[int]) -> Tuple[int, str, int]:
+        """(lățime permisă, format, calitate); ValueError pentru un format necunoscut"""
+        if image_format not in VARIANT_FORMATS:
+            raise ValueError(f"Format necunoscut: {image_format}")
+        width = next((w for w in self.widths if w >= width), self.widths[-1])
+        quality = settings.IMAGE_VARIANT_DEFAULT_QUALITY if quality is None else quality
+        quality = min(max(quality, VARIANT_QUALITY_RANGE[0]), VARIANT_QUALITY_RANGE[1])
+        return width, image_format, int(round(quality / 5) * 5)
+
+    def variant_path(self, storage_path: str, width: int, image_format: str, quality: int) -> Path:
+        """Cheia depinde doar de sursă și parametri; blob-urile au deja numele = hash-ul conținutului"""
+        key = hashlib.sha256(f"{storage_path}|{width}|{quality}".encode("utf-8")).hexdigest()
+        return self.root / key[:2] / f"{key}.{width}w.q{quality}.{image_format}"
+
+    async def get(self, storage_path: str, width: int, image_format: str, quality: Optional[int] = None) -> Tuple[Path, str]:
+        """Calea variantei (generată acum dacă lipsește) și tipul MIME; FileNotFoundError dacă sursa lipsește"""
+        width, image_format, quality = self.normalize(width, image_format, quality)
+        path = self.variant_path(storage_path, width, image_format, quality)
+        media_type = VARIANT_FORMATS[image_format][1]
+
+        try:
+            stat = await asyncio.to_thread(path.stat)
+            self.hits += 1
+            if time.time() - stat.st_mtime > VARIANT_TOUCH_INTERVAL:
+                await asyncio.to_thread(os.utime, path)
+            return path, media_type
+        except FileNotFoundError:
+            pass
+
+        # O singură generare per variantă în worker; cererile concurente o așteaptă
+        key = str(path)
+        future = self._inflight.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            try:
+                await self._render(storage_path, path, width, image_format, quality)
+                future.set_result(None)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Excepția este propagată aici; cititorii concurenți o primesc din future
+                future.exception()
+                raise
+            finally:
+                del self._inflight[key]
+        else:
+            await asyncio.shield(future)
+        return path, media_type
+
+    async def pregenerate(self, storage_path: str, widths: List[int], reject_when_full: bool = True) -> List[Dict[str, Any]]:
+        """Generează variantele WebP pentru lățimile date; erorile nu opresc procesarea imaginii"""
+        results = []
+        for width in widths:
+            width, image_format, quality = self.normalize(width, "webp", None)
+            path = self.variant_path(storage_path, width, image_format, quality)
+            if path.exists():
+                continue
+            try:
+                results.append(await self._render(storage_path, path, width, image_format, quality, reject_when_full))
+            except ProcessPoolBusy:
+                break
+            except Exception as e:
+                logger.warning(f"Varianta {width}px pentru {storage_path} nu a putut fi generată: {e}")
+        return results
+
+    async def _render(
+        self,
+        storage_path: str,
+        path: Path,
+        width: int,
+        image_format: str,
+        quality: int,
+        reject_when_full: bool = True
+    ) -> Dict[str, Any]:
+        source = Path(settings.UPLOAD_DIR) / storage_path
+        if not await asyncio.to_thread(source.is_file):
+            raise FileNotFoundError(storage_path)
+
+        result = await image_pool.run(
+            image_ops.render_variant,
+            str(source),
+            str(path),
+            width,
+            VARIANT_FORMATS[image_format][0],
+            quality,
+            reject_when_full=reject_when_full
+        )
+        self.generated += 1
+        self.total_render_time += result["render_ms"] / 1000
+        if self._estimated_bytes is not None:
+            self._estimated_bytes += result["bytes"]
+            if self._estimated_bytes > self.max_bytes and not self._evicting:
+                self._evict_task = asyncio.create_task(self.evict())
+        return result
+
+    async def evict(self) -> int:
+        """Șterge variantele folosite cel mai demult până la 90% din limită; returnează numărul lor"""
+        if self._evicting:
+            return 0
+        self._evicting = True
+        try:
+            evicted, total = await asyncio.to_thread(self._evict_sync)
+        finally:
+            self._evicting = False
+        self._estimated_bytes = total
+        if evicted:
+            self.evicted += evicted
+            logger.info(f"Cache variante imagini: șterse {evicted} fișiere, rămân {total // (1024 * 1024)} MB")
+        return evicted
+
+    def _evict_sync(self) -> Tuple[int, int]:
+        entries = []
+        total = 0
+        if self.root.exists():
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+
+        if total <= self.max_bytes:
+            return 0, total
+
+        # Alte worker-e pot evacua simultan; un fișier deja șters este ignorat
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                evicted += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return evicted, total
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "generated": self.generated,
+            "evicted": self.evicted,
+            "estimated_mb": round(self._estimated_bytes / (1024 * 1024), 1) if self._estimated_bytes is not None else None,
+            "max_mb": self.max_bytes // (1024 * 1024),
+            "avg_render_ms": round(self.total_render_time / self.generated * 1000, 2) if self.generated else 0.0,
+        }
+
+    async def start(self):
+        # Prima trecere calculează dimensiunea curentă a cache-ului
+        self._evict_task = asyncio.create_task(self.evict())
+        await self._task.start()
+
+    async def stop(self):
+        await self._task.stop()
+
+
+variant_cache = background_services.register(
+    ImageVariantCache(
+        root=settings.IMAGE_VARIANT_DIR,
+        max_bytes=settings.IMAGE_VARIANT_CACHE_MAX_MB * 1024 * 1024,
+        widths=settings.IMAGE_VARIANT_WIDTHS,
+        evict_interval=settings.IMAGE_VARIANT_EVICT_INTERVAL
+    )
+)
+
+
+@job_queue.handler(IMAGE_JOB_KIND)
+async def _run_image_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # Sarcinile sunt deja limitate de JOB_CONCURRENCY, deci așteaptă un loc în pool
+    # "optimize": sarcinile adăugate înainte ca optimizarea să se facă la upload
+    pregenerate = payload.get("pregenerate", payload.get("optimize", False))
+    return await process(payload["storage_path"], payload["thumbnail"], pregenerate, reject_when_full=False)
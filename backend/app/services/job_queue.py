@@ -0,0 +1,263 @@
+"""
+Coada de sarcini de fundal, persistată în tabela background_jobs
+
+enqueue() adaugă sarcina în tranzacția apelantului, deci ea există doar dacă
+înregistrarea care a generat-o a fost salvată. Orice worker preia sarcinile
+cu FOR UPDATE SKIP LOCKED; una rămasă în "running" după o repornire (worker
+oprit sau căzut) este reluată după `stale_after` secunde fără semn de viață,
+de cel mult `max_attempts` ori. Sarcinile lungi apelează report_progress(),
+care reîmprospătează și heartbeat_at.
+"""
+import asyncio
+import contextvars
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import and_, case, event, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..core.tasks import background_services
+from ..models.jobs import BackgroundJob
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+# ID-ul sarcinii rulate de task-ul curent (pentru report_progress)
+_current_job_id: contextvars.ContextVar = contextvars.ContextVar("current_job_id", default=None)
+
+
+class JobQueue:
+    """Rulează cel mult `concurrency` sarcini simultan per worker"""
+
+    def __init__(
+        self,
+        poll_interval: float = 5,
+        concurrency: int = 2,
+        stale_after: float = 600,
+        max_attempts: int = 3
+    ):
+        self.poll_interval = poll_interval
+        self.concurrency = concurrency
+        self.stale_after = timedelta(seconds=stale_after)
+        self.max_attempts = max_attempts
+        self._handlers: Dict[str, JobHandler] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+        self.completed = 0
+        self.failed = 0
+        self.total_run_time = 0.0
+
+    def handler(self, kind: str):
+        """Decorator: înregistrează funcția async care execută sarcinile de tipul `kind`"""
+        def register(func: JobHandler) -> JobHandler:
+            self._handlers[kind] = func
+            return func
+        return register
+
+    async def enqueue(self, db: Optional[AsyncSession], kind: str, payload: Dict[str, Any]) -> BackgroundJob:
+        """
+        Adaugă sarcina în tranzacția lui `db` (apelantul face commit) sau,
+        fără sesiune, o salvează imediat. Worker-ul curent este trezit după commit.
+        """
+        job = BackgroundJob(kind=kind, payload=payload, status="pending", attempts=0)
+        if db is None:
+            async with async_session_maker() as session:
+                session.add(job)
+                await session.commit()
+                await session.refresh(job)
+            self.notify()
+            return job
+
+        db.add(job)
+        await db.flush()
+        event.listen(db.sync_session, "after_commit", lambda session: self.notify(), once=True)
+        return job
+
+    async def enqueue_many(self, db: AsyncSession, kind: str, payloads: List[Dict[str, Any]]) -> List[BackgroundJob]:
+        """Ca enqueue(), pentru mai multe sarcini: un singur flush în tranzacția apelantului"""
+        jobs = [BackgroundJob(kind=kind, payload=payload, status="pending", attempts=0) for payload in payloads]
+        if not jobs:
+            return jobs
+        db.add_all(jobs)
+        await db.flush()
+        event.listen(db.sync_session, "after_commit", lambda session: self.notify(), once=True)
+        return jobs
+
+    async def get(self, db: AsyncSession, job_id) -> Optional[BackgroundJob]:
+        result = await db.execute(select(BackgroundJob).where(BackgroundJob.id == job_id))
+        return result.scalar_one_or_none()
+
+    async def find_active(self, db: AsyncSession, kind: str) -> Optional[BackgroundJob]:
+        """Sarcina de tipul `kind` încă neterminată (pending sau running), dacă există"""
+        result = await db.execute(
+            select(BackgroundJob)
+            .where(BackgroundJob.kind == kind, BackgroundJob.status.in_(("pending", "running")))
+            .order_by(BackgroundJob.created_at)
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def report_progress(self, progress: Dict[str, Any]):
+        """Apelat din handler: salvează progresul și marchează sarcina ca activă"""
+        job_id = _current_job_id.get()
+        if job_id is None:
+            return
+        async with async_session_maker() as db:
+            await db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job_id)
+                .values(progress=progress, heartbeat_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    def notify(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run_pending(self) -> int:
+        """Preia și rulează sarcinile disponibile, cât timp există locuri libere"""
+        started = 0
+        while len(self._running) < self.concurrency:
+            jobs = await self._claim(self.concurrency - len(self._running))
+            if not jobs:
+                break
+            for job_id, kind, payload in jobs:
+                task = asyncio.create_task(self._execute(job_id, kind, payload), name=f"job-{kind}")
+                self._running.add(task)
+                task.add_done_callback(self._on_done)
+            started += len(jobs)
+        return started
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "handlers": sorted(self._handlers),
+            "running": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_run_ms": round(self.total_run_time / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._loop(), name="job-queue")
+
+    async def stop(self):
+        """Sarcinile întrerupte rămân în "running" și sunt reluate după repornire"""
+        tasks = [t for t in (self._task, *self._running) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running.clear()
+
+    # ---------- intern ----------
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self._fail_exhausted()
+                await self.run_pending()
+            except Exception:
+                logger.exception("Eroare la preluarea sarcinilor de fundal")
+
+    def _on_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        # Un loc s-a eliberat: verificăm imediat dacă mai sunt sarcini
+        self.notify()
+
+    def _stale_condition(self, now: datetime):
+        last_seen = func.coalesce(BackgroundJob.heartbeat_at, BackgroundJob.started_at)
+        return and_(BackgroundJob.status == "running", last_seen < now - self.stale_after)
+
+    async def _claim(self, limit: int):
+        now = datetime.now(timezone.utc)
+        claimable = (
+            select(BackgroundJob.id)
+            .where(
+                BackgroundJob.kind.in_(list(self._handlers)),
+                BackgroundJob.attempts < self.max_attempts,
+                or_(BackgroundJob.status == "pending", self._stale_condition(now))
+            )
+            .order_by(BackgroundJob.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with async_session_maker() as db:
+            result = await db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id.in_(claimable))
+                .values(status="running", started_at=now, heartbeat_at=now, attempts=BackgroundJob.attempts + 1)
+                .returning(BackgroundJob.id, BackgroundJob.kind, BackgroundJob.payload)
+                .execution_options(synchronize_session=False)
+            )
+            jobs = result.all()
+            await db.commit()
+        return jobs
+
+    async def _fail_exhausted(self):
+        """Sarcinile întrerupte de prea multe ori nu mai sunt reluate"""
+        now = datetime.now(timezone.utc)
+        async with async_session_maker() as db:
+            await db.execute(
+                update(BackgroundJob)
+                .where(self._stale_condition(now), BackgroundJob.attempts >= self.max_attempts)
+                .values(status="failed", error="Sarcina a fost întreruptă de prea multe ori", finished_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    async def _execute(self, job_id, kind: str, payload: Dict[str, Any]):
+        started = time.perf_counter()
+        _current_job_id.set(job_id)
+        try:
+            result = await self._handlers[kind](payload)
+            values: Dict[str, Any] = {"status": "done", "result": result, "error": None}
+            self.completed += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Sarcina {kind} ({job_id}) a eșuat")
+            # Reîncercată la următoarea preluare; fără încercări rămase, eșuează definitiv
+            values = {
+                "status": case((BackgroundJob.attempts >= self.max_attempts, "failed"), else_="pending"),
+                "error": str(e)
+            }
+            self.failed += 1
+
+        elapsed = time.perf_counter() - started
+        self.total_run_time += elapsed
+        async with async_session_maker() as db:
+            await db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job_id)
+                .values(finished_at=datetime.now(timezone.utc), duration_ms=round(elapsed * 1000, 2), **values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+
+# Instanța globală per worker
+job_queue = background_services.register(
+    JobQueue(
+        poll_interval=settings.JOB_POLL_INTERVAL,
+        concurrency=settings.JOB_CONCURRENCY,
+        stale_after=settings.JOB_STALE_AFTER,
+        max_attempts=settings.JOB_MAX_ATTEMPTS
+    )
+)
@@ -0,0 +1,165 @@
+"""
+Configurația primăriei ca instantaneu imutabil, încărcat o dată per worker
+
+Endpoint-urile publice, generarea documentelor și email-urile citesc același
+instantaneu din memorie. După modificarea configurației, publish() invalidează
+eticheta MUNICIPALITY_CACHE_TAG: instantaneul (și răspunsurile HTTP din cache)
+sunt eliminate pe toate worker-ele și reîncărcate la prima citire.
+Calea de citire nu scrie niciodată în baza de date.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.http_cache import MUNICIPALITY_CACHE_TAG
+from ..core.snapshot import TaggedSnapshot
+from ..models.municipality import MunicipalityConfig
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class MunicipalityConfigSnapshot:
+    """
+    Valorile configurației și reprezentările derivate, calculate o singură dată.
+    Instanța este partajată între cereri: dicționarele se citesc, nu se modifică.
+    """
+    exists: bool
+    values: Dict[str, Any]
+    public_info: Dict[str, Any]
+    contact_info: Dict[str, Any]
+    branding: Dict[str, Any]
+    loaded_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def __getattr__(self, name: str) -> Any:
+        # Acces ca la model (snapshot.official_name) pentru consumatorii existenți
+        values = self.__dict__.get("values")
+        if name.startswith("_") or values is None or name not in values:
+            raise AttributeError(name)
+        return values[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        value = self.values.get(name)
+        return default if value is None else value
+
+    def email_context(self) -> Dict[str, Any]:
+        """Datele de contact folosite în email-uri, cu valorile din setări ca rezervă"""
+        return {
+            "municipality_name": self.get("official_name", settings.MUNICIPALITY_NAME),
+            "municipality_phone": self.get("contact_phone", settings.MUNICIPALITY_PHONE),
+            "municipality_email": self.get("contact_email", settings.MUNICIPALITY_EMAIL),
+            "municipality_address": self.get("address", settings.MUNICIPALITY_ADDRESS),
+        }
+
+
+def build_snapshot(config: Optional[MunicipalityConfig]) -> MunicipalityConfigSnapshot:
+    """Instantaneu dintr-un rând din DB sau, dacă lipsește, din configurația implicită"""
+    if config is None:
+        return _default_snapshot()
+
+    values = {attr.key: getattr(config, attr.key) for attr in sa_inspect(MunicipalityConfig).column_attrs}
+    return MunicipalityConfigSnapshot(
+        exists=True,
+        values=values,
+        public_info={
+            "name": config.name,
+            "official_name": config.official_name,
+            "county": config.county,
+            "mayor_name": config.mayor_name,
+            "contact_info": config.contact_info,
+            "working_hours": config.get_working_hours_display(),
+            "audience_hours": config.get_audience_hours_display(),
+            "brand_colors": config.brand_colors,
+            "logo_url": config.logo_url,
+            "coat_of_arms_url": config.coat_of_arms_url,
+            "website_url": config.website_url
+        },
+        contact_info={
+            "contact_email": config.contact_email,
+            "contact_phone": config.contact_phone,
+            "fax": config.fax,
+            "address": config.full_address,
+            "working_hours": config.get_working_hours_display(),
+            "audience_hours": config.get_audience_hours_display()
+        },
+        branding={
+            "primary_color": config.primary_color,
+            "secondary_color": config.secondary_color,
+            "logo_url": config.logo_url,
+            "coat_of_arms_url": config.coat_of_arms_url,
+            "name": config.name,
+            "official_name": config.official_name
+        }
+    )
+
+
+def create_default_config() -> MunicipalityConfig:
+    """Rândul implicit, salvat doar de endpoint-urile de administrare"""
+    return MunicipalityConfig.create_default_config(
+        name="Primăria Exemplu",
+        official_name="Comuna Exemplu, Județul Exemplu",
+        county="Exemplu",
+        address="Strada Principală nr. 1, Comuna Exemplu"
+    )
+
+
+def _default_snapshot() -> MunicipalityConfigSnapshot:
+    config = create_default_config()
+    now = datetime.now(timezone.utc)
+    # Valorile implicite ale coloanelor se aplică abia la INSERT, deci le completăm aici
+    values = {attr.key: getattr(config, attr.key) for attr in sa_inspect(MunicipalityConfig).column_attrs}
+    values.update(
+        id=0,
+        primary_color="#004990",
+        secondary_color="#0079C1",
+        timezone="Europe/Bucharest",
+        language="ro",
+        maintenance_mode=False,
+        created_at=now,
+        updated_at=now
+    )
+    return MunicipalityConfigSnapshot(
+        exists=False,
+        values=values,
+        public_info={
+            "name": "Primăria Exemplu",
+            "official_name": "Comuna Exemplu, Județul Exemplu",
+            "county": "Exemplu"
+        },
+        contact_info={
+            "message": "Informațiile de contact nu sunt configurate"
+        },
+        branding={
+            "primary_color": "#004990",
+            "secondary_color": "#0079C1",
+            "logo_url": None,
+            "coat_of_arms_url": None
+        },
+        loaded_at=now
+    )
+
+
+class MunicipalityConfigStore(TaggedSnapshot[MunicipalityConfigSnapshot]):
+    """Păstrează instantaneul curent; o singură încărcare din DB per worker și per modificare"""
+
+    def __init__(self):
+        super().__init__("municipality_config", tags=(MUNICIPALITY_CACHE_TAG,))
+
+    async def build(self, db: AsyncSession) -> MunicipalityConfigSnapshot:
+        result = await db.execute(select(MunicipalityConfig))
+        return build_snapshot(result.scalar_one_or_none())
+
+    async def publish(self, config: MunicipalityConfig):
+        """Apelat după commit: invalidează pe toate worker-ele și instalează local noua versiune"""
+        await super().publish(build_snapshot(config))
+
+
+# Instanța globală per worker
+municipality_config_store = MunicipalityConfigStore()
@@ -0,0 +1,355 @@
+"""
+Structura de navigare precalculată: meniu, breadcrumb-uri și harta site-ului
+
+Totul este construit dintr-o singură trecere prin categorii și pagini și
+păstrat în memorie per worker. Reconstruirea are loc doar după ce paginile
+sau categoriile se schimbă (eticheta NAVIGATION_CACHE_TAG), deci /menu,
+/breadcrumbs și /sitemap sunt simple căutări.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.http_cache import NAVIGATION_CACHE_TAG, CONTENT_CATEGORIES_CACHE_TAG
+from ..core.snapshot import TaggedSnapshot
+from ..models.content import ContentCategory, Page, AnnouncementCategory
+
+logger = logging.getLogger(__name__)
+
+HOME_CRUMB = {"title": "Acasă", "url": "/"}
+
+# Titluri pentru segmentele de cale care nu corespund unei pagini
+PATH_TITLES = {
+    "despre-primarie": "Despre Primărie",
+    "informatii-interes-public": "Informații de Interes Public",
+    "transparenta-decizionala": "Transparență Decizională",
+    "integritate-institutionala": "Integritate Instituțională",
+    "monitorul-oficial-local": "Monitorul Oficial Local",
+    "servicii-publice": "Servicii Publice",
+    "comunitate": "Comunitate",
+    "anunturi": "Anunțuri",
+    "contact": "Contact",
+    "programari-online": "Programări Online",
+    "plati-online": "Plăți Online"
+}
+
+
+@dataclass(frozen=True)
+class NavigationIndex:
+    """Structuri partajate între cereri: se citesc, nu se modifică"""
+    menu: Dict[str, Any]
+    sitemap: Dict[str, Any]
+    breadcrumbs: Dict[str, List[Dict[str, str]]]  # cale normalizată -> lanțul de strămoși
+
+    def breadcrumbs_for(self, path: str) -> List[Dict[str, str]]:
+        chain = self.breadcrumbs.get(normalize_path(path))
+        return chain if chain is not None else path_breadcrumbs(path)
+
+
+def normalize_path(path: str) -> str:
+    return "/" + path.strip("/")
+
+
+def path_breadcrumbs(path: str) -> List[Dict[str, str]]:
+    """Breadcrumb-uri derivate doar din segmentele căii (pentru căile necunoscute)"""
+    breadcrumbs = [HOME_CRUMB]
+    current_path = ""
+    for part in path.strip("/").split("/"):
+        if part:
+            current_path += "/" + part
+            breadcrumbs.append({
+                "title": PATH_TITLES.get(part, part.replace("-", " ").title()),
+                "url": current_path
+            })
+    return breadcrumbs
+
+
+def build_navigation_index(
+    categories: List[ContentCategory],
+    pages: List[Page],
+    announcement_categories: List[AnnouncementCategory]
+) -> NavigationIndex:
+    """Construiește meniul, tabela de breadcrumb-uri și harta site-ului din rândurile încărcate"""
+    categories_by_id = {category.id: category for category in categories}
+    menu = _build_menu(pages)
+    return NavigationIndex(
+        menu=menu,
+        sitemap=_build_sitemap(pages, categories_by_id, announcement_categories),
+        breadcrumbs=_build_breadcrumbs(menu, pages)
+    )
+
+
+def _build_menu(all_pages: List[Page]) -> Dict[str, Any]:
+    # Construire structură de meniu
+    menu_structure = {
+        "main_sections": [],
+        "footer_links": [
+            {
+                "title": "Termeni și Condiții",
+                "url": "/termeni-conditii",
+                "external": False
+            },
+            {
+                "title": "Politica de Confidențialitate", 
+                "url": "/politica-confidentialitate",
+                "external": False
+            },
+            {
+                "title": "GDPR",
+                "url": "/gdpr", 
+                "external": False
+            },
+            {
+                "title": "Accesibilitate",
+                "url": "/accesibilitate",
+                "external": False
+            }
+        ],
+        "quick_links": [
+            {
+                "title": "Programări Online",
+                "url": "/programari-online",
+                "icon": "calendar",
+                "color": "#004990"
+            },
+            {
+                "title": "Plăți Online",
+                "url": "/plati-online", 
+                "icon": "credit-card",
+                "color": "#0079C1"
+            },
+            {
+                "title": "Formulare Online",
+                "url": "/servicii-publice/formulare",
+                "icon": "file-text",
+                "color": "#28a745"
+            },
+            {
+                "title": "Contact",
+                "url": "/contact",
+                "icon": "phone",
+                "color": "#ffc107"
+            }
+        ]
+    }
+    
+    # Structura obligatorie #DigiLocal
+    digilocal_structure = [
+        {
+            "title": "Despre Primărie",
+            "url": "/despre-primarie",
+            "category_id": 1,
+            "submenu": [
+                {"title": "Organizare", "url": "/despre-primarie/organizare"},
+                {"title": "Conducere", "url": "/despre-primarie/conducere"}, 
+                {"title": "Strategia de Dezvoltare Locală", "url": "/despre-primarie/strategia-dezvoltare"}
+            ]
+        },
+        {
+            "title": "Informații de Interes Public",
+            "url": "/informatii-interes-public",
+            "category_id": 2,
+            "submenu": [
+                {"title": "Buget și Execuție Bugetară", "url": "/informatii-interes-public/buget"},
+                {"title": "Achiziții Publice", "url": "/informatii-interes-public/achizitii"},
+                {"title": "Taxe și Impozite Locale", "url": "/informatii-interes-public/taxe-impozite"}
+            ]
+        },
+        {
+            "title": "Transparență Decizională", 
+            "url": "/transparenta-decizionala",
+            "category_id": 3,
+            "submenu": [
+                {"title": "Proiecte de Hotărâri", "url": "/transparenta-decizionala/proiecte-hotarari"},
+                {"title": "Ședințe ale Consiliului Local", "url": "/transparenta-decizionala/sedinte-consiliu"}
+            ]
+        },
+        {
+            "title": "Integritate Instituțională",
+            "url": "/integritate-institutionala", 
+            "category_id": 4,
+            "submenu": [
+                {"title": "Cod Etic/Deontologic", "url": "/integritate-institutionala/cod-etic"},
+                {"title": "Plan de Integritate", "url": "/integritate-institutionala/plan-integritate"}
+            ]
+        },
+        {
+            "title": "Monitorul Oficial Local",
+            "url": "/monitorul-oficial-local",
+            "category_id": None,
+            "submenu": [
+                {"title": "Statutul Unității Administrativ-Teritoriale", "url": "/mol/categoria/1"},
+                {"title": "Regulamentele privind procedurile administrative", "url": "/mol/categoria/2"},
+                {"title": "Hotărârile autorității deliberative", "url": "/mol/categoria/3"},
+                {"title": "Dispozițiile autorității executive", "url": "/mol/categoria/4"},
+                {"title": "Documente și informații financiare", "url": "/mol/categoria/5"},
+                {"title": "Alte documente", "url": "/mol/categoria/6"}
+            ]
+        },
+        {
+            "title": "Servicii Publice",
+            "url": "/servicii-publice",
+            "category_id": 5, 
+            "submenu": [
+                {"title": "Formulare Online", "url": "/servicii-publice/formulare"},
+                {"title": "Programări Online", "url": "/servicii-publice/programari"},
+                {"title": "Plata Taxelor și Impozitelor", "url": "/servicii-publice/plata-taxelor"},
+                {"title": "Urbanism și Dezvoltare", "url": "/servicii-publice/urbanism"}
+            ]
+        },
+        {
+            "title": "Comunitate",
+            "url": "/comunitate",
+            "category_id": 6,
+            "submenu": [
+                {"title": "Educație, Cultură și Sănătate", "url": "/comunitate/educatie-cultura"},
+                {"title": "Mediu și Turism", "url": "/comunitate/mediu-turism"}
+            ]
+        },
+        {
+            "title": "Anunțuri",
+            "url": "/anunturi", 
+            "category_id": None,
+            "submenu": []
+        }
+    ]
+    
+    # Adăugare pagini existente în structură
+    pages_by_category: Dict[int, List[Page]] = {}
+    for page in all_pages:
+        pages_by_category.setdefault(page.category_id, []).append(page)
+
+    for section in digilocal_structure:
+        if section["category_id"]:
+            for page in pages_by_category.get(section["category_id"], [])[:5]:  # Limităm la 5 pagini per secțiune
+                section["submenu"].append({
+                    "title": page.title,
+                    "url": f"/pagina/{page.slug}",
+                    "page_id": page.id
+                })
+    
+    menu_structure["main_sections"] = digilocal_structure
+    
+    return menu_structure
+
+
+def _build_sitemap(
+    pages: List[Page],
+    categories_by_id: Dict[int, ContentCategory],
+    announcement_categories: List[AnnouncementCategory]
+) -> Dict[str, Any]:
+    sitemap = {
+        "static_pages": [
+            {"title": "Pagina Principală", "url": "/", "priority": 1.0},
+            {"title": "Contact", "url": "/contact", "priority": 0.8},
+            {"title": "Harta Site", "url": "/harta-site", "priority": 0.5}
+        ],
+        "content_pages": [],
+        "services": [
+            {"title": "Programări Online", "url": "/programari-online", "priority": 0.9},
+            {"title": "Plăți Online", "url": "/plati-online", "priority": 0.9},
+            {"title": "Formulare Online", "url": "/servicii-publice/formulare", "priority": 0.8},
+            {"title": "Căutare Programări", "url": "/verificare-programare", "priority": 0.7}
+        ],
+        "announcements": [
+            {"title": "Toate Anunțurile", "url": "/anunturi", "priority": 0.8}
+        ],
+        "legal_pages": [
+            {"title": "Termeni și Condiții", "url": "/termeni-conditii", "priority": 0.3},
+            {"title": "Politica de Confidențialitate", "url": "/politica-confidentialitate", "priority": 0.3},
+            {"title": "GDPR", "url": "/gdpr", "priority": 0.3},
+            {"title": "Accesibilitate", "url": "/accesibilitate", "priority": 0.3}
+        ]
+    }
+    
+    # Adăugare pagini de conținut (în ordinea categoriei, ca înainte)
+    for page in sorted(pages, key=lambda p: (p.category_id is None, p.category_id or 0, p.menu_order)):
+        category = categories_by_id.get(page.category_id)
+        sitemap["content_pages"].append({
+            "title": page.title,
+            "url": f"/pagina/{page.slug}",
+            "category": category.name if category else None,
+            "priority": 0.7,
+            "last_modified": page.updated_at.isoformat() if page.updated_at else None
+        })
+    
+    # Adăugare categorii de anunțuri
+    for category in announcement_categories:
+        sitemap["announcements"].append({
+            "title": f"Anunțuri - {category.name}",
+            "url": f"/anunturi?categoria={category.slug}",
+            "priority": 0.6
+        })
+    
+    return sitemap
+
+
+def _build_breadcrumbs(menu: Dict[str, Any], pages: List[Page]) -> Dict[str, List[Dict[str, str]]]:
+    """Tabela cale -> lanț de breadcrumb-uri pentru secțiunile din meniu și toate paginile publicate"""
+    table: Dict[str, List[Dict[str, str]]] = {"/": [HOME_CRUMB]}
+    section_by_category: Dict[int, Dict[str, str]] = {}
+
+    for section in menu["main_sections"]:
+        section_crumb = {"title": section["title"], "url": section["url"]}
+        table[section["url"]] = [HOME_CRUMB, section_crumb]
+        if section["category_id"]:
+            section_by_category[section["category_id"]] = section_crumb
+        for item in section["submenu"]:
+            if "page_id" not in item:
+                table.setdefault(item["url"], [HOME_CRUMB, section_crumb, {"title": item["title"], "url": item["url"]}])
+
+    pages_by_id = {page.id: page for page in pages}
+    for page in pages:
+        # Strămoșii sunt paginile părinte publicate; ne oprim la cicluri
+        ancestors: List[Page] = []
+        seen = {page.id}
+        parent = pages_by_id.get(page.parent_id)
+        while parent is not None and parent.id not in seen:
+            ancestors.append(parent)
+            seen.add(parent.id)
+            parent = pages_by_id.get(parent.parent_id)
+
+        root = ancestors[-1] if ancestors else page
+        chain = [HOME_CRUMB]
+        section_crumb = section_by_category.get(root.category_id)
+        if section_crumb is not None:
+            chain.append(section_crumb)
+        for ancestor in reversed(ancestors):
+            chain.append({"title": ancestor.title, "url": f"/pagina/{ancestor.slug}"})
+        chain.append({"title": page.title, "url": f"/pagina/{page.slug}"})
+        table[f"/pagina/{page.slug}"] = chain
+
+    return table
+
+
+class NavigationStore(TaggedSnapshot[NavigationIndex]):
+    """Indexul de navigare curent al worker-ului"""
+
+    def __init__(self):
+        super().__init__("navigation", tags=(NAVIGATION_CACHE_TAG, CONTENT_CATEGORIES_CACHE_TAG))
+
+    async def build(self, db: AsyncSession) -> NavigationIndex:
+        # Toate categoriile, ca harta site-ului să afișeze numele și pentru cele inactive
+        categories_result = await db.execute(select(ContentCategory))
+        pages_result = await db.execute(
+            select(Page)
+            .where(Page.status == 'published')
+            .order_by(Page.menu_order, Page.title)
+        )
+        announcement_categories_result = await db.execute(
+            select(AnnouncementCategory).where(AnnouncementCategory.is_active == True)
+        )
+        index = build_navigation_index(
+            categories_result.scalars().all(),
+            pages_result.scalars().all(),
+            announcement_categories_result.scalars().all()
+        )
+        logger.debug(f"Index de navigare reconstruit: {len(index.breadcrumbs)} căi")
+        return index
+
+
+# Instanța globală per worker
+navigation_store = NavigationStore()
@@ -11,6 +11,7 @@ from ..core.email import email_service
 from ..core.config import get_settings
 from ..models.forms import FormSubmission
 from ..models.appointments import Appointment
+from .municipality_config_service import municipality_config_store
 
 settings = get_settings()
 
@@ -133,7 +134,7 @@ class NotificationService:
                 'reference_number': appointment_data['reference_number'],
                 'submitted_at': appointment.created_at.strftime("%d.%m.%Y %H:%M"),
                 'admin_url': f"{settings.FRONTEND_URL}/admin/appointments/{appointment.id}",
-                'municipality_name': settings.MUNICIPALITY_NAME,
+                'municipality_name': (await municipality_config_store.get()).email_context()['municipality_name'],
                 'extra_info': f"Data: {appointment_data['appointment_date']} la {appointment_data['appointment_time']}"
             }
             
@@ -216,6 +217,7 @@ class NotificationService:
         }
         
         status_text = status_messages.get(new_status, new_status)
+        municipality = (await municipality_config_store.get()).email_context()
         
         context = {
             'citizen_name': form_submission.citizen_name,
@@ -224,9 +226,9 @@ class NotificationService:
             'status': status_text,
             'status_notes': admin_notes,
             'tracking_url': f"{settings.FRONTEND_URL}/verificare-cerere?ref={form_submission.reference_number}",
-            'municipality_name': settings.MUNICIPALITY_NAME,
-            'municipality_phone': settings.MUNICIPALITY_PHONE,
-            'municipality_email': settings.MUNICIPALITY_EMAIL
+            'municipality_name': municipality['municipality_name'],
+            'municipality_phone': municipality['municipality_phone'],
+            'municipality_email': municipality['municipality_email']
         }
         
         # Template simplu pentru update status
@@ -278,8 +280,8 @@ class NotificationService:
             to_emails=[form_submission.citizen_email],
             subject=subject,
             html_content=html_content,
-            from_name=settings.MUNICIPALITY_NAME,
-            reply_to=settings.MUNICIPALITY_EMAIL
+            from_name=context['municipality_name'],
+            reply_to=context['municipality_email']
         )
     
     @staticmethod
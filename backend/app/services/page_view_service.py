@@ -0,0 +1,224 @@
+"""
+Colectarea vizualizărilor de pagini: coadă în memorie, inserări în lot
+și agregate zilnice per pagină
+
+URL-ul trimis de client este redus la calea paginii (fără domeniu, query și
+fragment), iar numărul de pagini distincte pe zi este limitat: peste limită
+vizualizările se adună la OTHER_PAGES_URL, deci agregatele nu pot fi umflate
+cu URL-uri arbitrare.
+"""
+import ipaddress
+import logging
+import random
+import re
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+from urllib.parse import unquote, urlsplit
+
+from sqlalchemy import insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from ..core.batch_writer import AsyncBatchWriter
+from ..core.config import get_settings
+from ..core.database import async_session_maker, engine
+from ..core.tasks import PeriodicTask, background_services
+from ..models.documents import PageView, PageViewDailyStat
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# PostgreSQL acceptă cel mult 32767 parametri per instrucțiune
+_PAGE_VIEW_COLUMNS = 8
+_MAX_ROWS_PER_INSERT = 32767 // _PAGE_VIEW_COLUMNS
+
+OTHER_PAGES_URL = "(alte pagini)"
+_MAX_PATH_SEGMENTS = 6
+_PATH_SEGMENT_RE = re.compile(r"^[\w\-.~]{1,120}$")
+# Căi care nu sunt pagini ale site-ului
+_IGNORED_PREFIXES = ("api", "static", "media")
+
+
+class PageHit(NamedTuple):
+    """O vizualizare din coadă; row este None dacă hit-ul nu a fost eșantionat"""
+    view_date: date
+    page_url: str
+    row: Optional[Dict[str, Any]]
+
+
+def _valid_ip(value: Optional[str]) -> Optional[str]:
+    """Adresa IP sau None: o valoare invalidă ar respinge tot lotul (coloana este INET)"""
+    if not value:
+        return None
+    try:
+        return str(ipaddress.ip_address(value.strip()))
+    except ValueError:
+        return None
+
+
+def normalize_page_url(value: str) -> Optional[str]:
+    """Calea paginii, normalizată (/anunturi/slug), sau None dacă nu arată ca o pagină a site-ului"""
+    try:
+        path = unquote(urlsplit(value.strip()).path)
+    except ValueError:
+        return None
+    if not path.startswith("/"):
+        return None
+    segments = [segment for segment in path.split("/") if segment]
+    if len(segments) > _MAX_PATH_SEGMENTS or not all(_PATH_SEGMENT_RE.match(segment) for segment in segments):
+        return None
+    if segments and segments[0].lower() in _IGNORED_PREFIXES:
+        return None
+    return ("/" + "/".join(segments)).lower()[:500]
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+class PageViewIngestor(AsyncBatchWriter[PageHit]):
+    """
+    Toate hit-urile intră în agregatele zilnice (exacte), dar doar o fracțiune
+    (sample_rate) ajunge ca rând în page_views. Un lot = un INSERT multi-rând
+    în page_views + un singur upsert în page_view_daily_stats.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        partition_months_ahead: int = 2,
+        max_urls_per_day: int = 2000,
+        **kwargs
+    ):
+        super().__init__("page-view-ingestor", **kwargs)
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.partition_months_ahead = partition_months_ahead
+        self.max_urls_per_day = max_urls_per_day
+        # Paginile distincte văzute azi de acest worker
+        self._urls_day: Optional[date] = None
+        self._urls: Set[str] = set()
+        self._partition_task = PeriodicTask(
+            "page-view-partitions", self.ensure_partitions, 6 * 3600, run_on_stop=False
+        )
+
+    def track(
+        self,
+        page_url: str,
+        page_title: Optional[str] = None,
+        visitor_ip: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        referrer: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> bool:
+        """Pune hit-ul în coadă fără a aștepta; returnează False dacă a fost aruncat"""
+        page_url = normalize_page_url(page_url)
+        if page_url is None:
+            return False
+        now = datetime.now().astimezone()
+        view_date = now.date()
+        page_url = self._bucket(view_date, page_url)
+
+        row = None
+        if self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+            row = {
+                "page_url": page_url,
+                "page_title": page_title[:255] if page_title else None,
+                "visitor_ip": _valid_ip(visitor_ip),
+                "user_agent": user_agent,
+                "referrer": referrer[:500] if referrer else None,
+                "session_id": session_id[:255] if session_id else None,
+                "view_date": view_date,
+                "view_time": now,
+            }
+
+        return self.submit_nowait(PageHit(view_date, page_url, row))
+
+    def _bucket(self, view_date: date, page_url: str) -> str:
+        """Pagina însăși sau, peste limita zilnică de pagini distincte, OTHER_PAGES_URL"""
+        if view_date != self._urls_day:
+            self._urls_day = view_date
+            self._urls = set()
+        if page_url in self._urls:
+            return page_url
+        if len(self._urls) >= self.max_urls_per_day:
+            return OTHER_PAGES_URL
+        self._urls.add(page_url)
+        return page_url
+
+    async def write_batch(self, items: List[PageHit]) -> None:
+        rows = [item.row for item in items if item.row is not None]
+        totals = Counter((item.view_date, item.page_url) for item in items)
+        sampled = Counter((row["view_date"], row["page_url"]) for row in rows)
+
+        async with async_session_maker() as session:
+            for start in range(0, len(rows), _MAX_ROWS_PER_INSERT):
+                chunk = rows[start:start + _MAX_ROWS_PER_INSERT]
+                await session.execute(insert(PageView).values(chunk))
+
+            stmt = pg_insert(PageViewDailyStat).values([
+                {
+                    "view_date": view_date,
+                    "page_url": page_url,
+                    "views": count,
+                    "sampled_views": sampled.get((view_date, page_url), 0),
+                }
+                for (view_date, page_url), count in totals.items()
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PageViewDailyStat.view_date, PageViewDailyStat.page_url],
+                set_={
+                    "views": PageViewDailyStat.views + stmt.excluded.views,
+                    "sampled_views": PageViewDailyStat.sampled_views + stmt.excluded.sampled_views,
+                    "updated_at": datetime.now().astimezone(),
+                }
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+    async def ensure_partitions(self):
+        """
+        Creează partițiile lunare pentru luna curentă și următoarele luni.
+        Nu face nimic dacă page_views nu este (încă) partiționată.
+        """
+        async with engine.begin() as conn:
+            is_partitioned = await conn.scalar(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass('page_views'))"
+            ))
+            if not is_partitioned:
+                return
+
+            month = _month_start(date.today())
+            for _ in range(self.partition_months_ahead + 1):
+                following = _next_month(month)
+                await conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS page_views_{month:%Y_%m} "
+                    f"PARTITION OF page_views "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+                ))
+                month = following
+
+    async def start(self):
+        await self._partition_task.run_once()
+        await self._partition_task.start()
+        await super().start()
+
+    async def stop(self):
+        await super().stop()
+        await self._partition_task.stop()
+
+
+# Instanța globală per worker
+page_view_ingestor = background_services.register(
+    PageViewIngestor(
+        sample_rate=settings.PAGE_VIEWS_SAMPLE_RATE,
+        max_urls_per_day=settings.PAGE_VIEWS_MAX_URLS_PER_DAY,
+        max_queue_size=settings.PAGE_VIEWS_QUEUE_SIZE,
+        batch_size=settings.PAGE_VIEWS_BATCH_SIZE,
+        flush_interval=settings.PAGE_VIEWS_FLUSH_INTERVAL
+    )
+)
@@ -0,0 +1,139 @@
+"""
+Generarea documentelor oficiale (certificate, adeverințe, autorizații) în PDF
+
+Randarea WeasyPrint este CPU-bound și ține GIL-ul, deci rulează în procese
+separate, cu o limită de concurență și a cozii de așteptare. Fiecare proces
+încarcă fonturile și foaia de stil de bază o singură dată, la pornire, și
+păstrează foile de stil parsate ale șabloanelor (vezi utils/pdf_render.py).
+HTML-ul vine din șabloanele Jinja compilate (services/document_template_service.py).
+PDF-ul rezultat este înregistrat, în aceeași tranzacție, în manifestul de
+stocare (cu hash-ul conținutului) și ca versiune nouă în registrul documentelor
+generate (services/generated_documents.py).
+"""
+import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..core.process_pool import BoundedProcessPool
+from ..core.tasks import background_services
+from ..utils import pdf_render
+from ..utils.pdf_generator import document_filename, document_storage_path, get_document_download_url
+from .document_template_service import document_template_store
+from .generated_documents import generated_documents
+from .storage_manifest import storage_manifest
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+pdf_pool = background_services.register(
+    BoundedProcessPool(
+        "pdf-render",
+        max_workers=settings.PDF_RENDER_WORKERS,
+        max_waiting=settings.PDF_RENDER_MAX_WAITING,
+        initializer=pdf_render.init_worker,
+        initargs=(settings.PDF_FONT_DIR, str(Path(settings.UPLOAD_DIR).resolve()))
+    )
+)
+
+
+def submission_document_data(submission, form_type_name: str) -> Dict[str, Any]:
+    """Contextul șablonului: datele cererii, iar câmpurile formularului în submission_data"""
+    return {
+        "reference_number": submission.reference_number,
+        "citizen_name": submission.citizen_name,
+        "citizen_email": submission.citizen_email,
+        "citizen_phone": submission.citizen_phone,
+        "citizen_cnp": submission.citizen_cnp,
+        "citizen_address": submission.citizen_address,
+        "status": submission.status,
+        "submitted_at": submission.submitted_at,
+        "form_type_name": form_type_name,
+        "submission_data": submission.submission_data or {}
+    }
+
+
+@asynccontextmanager
+async def _session(db: Optional[AsyncSession]) -> AsyncIterator[AsyncSession]:
+    if db is not None:
+        yield db
+        return
+    async with async_session_maker() as session:
+        yield session
+
+
+async def render_official_document(
+    document_type: str,
+    submission_data: Dict[str, Any],
+    municipality_config: Dict[str, Any],
+    reject_when_full: bool = True,
+    db: Optional[AsyncSession] = None,
+    submission_id: Any = None,
+    generated_by: Any = None
+) -> Dict[str, Any]:
+    """
+    Randează documentul în pool, îl înregistrează ca versiune nouă și returnează
+    informațiile despre fișier; ProcessPoolBusy dacă pool-ul este plin (cu reject_when_full).
+    Înregistrarea face commit în `db` (sau într-o sesiune proprie).
+    """
+    reference_number = submission_data.get("reference_number", "UNKNOWN")
+    storage_path = document_storage_path(reference_number)
+    output_path = Path(settings.UPLOAD_DIR) / storage_path
+    filename = document_filename(document_type, reference_number)
+    # Șablonul compilat se randează aici (sub o milisecundă); CSS-ul este parsat o dată per proces
+    html, css = await document_template_store.render(document_type, submission_data, municipality_config)
+
+    rendered = await pdf_pool.run(
+        pdf_render.render_pdf,
+        html,
+        str(output_path),
+        css,
+        reject_when_full=reject_when_full
+    )
+    try:
+        async with _session(db) as session:
+            await storage_manifest.record(
+                storage_path,
+                rendered["size"],
+                "application/pdf",
+                sha256=rendered["sha256"],
+                owner=("generated_document", reference_number),
+                db=session
+            )
+            document = await generated_documents.record(
+                session,
+                reference_number=reference_number,
+                document_type=document_type,
+                storage_path=storage_path,
+                file_name=filename,
+                file_size=rendered["size"],
+                sha256=rendered["sha256"],
+                submission_id=submission_id,
+                generated_by=generated_by
+            )
+    except Exception:
+        # Fără înregistrare fișierul nu ar mai fi găsit de nimeni
+        output_path.unlink(missing_ok=True)
+        raise
+
+    return {
+        "reference_number": reference_number,
+        "document_type": document_type,
+        "version": document.version,
+        "file_path": storage_path,
+        "download_url": get_document_download_url(reference_number, document.version),
+        "filename": filename,
+        "mime_type": "application/pdf",
+        "file_size": rendered["size"],
+        "file_hash": rendered["sha256"],
+        "render_ms": rendered["render_ms"],
+        "generated_at": document.generated_at.isoformat()
+    }
+
+
+def stats() -> Dict[str, Any]:
+    return pdf_pool.stats()
@@ -0,0 +1,366 @@
+"""
+Upload-uri reluabile în fragmente (protocol de tip tus)
+
+Clientul creează upload-ul (dimensiune, nume, tip), trimite fragmente cu
+PATCH la offset-ul curent, află offset-ul cu HEAD după o întrerupere și
+finalizează upload-ul. Octeții se adaugă la UPLOAD_DIR/temp/resumable/<id>.part;
+dimensiunea acestui fișier este offset-ul, deci orice worker poate primi
+următorul fragment. Un singur fragment se scrie la un moment dat (flock).
+
+Hash-ul SHA-256 se calculează incremental, pe măsură ce fragmentele sunt
+scrise. Starea lui este în memoria worker-ului (LRU, eliminată și după
+expirarea upload-ului); un worker care primește un upload început în altă
+parte citește o singură dată doar porțiunea lipsă. La finalizare fișierul
+devine un blob stocat după conținut (BlobStore.adopt), dintr-o legătură
+(hard link) la fișierul parțial: acesta este șters abia după commit-ul stării
+"completed", deci un rollback lasă upload-ul finalizabil din nou.
+"""
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..core.tasks import PeriodicTask, background_services
+from ..models.uploads import ResumableUpload
+from .blob_store import StoredFile, blob_store
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ResumableUploadService:
+    """Upload-urile neterminate expiră după `expire_hours` fără fragmente noi"""
+
+    def __init__(
+        self,
+        root: str,
+        max_size: int,
+        expire_hours: int = 24,
+        write_buffer: int = 1024 * 1024,
+        cleanup_interval: float = 3600,
+        cleanup_batch_size: int = 500,
+        max_hashes: int = 1024
+    ):
+        self.dir = Path(root) / "temp" / "resumable"
+        self.max_size = max_size
+        self.expire = timedelta(hours=expire_hours)
+        self.write_buffer = write_buffer
+        self.cleanup_batch_size = cleanup_batch_size
+        self.max_hashes = max_hashes
+        # upload_id -> (hash, offset-ul până la care a fost calculat, ultima folosire)
+        self._hashes: "OrderedDict[UUID, Tuple[Any, int, float]]" = OrderedDict()
+        self.completed = 0
+        self.expired = 0
+        self._task = PeriodicTask("resumable-upload-cleanup", self.cleanup, cleanup_interval, run_on_stop=False)
+
+    def part_path(self, upload_id: UUID) -> Path:
+        return self.dir / f"{upload_id}.part"
+
+    async def create(self, db: AsyncSession, filename: str, mime_type: str, total_size: int) -> ResumableUpload:
+        if total_size <= 0:
+            raise HTTPException(status_code=400, detail="Dimensiunea fișierului este invalidă")
+        if total_size > self.max_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Fișierul este prea mare. Maxim permis: {self.max_size // (1024 * 1024)}MB"
+            )
+
+        upload = ResumableUpload(
+            filename=filename,
+            mime_type=mime_type,
+            total_size=total_size,
+            status="uploading",
+            expires_at=datetime.now(timezone.utc) + self.expire
+        )
+        db.add(upload)
+        await db.flush()
+        await asyncio.to_thread(self._create_part, self.part_path(upload.id))
+        await db.commit()
+        return upload
+
+    def _create_part(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch(exist_ok=False)
+
+    async def get(self, db: AsyncSession, upload_id: UUID) -> ResumableUpload:
+        result = await db.execute(select(ResumableUpload).where(ResumableUpload.id == upload_id))
+        upload = result.scalar_one_or_none()
+        if upload is None or (upload.status == "uploading" and upload.expires_at < datetime.now(timezone.utc)):
+            raise HTTPException(status_code=404, detail="Upload-ul nu a fost găsit sau a expirat")
+        return upload
+
+    async def offset(self, upload: ResumableUpload) -> int:
+        if upload.status == "completed":
+            return upload.total_size
+        try:
+            return (await asyncio.to_thread(os.stat, self.part_path(upload.id))).st_size
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Upload-ul nu a fost găsit sau a expirat")
+
+    async def append(
+        self,
+        db: AsyncSession,
+        upload: ResumableUpload,
+        offset: int,
+        chunks: AsyncIterator[bytes]
+    ) -> int:
+        """
+        Adaugă corpul cererii la offset-ul dat și returnează noul offset.
+        Octeții primiți înainte de o întrerupere rămân salvați (clientul reia de la HEAD).
+        """
+        if upload.status != "uploading":
+            raise HTTPException(status_code=409, detail="Upload-ul a fost deja finalizat")
+
+        fd = await asyncio.to_thread(self._open_locked, upload.id)
+        try:
+            current = os.fstat(fd).st_size
+            if offset != current:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Offset-ul nu corespunde cu datele primite",
+                    headers={"Upload-Offset": str(current)}
+                )
+            hasher = await self._hasher(upload.id, fd, current)
+
+            buffer = bytearray()
+            try:
+                async for chunk in chunks:
+                    if current + len(buffer) + len(chunk) > upload.total_size:
+                        raise HTTPException(status_code=413, detail="Fragmentul depășește dimensiunea declarată")
+                    buffer += chunk
+                    if len(buffer) >= self.write_buffer:
+                        current = await asyncio.to_thread(self._write, fd, hasher, bytes(buffer), current)
+                        buffer.clear()
+            finally:
+                # Și la întrerupere: ce s-a primit complet rămâne scris
+                if buffer:
+                    current = await asyncio.to_thread(self._write, fd, hasher, bytes(buffer), current)
+                self._remember_hash(upload.id, hasher, current)
+        finally:
+            await asyncio.to_thread(self._close, fd)
+
+        await db.execute(
+            update(ResumableUpload)
+            .where(ResumableUpload.id == upload.id)
+            .values(expires_at=datetime.now(timezone.utc) + self.expire)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return current
+
+    async def complete(self, upload: ResumableUpload, db: Optional[AsyncSession] = None) -> StoredFile:
+        """
+        Finalizează upload-ul: blob stocat după conținut, cu o referință în
+        tranzacția lui `db` sau fără referințe (atașat ulterior prin file_path).
+        Fișierul parțial este șters după commit-ul stării (al lui `db`, dacă este dat).
+        """
+        extension = Path(upload.filename).suffix.lower()
+        if upload.status == "completed":
+            # Finalizare repetată (de ex. răspuns pierdut): blob-ul există deja
+            if db is not None:
+                await blob_store.acquire(db, [upload.storage_path])
+            # Imaginile pot fi redimensionate la finalizare: dimensiunea este cea a blob-ului
+            size = (await asyncio.to_thread(os.stat, blob_store.absolute_path(upload.storage_path))).st_size
+            return StoredFile(
+                sha256=upload.sha256,
+                storage_path=upload.storage_path,
+                size=size,
+                mime_type=upload.mime_type,
+                created=False
+            )
+
+        fd = await asyncio.to_thread(self._open_locked, upload.id)
+        try:
+            size = os.fstat(fd).st_size
+            if size != upload.total_size:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Upload-ul nu este complet ({size} din {upload.total_size} octeți)",
+                    headers={"Upload-Offset": str(size)}
+                )
+            hasher = await self._hasher(upload.id, fd, size)
+            sha256 = hasher.hexdigest()
+            # adopt() mută sau șterge legătura; fișierul parțial rămâne până la commit
+            link = await asyncio.to_thread(self._link_part, upload.id)
+            stored = await blob_store.adopt(link, size, sha256, extension, upload.mime_type, db)
+        finally:
+            self._hashes.pop(upload.id, None)
+            await asyncio.to_thread(self._close, fd)
+
+        values = {
+            "status": "completed",
+            "storage_path": stored.storage_path,
+            "sha256": stored.sha256,
+            "completed_at": datetime.now(timezone.utc),
+            "expires_at": datetime.now(timezone.utc) + self.expire
+        }
+        part_path = self.part_path(upload.id)
+        if db is not None:
+            await db.execute(update(ResumableUpload).where(ResumableUpload.id == upload.id).values(**values))
+            self._unlink_after_commit(db, part_path)
+        else:
+            async with async_session_maker() as session:
+                await session.execute(update(ResumableUpload).where(ResumableUpload.id == upload.id).values(**values))
+                await session.commit()
+            await asyncio.to_thread(part_path.unlink, missing_ok=True)
+        self.completed += 1
+        return stored
+
+    async def abort(self, db: AsyncSession, upload: ResumableUpload):
+        """Renunțarea la un upload neterminat"""
+        if upload.status != "uploading":
+            raise HTTPException(status_code=409, detail="Upload-ul a fost deja finalizat")
+        await db.execute(delete(ResumableUpload).where(ResumableUpload.id == upload.id))
+        await db.commit()
+        self._hashes.pop(upload.id, None)
+        self.part_path(upload.id).unlink(missing_ok=True)
+
+    async def cleanup(self) -> int:
+        """Șterge upload-urile expirate (și fișierele lor parțiale) în loturi"""
+        now = datetime.now(timezone.utc)
+        removed = 0
+        while True:
+            expired_ids = (
+                select(ResumableUpload.id)
+                .where(ResumableUpload.expires_at < now)
+                .limit(self.cleanup_batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    delete(ResumableUpload)
+                    .where(ResumableUpload.id.in_(expired_ids))
+                    .returning(ResumableUpload.id, ResumableUpload.status)
+                    .execution_options(synchronize_session=False)
+                )
+                rows = result.all()
+                await db.commit()
+
+            for upload_id, status in rows:
+                self._hashes.pop(upload_id, None)
+                # Și pentru "completed": fișierul parțial rămas după un commit eșuat
+                self.part_path(upload_id).unlink(missing_ok=True)
+            removed += len(rows)
+            if len(rows) < self.cleanup_batch_size:
+                break
+
+        # Hash-urile upload-urilor continuate (sau finalizate) în alt worker
+        idle_before = time.monotonic() - self.expire.total_seconds()
+        for upload_id in [upload_id for upload_id, entry in self._hashes.items() if entry[2] < idle_before]:
+            del self._hashes[upload_id]
+
+        if removed:
+            self.expired += removed
+            logger.info(f"Șterse {removed} upload-uri reluabile expirate")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_progress_here": len(self._hashes), "completed": self.completed, "expired": self.expired}
+
+    async def start(self):
+        await self._task.start()
+
+    async def stop(self):
+        await self._task.stop()
+
+    # ---------- intern ----------
+
+    def _open_locked(self, upload_id: UUID) -> int:
+        try:
+            fd = os.open(self.part_path(upload_id), os.O_RDWR | os.O_APPEND)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Upload-ul nu a fost găsit sau a expirat")
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise HTTPException(
+                status_code=423,
+                detail="Un alt fragment al acestui upload este în curs de încărcare"
+            )
+        return fd
+
+    @staticmethod
+    def _close(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    @staticmethod
+    def _unlink_after_commit(db: AsyncSession, path: Path):
+        """Șterge `path` la commit-ul tranzacției curente; un rollback îl păstrează"""
+        pending = [True]
+
+        def on_commit(session):
+            if pending and pending.pop():
+                path.unlink(missing_ok=True)
+
+        def on_rollback(session):
+            pending.clear()
+
+        event.listen(db.sync_session, "after_commit", on_commit, once=True)
+        event.listen(db.sync_session, "after_rollback", on_rollback, once=True)
+
+    def _link_part(self, upload_id: UUID) -> Path:
+        link = self.dir / f"{upload_id}.{uuid.uuid4().hex}.tmp"
+        os.link(self.part_path(upload_id), link)
+        return link
+
+    def _remember_hash(self, upload_id: UUID, hasher, offset: int):
+        self._hashes[upload_id] = (hasher, offset, time.monotonic())
+        self._hashes.move_to_end(upload_id)
+        while len(self._hashes) > self.max_hashes:
+            # Cel mai vechi se recalculează din fișier, dacă upload-ul continuă aici
+            self._hashes.popitem(last=False)
+
+    async def _hasher(self, upload_id: UUID, fd: int, size: int):
+        """Hash-ul până la `size`: starea din memorie, completată cu porțiunea scrisă de alt worker"""
+        hasher, hashed, _ = self._hashes.pop(upload_id, (None, 0, 0.0))
+        if hasher is None or hashed > size:
+            hasher, hashed = hashlib.sha256(), 0
+        if hashed < size:
+            await asyncio.to_thread(self._hash_range, fd, hasher, hashed, size)
+        return hasher
+
+    def _hash_range(self, fd: int, hasher, start: int, end: int):
+        while start < end:
+            data = os.pread(fd, min(self.write_buffer, end - start), start)
+            if not data:
+                break
+            hasher.update(data)
+            start += len(data)
+
+    @staticmethod
+    def _write(fd: int, hasher, data: bytes, offset: int) -> int:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            hasher.update(view[:written])
+            view = view[written:]
+            offset += written
+        return offset
+
+
+# Instanța globală per worker
+resumable_uploads = background_services.register(
+    ResumableUploadService(
+        root=settings.UPLOAD_DIR,
+        max_size=settings.RESUMABLE_UPLOAD_MAX_SIZE,
+        expire_hours=settings.RESUMABLE_UPLOAD_EXPIRE_HOURS,
+        write_buffer=settings.UPLOAD_CHUNK_SIZE
+    )
+)
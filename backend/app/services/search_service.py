@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text, func, or_, and_
 from sqlalchemy.orm import selectinload
 
+from ..core.cache import cache, cached
 from ..models.content import Page, Announcement, ContentCategory, AnnouncementCategory
 from ..models.documents import SearchIndex
 from ..models.forms import FormSubmission
@@ -14,6 +15,10 @@ from ..models.appointments import Appointment
 from ..models.documents import MOLDocument
 
 
+# Rezultatele căutării sunt cache-uite și invalidate la fiecare reindexare
+SEARCH_CACHE_TAG = "search"
+
+
 class SearchService:
     """Service pentru gestionarea căutării și indexării"""
     
@@ -130,8 +135,10 @@ class SearchService:
             db.add(search_entry)
         
         await db.commit()
+        await cache.invalidate_tags(SEARCH_CACHE_TAG)
     
     @staticmethod
+    @cached(ttl=120, tags=(SEARCH_CACHE_TAG,))
     async def search_content(
         db: AsyncSession,
         query: str,
@@ -380,4 +387,5 @@ class SearchService:
             search_vector=None  # va fi setat de trigger-ul PostgreSQL
         )
         db.add(search_entry)
-        await db.commit()
\ No newline at end of file
+        await db.commit()
+        await cache.invalidate_tags(SEARCH_CACHE_TAG)
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Cache în memorie pentru sesiunile autentificate (get_current_user)
+
+Mapare hash token de acces -> (instantaneu al utilizatorului, expirarea sesiunii).
+Intrările trăiesc cel mult AUTH_SESSION_CACHE_TTL secunde și niciodată după
+expirarea token-ului. Logout-ul, revocarea unei sesiuni, schimbarea parolei
+și blocarea contului le invalidează imediat, inclusiv pe celelalte worker-e,
+prin canalul de invalidare al cache-ului pe două niveluri (core.cache).
+"""
+import logging
+import pickle
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from ..core.cache import LocalLRUCache, cache
+from ..core.config import get_settings
+from ..models.admin import AdminSession, AdminUser
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+KEY_PREFIX = "auth:"
+
+
+def user_tag(user_id: Any) -> str:
+    return f"auth_user:{user_id}"
+
+
+class AuthSessionCache:
+    """
+    Cache local per worker; nu trece prin Redis, folosește doar semnalul
+    de invalidare al cache-ului partajat.
+    """
+
+    def __init__(self, ttl: float = 30, max_entries: int = 4096):
+        self.ttl = ttl
+        self._entries = LocalLRUCache(max_entries)
+        self._columns = [attr.key for attr in sa_inspect(AdminUser).column_attrs]
+        self.hits = 0
+        self.misses = 0
+        cache.on_invalidate(self._on_invalidate)
+
+    @staticmethod
+    def _key(token_hash: str) -> str:
+        return KEY_PREFIX + token_hash
+
+    def get(self, token_hash: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Instantaneul pentru token sau None dacă lipsește, a expirat ori nu aparține utilizatorului"""
+        if self.ttl <= 0:
+            return None
+        raw = self._entries.get(self._key(token_hash))
+        if raw is None:
+            self.misses += 1
+            return None
+
+        entry = pickle.loads(raw)
+        if str(entry["user"]["id"]) != str(user_id) or entry["access_expires_at"] <= datetime.now(timezone.utc):
+            self._entries.delete(self._key(token_hash))
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def put(self, token_hash: str, user: AdminUser, session: AdminSession):
+        if self.ttl <= 0:
+            return
+        expires_at = session.access_expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        ttl = min(self.ttl, (expires_at - datetime.now(timezone.utc)).total_seconds())
+        if ttl <= 0:
+            return
+
+        entry = {
+            "user": {column: getattr(user, column) for column in self._columns},
+            "access_expires_at": expires_at,
+        }
+        self._entries.set(
+            self._key(token_hash),
+            pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL),
+            ttl,
+            tags=(user_tag(user.id),)
+        )
+
+    @staticmethod
+    def restore_user(entry: Dict[str, Any], db: AsyncSession) -> AdminUser:
+        """
+        Reconstruiește utilizatorul fără interogare și îl atașează sesiunii DB
+        a cererii, ca modificările ulterioare (ex. schimbarea parolei) să fie salvate
+        """
+        user = AdminUser(**entry["user"])
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+    async def invalidate_token(self, token_hash: Optional[str]):
+        """Elimină o singură sesiune (logout, revocare, refresh)"""
+        if token_hash:
+            await cache.delete(self._key(token_hash))
+
+    async def invalidate_user(self, user_id: Any):
+        """Elimină toate sesiunile utilizatorului (parolă schimbată, cont blocat, login nou)"""
+        await cache.invalidate_tags(user_tag(user_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _on_invalidate(self, tags: Iterable[str], keys: Iterable[str]):
+        tags = tuple(tags)
+        if "*" in tags:
+            self._entries.clear()
+            return
+        self._entries.invalidate_tags(tags)
+        for key in keys:
+            if key.startswith(KEY_PREFIX):
+                self._entries.delete(key)
+
+
+# Instanța globală per worker
+auth_session_cache = AuthSessionCache(
+    ttl=settings.AUTH_SESSION_CACHE_TTL,
+    max_entries=settings.AUTH_SESSION_CACHE_MAX_ENTRIES
+)
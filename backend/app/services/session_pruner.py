@@ -0,0 +1,79 @@
+"""
+Curățarea periodică a sesiunilor admin expirate
+
+Sesiunile cu refresh token expirat nu mai pot fi folosite, iar cele revocate
+sunt păstrate doar o perioadă scurtă (pentru lista de sesiuni și audit).
+Ștergerea se face în loturi mici, ca tabela și indexul pe access token
+să rămână mici fără tranzacții lungi.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, or_, select
+
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..core.tasks import PeriodicTask, background_services
+from ..models.admin import AdminSession
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ExpiredSessionPruner:
+    """Șterge sesiunile expirate în loturi de `batch_size`, la fiecare `interval` secunde"""
+
+    def __init__(self, interval: float = 3600, batch_size: int = 1000, revoked_retention_days: int = 7):
+        self.batch_size = batch_size
+        self.revoked_retention = timedelta(days=revoked_retention_days)
+        self.total_deleted = 0
+        self._task = PeriodicTask("admin-session-pruner", self.prune, interval, run_on_stop=False)
+
+    async def prune(self) -> int:
+        """Rulează până nu mai rămân sesiuni de șters; returnează numărul de rânduri șterse"""
+        now = datetime.now(timezone.utc)
+        deleted = 0
+        while True:
+            # SKIP LOCKED: worker-ele care rulează simultan își împart loturile
+            expired_ids = (
+                select(AdminSession.id)
+                .where(or_(
+                    AdminSession.refresh_expires_at < now,
+                    (AdminSession.is_revoked == True) & (AdminSession.created_at < now - self.revoked_retention)
+                ))
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    delete(AdminSession)
+                    .where(AdminSession.id.in_(expired_ids))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+
+            deleted += result.rowcount or 0
+            if (result.rowcount or 0) < self.batch_size:
+                break
+
+        if deleted:
+            self.total_deleted += deleted
+            logger.info(f"Șterse {deleted} sesiuni admin expirate")
+        return deleted
+
+    async def start(self):
+        await self._task.start()
+
+    async def stop(self):
+        await self._task.stop()
+
+
+# Instanța globală per worker
+session_pruner = background_services.register(
+    ExpiredSessionPruner(
+        interval=settings.ADMIN_SESSION_PRUNE_INTERVAL,
+        batch_size=settings.ADMIN_SESSION_PRUNE_BATCH_SIZE,
+        revoked_retention_days=settings.ADMIN_SESSION_REVOKED_RETENTION_DAYS
+    )
+)
@@ -0,0 +1,347 @@
+"""
+Generarea sitemap.xml pentru motoarele de căutare (protocolul sitemaps.org)
+
+- URL-urile sunt citite în loturi, prin cursoare server-side, doar cu coloanele necesare
+- ieșirea este scrisă direct comprimată gzip, fișier cu fișier
+- peste 50.000 de URL-uri (sau 50 MB necomprimat) se creează mai multe fișiere
+  și un sitemap index
+- rezultatul stă pe disc și este regenerat doar când amprenta conținutului
+  (număr de rânduri + ultima modificare, per sursă) se schimbă
+"""
+import asyncio
+import fcntl
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from sqlalchemy import and_, func, or_, select
+
+from ..core.cache import cache
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..core.http_cache import MOL_CACHE_TAG, NAVIGATION_CACHE_TAG
+from ..models.content import Announcement, Page
+from ..models.documents import Document, MOLDocument
+from .navigation_service import navigation_store
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+MAX_URLS_PER_FILE = 50_000
+MAX_BYTES_PER_FILE = 50 * 1024 * 1024  # limita protocolului, necomprimat
+
+INDEX_FILE = "sitemap.xml.gz"
+FINGERPRINT_FILE = "sitemap.fingerprint.json"
+
+# Etichete invalidate la modificarea conținutului; forțează verificarea amprentei.
+# Celelalte surse (anunțuri, documente) sunt prinse de verificarea periodică.
+SITEMAP_SOURCE_TAGS = (NAVIGATION_CACHE_TAG, MOL_CACHE_TAG)
+
+SitemapUrl = Tuple[str, Optional[Any]]  # (cale relativă, lastmod)
+
+
+def format_lastmod(value: Any) -> Optional[str]:
+    """Format W3C Datetime, cerut de protocol"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat(timespec="seconds")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def part_name(number: int) -> str:
+    return f"sitemap-{number}.xml.gz"
+
+
+class _SitemapPartWriter:
+    """Un fișier <urlset> gzip, scris incremental"""
+
+    HEADER = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'.encode("utf-8")
+    FOOTER = b"</urlset>\n"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.urls = 0
+        self.bytes = len(self.HEADER) + len(self.FOOTER)
+        self._file = gzip.open(path, "wb", compresslevel=6)
+        self._file.write(self.HEADER)
+
+    def fits(self, entry: bytes) -> bool:
+        return self.urls < MAX_URLS_PER_FILE and self.bytes + len(entry) <= MAX_BYTES_PER_FILE
+
+    def write(self, entries: List[bytes]):
+        self._file.write(b"".join(entries))
+
+    def close(self):
+        self._file.write(self.FOOTER)
+        self._file.close()
+
+    def abort(self):
+        self._file.close()
+
+
+class SitemapService:
+    """Generează, păstrează pe disc și servește sitemap-ul"""
+
+    def __init__(self, output_dir: str, base_url: str, chunk_size: int = 1000, check_interval: float = 300):
+        self.output_dir = os.path.abspath(output_dir)
+        self.base_url = base_url.rstrip("/")
+        self.chunk_size = chunk_size
+        self.check_interval = check_interval
+        self._lock = asyncio.Lock()
+        self._checked_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.generations = 0
+        cache.on_invalidate(self._on_invalidate)
+
+    # ---------- servire ----------
+
+    def index_path(self) -> str:
+        return os.path.join(self.output_dir, INDEX_FILE)
+
+    def part_path(self, number: int) -> str:
+        return os.path.join(self.output_dir, part_name(number))
+
+    async def ensure_fresh(self) -> str:
+        """
+        Returnează calea fișierului principal. Prima generare se așteaptă;
+        după aceea verificarea și regenerarea rulează în fundal, iar crawler-ele
+        primesc mereu fișierul existent.
+        """
+        if not os.path.exists(self.index_path()):
+            await self.refresh()
+            return self.index_path()
+
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self.refresh(), name="sitemap-refresh")
+        return self.index_path()
+
+    # ---------- regenerare ----------
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Regenerează dacă amprenta s-a schimbat; returnează True dacă a scris fișiere noi"""
+        async with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                async with async_session_maker() as db:
+                    fingerprint = await self._fingerprint(db)
+                    if not force and fingerprint == self._stored_fingerprint() and os.path.exists(self.index_path()):
+                        return False
+
+                    os.makedirs(self.output_dir, exist_ok=True)
+                    with open(os.path.join(self.output_dir, ".lock"), "w") as lock_file:
+                        # Un singur worker generează; ceilalți păstrează fișierele existente
+                        try:
+                            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        except BlockingIOError:
+                            return False
+                        try:
+                            await self._generate(db, fingerprint)
+                        finally:
+                            fcntl.flock(lock_file, fcntl.LOCK_UN)
+                return True
+            except Exception:
+                logger.exception("Eroare la generarea sitemap.xml")
+                return False
+
+    async def _generate(self, db, fingerprint: Dict[str, Any]):
+        started = time.monotonic()
+        build_dir = os.path.join(self.output_dir, f".build-{uuid.uuid4().hex}")
+        os.makedirs(build_dir)
+        try:
+            counts = await self._write_parts(db, build_dir)
+
+            if len(counts) == 1:
+                # Un singur fișier: devine direct sitemap-ul principal (urlset)
+                os.replace(os.path.join(build_dir, part_name(1)), os.path.join(build_dir, INDEX_FILE))
+                parts = 0
+            else:
+                parts = len(counts)
+                await asyncio.to_thread(self._write_index, build_dir, parts)
+
+            with open(os.path.join(build_dir, FINGERPRINT_FILE), "w") as f:
+                json.dump(fingerprint, f)
+
+            # Părțile întâi, indexul la final: un crawler nu vede un index spre fișiere lipsă
+            for number in range(1, parts + 1):
+                os.replace(os.path.join(build_dir, part_name(number)), self.part_path(number))
+            os.replace(os.path.join(build_dir, INDEX_FILE), self.index_path())
+            os.replace(os.path.join(build_dir, FINGERPRINT_FILE), os.path.join(self.output_dir, FINGERPRINT_FILE))
+            self._remove_stale_parts(keep=parts)
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+        self.generations += 1
+        logger.info(
+            f"sitemap.xml regenerat: {sum(counts)} URL-uri în {len(counts)} fișier(e), "
+            f"{time.monotonic() - started:.2f}s"
+        )
+
+    async def _write_parts(self, db, build_dir: str) -> List[int]:
+        """Scrie fișierele <urlset>; returnează numărul de URL-uri din fiecare"""
+        counts: List[int] = []
+        writer: Optional[_SitemapPartWriter] = None
+        pending: List[bytes] = []
+
+        async def flush():
+            if writer is not None and pending:
+                await asyncio.to_thread(writer.write, list(pending))
+                pending.clear()
+
+        try:
+            async for path, lastmod in self._iter_urls(db):
+                entry = self._url_entry(path, lastmod)
+                if writer is None or not writer.fits(entry):
+                    await flush()
+                    if writer is not None:
+                        await asyncio.to_thread(writer.close)
+                        counts.append(writer.urls)
+                    writer = _SitemapPartWriter(os.path.join(build_dir, part_name(len(counts) + 1)))
+                writer.urls += 1
+                writer.bytes += len(entry)
+                pending.append(entry)
+                if len(pending) >= self.chunk_size:
+                    await flush()
+
+            if writer is None:
+                writer = _SitemapPartWriter(os.path.join(build_dir, part_name(1)))
+            await flush()
+            await asyncio.to_thread(writer.close)
+            counts.append(writer.urls)
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+        return counts
+
+    def _write_index(self, build_dir: str, parts: int):
+        lastmod = format_lastmod(datetime.now(timezone.utc))
+        with gzip.open(os.path.join(build_dir, INDEX_FILE), "wb", compresslevel=6) as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'.encode("utf-8"))
+            for number in range(1, parts + 1):
+                loc = escape(f"{self.base_url}/{part_name(number)}")
+                f.write(f"<sitemap><loc>{loc}</loc><lastmod>{lastmod}</lastmod></sitemap>\n".encode("utf-8"))
+            f.write(b"</sitemapindex>\n")
+
+    def _url_entry(self, path: str, lastmod: Any) -> bytes:
+        loc = escape(self.base_url + path)
+        formatted = format_lastmod(lastmod)
+        if formatted:
+            return f"<url><loc>{loc}</loc><lastmod>{formatted}</lastmod></url>\n".encode("utf-8")
+        return f"<url><loc>{loc}</loc></url>\n".encode("utf-8")
+
+    def _remove_stale_parts(self, keep: int):
+        number = keep + 1
+        while os.path.exists(self.part_path(number)):
+            os.remove(self.part_path(number))
+            number += 1
+
+    # ---------- surse de URL-uri ----------
+
+    async def _iter_urls(self, db) -> AsyncIterator[SitemapUrl]:
+        # Secțiunile statice ale site-ului, din indexul de navigare deja încărcat
+        navigation = await navigation_store.get(db)
+        for group in ("static_pages", "services", "legal_pages"):
+            for item in navigation.sitemap.get(group, ()):
+                yield item["url"], None
+        for section in navigation.menu["main_sections"]:
+            yield section["url"], None
+
+        for source in self._sources():
+            stream = await db.stream(source.execution_options(yield_per=self.chunk_size))
+            async for row in stream:
+                yield row[0], row[1]
+
+    def _sources(self) -> Iterable[Any]:
+        now = datetime.now(timezone.utc)
+        yield (
+            select(func.concat("/pagina/", Page.slug), Page.updated_at)
+            .where(Page.status == "published", Page.requires_auth == False)
+            .order_by(Page.id)
+        )
+        yield (
+            select(func.concat("/anunturi/", Announcement.slug), Announcement.updated_at)
+            .where(self._announcement_filter(now))
+            .order_by(Announcement.id)
+        )
+        yield (
+            select(
+                func.concat("/api/v1/documents/mol/", MOLDocument.id, "/download"),
+                func.coalesce(MOLDocument.updated_at, MOLDocument.published_date)
+            )
+            .where(self._mol_filter())
+            .order_by(MOLDocument.id)
+        )
+        yield (
+            select(func.concat("/api/v1/documents/", Document.id, "/download"), Document.updated_at)
+            .where(self._document_filter())
+            .order_by(Document.id)
+        )
+
+    @staticmethod
+    def _announcement_filter(now: datetime):
+        return and_(
+            Announcement.status == "published",
+            or_(Announcement.expires_at.is_(None), Announcement.expires_at > now)
+        )
+
+    @staticmethod
+    def _mol_filter():
+        return and_(
+            MOLDocument.status == "published",
+            MOLDocument.is_public == True,
+            MOLDocument.file_path.isnot(None)
+        )
+
+    @staticmethod
+    def _document_filter():
+        return and_(Document.is_public == True, Document.requires_auth == False)
+
+    async def _fingerprint(self, db) -> Dict[str, Any]:
+        """Număr de rânduri și ultima modificare per sursă: o interogare agregată ieftină"""
+        now = datetime.now(timezone.utc)
+        sources = {
+            "pages": (Page.updated_at, and_(Page.status == "published", Page.requires_auth == False)),
+            "announcements": (Announcement.updated_at, self._announcement_filter(now)),
+            "mol": (MOLDocument.updated_at, self._mol_filter()),
+            "documents": (Document.updated_at, self._document_filter()),
+        }
+        fingerprint: Dict[str, Any] = {"base_url": self.base_url}
+        for name, (updated_at, condition) in sources.items():
+            row = (await db.execute(select(func.count(), func.max(updated_at)).where(condition))).one()
+            fingerprint[name] = [row[0], format_lastmod(row[1])]
+        return fingerprint
+
+    def _stored_fingerprint(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.output_dir, FINGERPRINT_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _on_invalidate(self, tags: Iterable[str], keys: Iterable[str]):
+        if set(tags) & set(SITEMAP_SOURCE_TAGS + ("*",)):
+            # Următoarea cerere verifică amprenta imediat
+            self._checked_at = 0.0
+
+
+# Instanța globală per worker
+sitemap_service = SitemapService(
+    output_dir=settings.SITEMAP_DIR,
+    base_url=settings.SITEMAP_BASE_URL or settings.FRONTEND_URL,
+    chunk_size=settings.SITEMAP_CHUNK_SIZE,
+    check_interval=settings.SITEMAP_CHECK_INTERVAL
+)
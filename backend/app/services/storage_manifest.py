@@ -0,0 +1,331 @@
+"""
+Evidența fișierelor din UPLOAD_DIR (storage_manifest) și totalurile lor (storage_usage)
+
+Fiecare salvare și ștergere de fișier actualizează manifestul și contorii
+per subfolder/extensie în tranzacția operației, așa că statisticile de stocare
+sunt o citire dintr-un tabel mic plus un index pe dimensiune, indiferent
+câte fișiere există. Scanarea discului rămâne doar în rebuild(), rulat o dată
+pentru fișierele salvate înainte de manifest.
+"""
+import asyncio
+import logging
+import mimetypes
+import os
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import String, column, delete, func, select, text, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..models.documents import StorageManifestEntry, StorageUsage
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Fișiere în curs de scriere, care nu ajung în manifest
+TRANSIENT_SUFFIXES = (".part", ".tmp", ".upload")
+TRANSIENT_DIRS = ("temp",)
+
+UsageKey = Tuple[str, str]
+
+
+def split_path(path: str) -> UsageKey:
+    """Subfolderul (primul segment) și extensia unei căi relative la UPLOAD_DIR"""
+    parts = Path(path).parts
+    subfolder = parts[0] if len(parts) > 1 else "root"
+    return subfolder, Path(path).suffix.lower()[:20]
+
+
+def is_transient(path: str) -> bool:
+    parts = Path(path).parts
+    return (
+        Path(path).name.startswith(".")
+        or path.endswith(TRANSIENT_SUFFIXES)
+        or (len(parts) > 1 and parts[0] in TRANSIENT_DIRS)
+    )
+
+
+def walk_files(
+    root: Path,
+    batch_size: int,
+    skip_transient: bool = True
+) -> Iterator[List[Tuple[str, os.stat_result]]]:
+    """
+    Parcurge `root` și produce loturi de (cale relativă, stat), fără a ține
+    arborele în memorie. Sincron: se avansează cu asyncio.to_thread(next, ...).
+    """
+    batch: List[Tuple[str, os.stat_result]] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            path = Path(os.path.relpath(full_path, root)).as_posix()
+            if skip_transient and is_transient(path):
+                continue
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                # Fișier șters între listare și stat
+                continue
+            batch.append((path, st))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+class StorageManifest:
+    """Manifestul fișierelor încărcate; metodele primesc sesiunea apelantului sau deschid una proprie"""
+
+    def __init__(self, root: str, rebuild_batch_size: int = 1000):
+        self.root = Path(root)
+        self.rebuild_batch_size = rebuild_batch_size
+        self._rebuild_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def _session(self, db: Optional[AsyncSession]) -> AsyncIterator[AsyncSession]:
+        if db is not None:
+            yield db
+            return
+        async with async_session_maker() as session:
+            yield session
+            await session.commit()
+
+    async def record(
+        self,
+        path: str,
+        size: int,
+        mime_type: Optional[str] = None,
+        sha256: Optional[str] = None,
+        owner: Optional[Tuple[str, Any]] = None,
+        db: Optional[AsyncSession] = None
+    ):
+        """Înregistrează un fișier nou; pentru o cale existentă actualizează doar dimensiunea"""
+        subfolder, extension = split_path(path)
+        owner_type, owner_id = owner if owner else (None, None)
+        async with self._session(db) as session:
+            result = await session.execute(
+                insert(StorageManifestEntry)
+                .values(
+                    path=path,
+                    subfolder=subfolder,
+                    extension=extension,
+                    size=size,
+                    mime_type=mime_type or mimetypes.guess_type(path)[0],
+                    sha256=sha256,
+                    owner_type=owner_type,
+                    owner_id=str(owner_id) if owner_id is not None else None,
+                    created_at=datetime.now(timezone.utc)
+                )
+                .on_conflict_do_nothing(index_elements=[StorageManifestEntry.path])
+                .returning(StorageManifestEntry.path)
+            )
+            if result.scalar_one_or_none() is not None:
+                await self._apply_usage(session, {(subfolder, extension): (1, size)})
+            else:
+                await self._resize(session, path, size)
+
+    async def resize(self, path: str, size: int, db: Optional[AsyncSession] = None):
+        """Dimensiunea nouă a unui fișier modificat pe loc (de ex. imagine optimizată)"""
+        async with self._session(db) as session:
+            await self._resize(session, path, size)
+
+    async def _resize(self, db: AsyncSession, path: str, size: int):
+        # Dimensiunea veche vine din același rând, blocat până la commit
+        old = (
+            select(StorageManifestEntry.path, StorageManifestEntry.size.label("old_size"))
+            .where(StorageManifestEntry.path == path)
+            .with_for_update()
+            .subquery()
+        )
+        row = (await db.execute(
+            update(StorageManifestEntry)
+            .where(StorageManifestEntry.path == old.c.path)
+            .values(size=size)
+            .returning(StorageManifestEntry.subfolder, StorageManifestEntry.extension, old.c.old_size)
+            .execution_options(synchronize_session=False)
+        )).one_or_none()
+        if row is not None and row.old_size != size:
+            await self._apply_usage(db, {(row.subfolder, row.extension): (0, size - row.old_size)})
+
+    async def remove(self, paths: Iterable[Optional[str]], db: Optional[AsyncSession] = None) -> int:
+        """Elimină căile din manifest și scade totalurile; returnează numărul de rânduri șterse"""
+        paths = sorted({path for path in paths if path})
+        if not paths:
+            return 0
+        async with self._session(db) as session:
+            rows = (await session.execute(
+                delete(StorageManifestEntry)
+                .where(StorageManifestEntry.path.in_(paths))
+                .returning(StorageManifestEntry.subfolder, StorageManifestEntry.extension, StorageManifestEntry.size)
+                .execution_options(synchronize_session=False)
+            )).all()
+
+            deltas: Dict[UsageKey, Tuple[int, int]] = {}
+            for row in rows:
+                count, size = deltas.get((row.subfolder, row.extension), (0, 0))
+                deltas[(row.subfolder, row.extension)] = (count - 1, size - row.size)
+            await self._apply_usage(session, deltas)
+        return len(rows)
+
+    async def claim(self, db: AsyncSession, paths: Iterable[Optional[str]], owner_type: str, owner_id: Any):
+        """Primul proprietar al fișierelor (blob-urile partajate își păstrează proprietarul inițial)"""
+        paths = [path for path in paths if path]
+        if not paths:
+            return
+        await db.execute(
+            update(StorageManifestEntry)
+            .where(StorageManifestEntry.path.in_(paths), StorageManifestEntry.owner_type.is_(None))
+            .values(owner_type=owner_type, owner_id=str(owner_id))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def claim_many(self, db: AsyncSession, claims: Iterable[Tuple[Optional[str], str, Any]]):
+        """Ca claim(), cu proprietar diferit per fișier (cale, tip, id): un singur UPDATE ... FROM (VALUES ...)"""
+        owners: Dict[str, Tuple[str, str]] = {}
+        for path, owner_type, owner_id in claims:
+            # La aceeași cale de mai multe ori, primul proprietar câștigă
+            if path and path not in owners:
+                owners[path] = (owner_type, str(owner_id))
+        if not owners:
+            return
+        claimed = values(
+            column("path", String),
+            column("owner_type", String),
+            column("owner_id", String),
+            name="claimed_paths"
+        ).data([(path, owner_type, owner_id) for path, (owner_type, owner_id) in owners.items()])
+        await db.execute(
+            update(StorageManifestEntry)
+            .where(StorageManifestEntry.path == claimed.c.path, StorageManifestEntry.owner_type.is_(None))
+            .values(owner_type=claimed.c.owner_type, owner_id=claimed.c.owner_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _apply_usage(self, db: AsyncSession, deltas: Dict[UsageKey, Tuple[int, int]]):
+        deltas = {key: delta for key, delta in deltas.items() if delta != (0, 0)}
+        if not deltas:
+            return
+        # Ordine fixă a cheilor: tranzacțiile concurente blochează rândurile în aceeași ordine
+        stmt = insert(StorageUsage).values([
+            {"subfolder": subfolder, "extension": extension, "files_count": count, "total_size": size}
+            for (subfolder, extension), (count, size) in sorted(deltas.items())
+        ])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[StorageUsage.subfolder, StorageUsage.extension],
+            set_={
+                "files_count": StorageUsage.files_count + stmt.excluded.files_count,
+                "total_size": StorageUsage.total_size + stmt.excluded.total_size
+            }
+        ))
+
+    async def usage(self, db: AsyncSession) -> Dict[str, Any]:
+        """Totalurile generale, per subfolder și per extensie (citite din storage_usage)"""
+        rows = (await db.execute(
+            select(StorageUsage).where(StorageUsage.files_count > 0)
+        )).scalars().all()
+
+        categories: Dict[str, int] = defaultdict(int)
+        category_counts: Dict[str, int] = defaultdict(int)
+        file_types: Dict[str, int] = defaultdict(int)
+        for row in rows:
+            categories[row.subfolder] += row.total_size
+            category_counts[row.subfolder] += row.files_count
+            file_types[row.extension] += row.files_count
+
+        return {
+            "total_size": sum(categories.values()),
+            "files_count": sum(category_counts.values()),
+            "categories": dict(categories),
+            "category_counts": dict(category_counts),
+            "file_types": dict(file_types)
+        }
+
+    async def largest(self, db: AsyncSession, limit: int = 10) -> List[Dict[str, Any]]:
+        """Cele mai mari fișiere, din indexul pe dimensiune"""
+        rows = (await db.execute(
+            select(StorageManifestEntry.path, StorageManifestEntry.size)
+            .order_by(StorageManifestEntry.size.desc())
+            .limit(limit)
+        )).all()
+        return [{"path": row.path, "size": row.size} for row in rows]
+
+    async def rebuild(self) -> Dict[str, int]:
+        """
+        Adaugă în manifest fișierele existente pe disc și nemenționate (salvate
+        înainte de manifest), apoi recalculează storage_usage din manifest.
+        Rulat la cerere de un administrator; fișierele dispărute rămân pentru reconciliere.
+        """
+        if self._rebuild_lock.locked():
+            return {"scanned": 0, "added": 0, "running": 1}
+
+        async with self._rebuild_lock:
+            scanned = added = 0
+            # Discul se parcurge în fir separat, câte un lot odată
+            batches = self._scan_batches()
+            while True:
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    break
+                scanned += len(batch)
+                added += await self._insert_missing(batch)
+
+            async with async_session_maker() as db:
+                # Scrierile concurente în storage_usage așteaptă recalcularea
+                await db.execute(text("LOCK TABLE storage_usage IN EXCLUSIVE MODE"))
+                await db.execute(delete(StorageUsage))
+                await db.execute(
+                    insert(StorageUsage).from_select(
+                        ["subfolder", "extension", "files_count", "total_size"],
+                        select(
+                            StorageManifestEntry.subfolder,
+                            StorageManifestEntry.extension,
+                            func.count(),
+                            func.coalesce(func.sum(StorageManifestEntry.size), 0)
+                        ).group_by(StorageManifestEntry.subfolder, StorageManifestEntry.extension)
+                    )
+                )
+                await db.commit()
+
+        logger.info(f"Manifestul de stocare a fost reconstruit: {scanned} fișiere pe disc, {added} adăugate")
+        return {"scanned": scanned, "added": added, "running": 0}
+
+    def _scan_batches(self) -> Iterator[List[Dict[str, Any]]]:
+        for files in walk_files(self.root, self.rebuild_batch_size):
+            batch = []
+            for path, st in files:
+                subfolder, extension = split_path(path)
+                batch.append({
+                    "path": path,
+                    "subfolder": subfolder,
+                    "extension": extension,
+                    "size": st.st_size,
+                    "mime_type": mimetypes.guess_type(path)[0],
+                    "created_at": datetime.fromtimestamp(st.st_mtime, timezone.utc)
+                })
+            yield batch
+
+    async def _insert_missing(self, batch: List[Dict[str, Any]]) -> int:
+        async with async_session_maker() as db:
+            result = await db.execute(
+                insert(StorageManifestEntry)
+                .values(batch)
+                .on_conflict_do_nothing(index_elements=[StorageManifestEntry.path])
+                .returning(StorageManifestEntry.path)
+            )
+            added = len(result.all())
+            await db.commit()
+        return added
+
+
+# Instanța globală per worker
+storage_manifest = StorageManifest(
+    root=settings.UPLOAD_DIR,
+    rebuild_batch_size=settings.STORAGE_MANIFEST_BATCH_SIZE
+)
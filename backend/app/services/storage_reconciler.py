@@ -0,0 +1,250 @@
+"""
+Reconcilierea fișierelor din UPLOAD_DIR cu înregistrările care le referă
+
+Rulează ca sarcină de fundal (background_jobs), nu în cererea HTTP. Căile
+referite sunt citite în flux din toate tabelele care dețin fișiere: documente,
+MOL, cereri, sesizări, programări, documentele generate și blob-urile
+stocate după conținut; thumbnail-urile sunt păstrate cât timp fișierul sursă
+este referit. Arborele se parcurge în loturi, iar progresul este salvat după
+fiecare lot.
+
+Un fișier este șters doar dacă:
+  - nu este referit la începutul rulării și nici la reverificarea lotului,
+    făcută imediat înainte de ștergere;
+  - este mai vechi decât perioada de grație (upload-urile încă neatașate);
+    perioada nu poate coborî sub expirarea upload-urilor reluabile și a
+    blob-urilor neatașate.
+Fișierele temporare (temp/, *.part, *.upload) nu sunt parcurse: le curăță
+upload-urile reluabile și colectarea blob-urilor.
+Implicit rularea este dry-run: raportează fără să șteargă.
+"""
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..models.appointments import Appointment
+from ..models.documents import Document, MOLDocument, StoredBlob
+from ..models.forms import Complaint, FormSubmission, GeneratedDocument
+from ..models.jobs import BackgroundJob
+from .job_queue import job_queue
+from .storage_manifest import storage_manifest, walk_files
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RECONCILE_JOB_KIND = "storage.reconcile"
+THUMBNAIL_PREFIX = "thumbnails/thumb_"
+# Fișiere cu retenție proprie, nereferite din tabele (arhivele generărilor în lot)
+SELF_MANAGED_PREFIXES = ("documents/batches/",)
+
+# Coloanele cu o singură cale, respectiv cu liste de căi
+PATH_COLUMNS = (Document.file_path, MOLDocument.file_path, StoredBlob.storage_path, GeneratedDocument.storage_path)
+ARRAY_COLUMNS = (FormSubmission.attached_files, Complaint.attached_photos, Complaint.attached_documents)
+
+
+class StorageReconciler:
+    """Găsește (și, în afara dry-run, șterge) fișierele pe care nu le mai referă nimic"""
+
+    def __init__(
+        self,
+        root: str,
+        batch_size: int = 1000,
+        grace_hours: int = 24,
+        min_grace_hours: int = 24,
+        sample_size: int = 100
+    ):
+        self.root = Path(root)
+        self.batch_size = batch_size
+        self.min_grace_hours = min_grace_hours
+        self.grace_hours = max(grace_hours, min_grace_hours)
+        self.sample_size = sample_size
+
+    def effective_grace_hours(self, grace_hours: Optional[int] = None) -> int:
+        """Perioada cerută, dar nu mai mică decât cât pot rămâne nereferite upload-urile în curs"""
+        return self.grace_hours if grace_hours is None else max(grace_hours, self.min_grace_hours)
+
+    def normalize(self, path: Any) -> Optional[str]:
+        """Calea relativă la UPLOAD_DIR; înregistrările vechi o pot avea prefixată cu "uploads/" """
+        if not isinstance(path, str) or not path.strip():
+            return None
+        path = path.strip().replace("\\", "/").lstrip("/")
+        prefix = f"{self.root.name}/"
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+        return path
+
+    async def schedule(self, db: AsyncSession, dry_run: bool = True, grace_hours: Optional[int] = None) -> BackgroundJob:
+        """Pornește reconcilierea; dacă una este deja în curs, o returnează pe aceea"""
+        active = await job_queue.find_active(db, RECONCILE_JOB_KIND)
+        if active is not None:
+            return active
+        job = await job_queue.enqueue(db, RECONCILE_JOB_KIND, {
+            "dry_run": dry_run,
+            "grace_hours": self.effective_grace_hours(grace_hours)
+        })
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def run(self, dry_run: bool = True, grace_hours: Optional[int] = None) -> Dict[str, Any]:
+        grace_hours = self.effective_grace_hours(grace_hours)
+        cutoff = time.time() - grace_hours * 3600
+        started = time.perf_counter()
+
+        referenced, names = await self._load_references()
+        report: Dict[str, Any] = {
+            "dry_run": dry_run,
+            "grace_hours": grace_hours,
+            "referenced_paths": len(referenced),
+            "total_files": 0,
+            "orphaned_files": 0,
+            "orphaned_size": 0,
+            "deleted_files": 0,
+            "freed_space": 0,
+            "skipped_recent": 0,
+            "errors": 0,
+            "orphan_samples": [],
+            "finished": False
+        }
+
+        # Discul se parcurge în fir separat, câte un lot odată
+        batches = walk_files(self.root, self.batch_size)
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+
+            candidates: List[Tuple[str, int]] = []
+            for path, st in batch:
+                report["total_files"] += 1
+                # Fișierele ascunse (.gitkeep etc.) nu aparțin aplicației
+                if Path(path).name.startswith(".") or self._is_referenced(path, referenced, names):
+                    continue
+                if st.st_mtime > cutoff:
+                    report["skipped_recent"] += 1
+                    continue
+                candidates.append((path, st.st_size))
+
+            if candidates:
+                # Referințele adăugate după încărcarea inițială protejează fișierul
+                still_referenced = await self._referenced_now([path for path, _ in candidates])
+                orphans = [(path, size) for path, size in candidates if path not in still_referenced]
+                await self._handle_orphans(orphans, dry_run, report)
+
+            await job_queue.report_progress(report)
+
+        report["finished"] = True
+        report["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(
+            f"Reconcilierea stocării ({'dry-run' if dry_run else 'ștergere'}): "
+            f"{report['total_files']} fișiere, {report['orphaned_files']} orfane, {report['deleted_files']} șterse"
+        )
+        return report
+
+    def _is_referenced(self, path: str, referenced: Set[str], names: Set[str]) -> bool:
+        if path in referenced or path.startswith(SELF_MANAGED_PREFIXES):
+            return True
+        return path.startswith(THUMBNAIL_PREFIX) and path[len(THUMBNAIL_PREFIX):] in names
+
+    async def _load_references(self) -> Tuple[Set[str], Set[str]]:
+        """Toate căile referite și numele lor de fișier (pentru thumbnail-uri), citite în flux"""
+        referenced: Set[str] = set()
+        async with async_session_maker() as db:
+            for column in PATH_COLUMNS:
+                await self._collect(db, select(column).where(column.isnot(None)), referenced)
+            for column in ARRAY_COLUMNS:
+                await self._collect(db, select(func.unnest(column)).where(column.isnot(None)), referenced)
+            # Programările păstrează atașamentele în JSONB (listă de căi sau de obiecte)
+            await self._collect(
+                db, select(Appointment.attached_files).where(Appointment.attached_files.isnot(None)), referenced
+            )
+        return referenced, {Path(path).name for path in referenced}
+
+    async def _collect(self, db: AsyncSession, stmt, referenced: Set[str]):
+        result = await db.stream(stmt.execution_options(yield_per=self.batch_size))
+        async for partition in result.partitions():
+            for (value,) in partition:
+                referenced.update(path for path in map(self.normalize, self._paths_in(value)) if path)
+
+    @staticmethod
+    def _paths_in(value: Any) -> Iterable[Any]:
+        if isinstance(value, str):
+            return (value,)
+        if isinstance(value, dict):
+            return (value.get("file_path") or value.get("path"),)
+        if isinstance(value, list):
+            return [path for item in value for path in StorageReconciler._paths_in(item)]
+        return ()
+
+    async def _referenced_now(self, paths: List[str]) -> Set[str]:
+        """Reverifică în DB căile candidate la ștergere (inclusiv cu prefixul vechi "uploads/")"""
+        files = [path for path in paths if not path.startswith(THUMBNAIL_PREFIX)]
+        thumbnails = {path[len(THUMBNAIL_PREFIX):]: path for path in paths if path.startswith(THUMBNAIL_PREFIX)}
+        variants = files + [f"{self.root.name}/{path}" for path in files]
+
+        referenced: Set[str] = set()
+        async with async_session_maker() as db:
+            for column in PATH_COLUMNS:
+                if files:
+                    rows = await db.execute(select(column).where(column.in_(variants)))
+                    referenced.update(map(self.normalize, rows.scalars()))
+                if thumbnails:
+                    # Thumbnail-ul rămâne cât timp există o sursă cu același nume
+                    rows = await db.execute(
+                        select(column).where(or_(*(column.like(f"%/{name}") for name in thumbnails)))
+                    )
+                    referenced.update(thumbnails[Path(path).name] for path in rows.scalars() if Path(path).name in thumbnails)
+            for column in ARRAY_COLUMNS:
+                if files:
+                    rows = await db.execute(select(func.unnest(column)).where(column.op("&&")(array(variants))))
+                    referenced.update(map(self.normalize, rows.scalars()))
+        return referenced
+
+    async def _handle_orphans(self, orphans: List[Tuple[str, int]], dry_run: bool, report: Dict[str, Any]):
+        report["orphaned_files"] += len(orphans)
+        report["orphaned_size"] += sum(size for _, size in orphans)
+        room = self.sample_size - len(report["orphan_samples"])
+        if room > 0:
+            report["orphan_samples"].extend(path for path, _ in orphans[:room])
+        if dry_run or not orphans:
+            return
+
+        deleted, errors = await asyncio.to_thread(self._unlink_many, orphans)
+        await storage_manifest.remove([path for path, _ in deleted])
+        report["deleted_files"] += len(deleted)
+        report["freed_space"] += sum(size for _, size in deleted)
+        report["errors"] += errors
+
+    def _unlink_many(self, orphans: List[Tuple[str, int]]) -> Tuple[List[Tuple[str, int]], int]:
+        deleted = []
+        errors = 0
+        for path, size in orphans:
+            try:
+                (self.root / path).unlink(missing_ok=True)
+                deleted.append((path, size))
+            except OSError as e:
+                logger.warning(f"Nu s-a putut șterge fișierul orfan {path}: {e}")
+                errors += 1
+        return deleted, errors
+
+
+# Instanța globală per worker
+storage_reconciler = StorageReconciler(
+    root=settings.UPLOAD_DIR,
+    batch_size=settings.STORAGE_MANIFEST_BATCH_SIZE,
+    grace_hours=settings.STORAGE_RECONCILE_GRACE_HOURS,
+    min_grace_hours=max(settings.RESUMABLE_UPLOAD_EXPIRE_HOURS, settings.BLOB_UNREFERENCED_GRACE_HOURS)
+)
+
+
+@job_queue.handler(RECONCILE_JOB_KIND)
+async def _run_reconcile_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await storage_reconciler.run(payload.get("dry_run", True), payload.get("grace_hours"))
@@ -0,0 +1,130 @@
+"""
+Contorizarea vizualizărilor de anunțuri în memorie, cu scriere periodică în lot
+"""
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import Integer, column, update, values
+
+from ..core.config import get_settings
+from ..core.database import async_session_maker
+from ..core.tasks import PeriodicTask, background_services
+from ..models.content import Announcement
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def visitor_fingerprint(ip_address: Optional[str], user_agent: Optional[str]) -> Optional[str]:
+    """Cheie anonimă pentru vizitator (nu păstrăm IP-ul în clar în memorie)"""
+    if not ip_address and not user_agent:
+        return None
+    raw = f"{ip_address or ''}|{user_agent or ''}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class AnnouncementViewCounter:
+    """
+    Colectează vizualizările în memorie și le scrie în announcements.view_count
+    printr-un singur UPDATE ... FROM (VALUES ...) la fiecare interval.
+    Endpoint-ul public rămâne astfel fără tranzacții de scriere.
+    """
+
+    def __init__(
+        self,
+        flush_interval: int = 30,
+        dedup_window: int = 0,
+        max_tracked_visitors: int = 100_000
+    ):
+        self.dedup_window = dedup_window
+        self.max_tracked_visitors = max_tracked_visitors
+        self._pending: Dict[int, int] = {}
+        # (announcement_id, vizitator) -> momentul până la care nu mai numărăm
+        self._seen: "OrderedDict[Tuple[int, str], float]" = OrderedDict()
+        self._task = PeriodicTask("announcement-view-counter", self.flush, flush_interval)
+
+    def record(self, announcement_id: int, visitor_key: Optional[str] = None) -> bool:
+        """
+        Înregistrează o vizualizare. Returnează False dacă vizitatorul a fost deja
+        numărat în fereastra de deduplicare.
+        """
+        if self.dedup_window > 0 and visitor_key:
+            now = time.monotonic()
+            key = (announcement_id, visitor_key)
+            expires_at = self._seen.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+            self._seen[key] = now + self.dedup_window
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.max_tracked_visitors:
+                self._seen.popitem(last=False)
+
+        self._pending[announcement_id] = self._pending.get(announcement_id, 0) + 1
+        return True
+
+    @property
+    def pending_views(self) -> int:
+        return sum(self._pending.values())
+
+    async def flush(self) -> int:
+        """Scrie vizualizările acumulate; la eroare le păstrează pentru următorul interval"""
+        self._prune_seen()
+
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+
+        deltas = values(
+            column("id", Integer),
+            column("delta", Integer),
+            name="view_deltas"
+        ).data(list(batch.items()))
+
+        stmt = (
+            update(Announcement)
+            .where(Announcement.id == deltas.c.id)
+            .values(view_count=Announcement.view_count + deltas.c.delta)
+            .execution_options(synchronize_session=False)
+        )
+
+        try:
+            async with async_session_maker() as session:
+                await session.execute(stmt)
+                await session.commit()
+        except Exception:
+            # Reintroducem numărătorile pentru a nu pierde vizualizările
+            for announcement_id, delta in batch.items():
+                self._pending[announcement_id] = self._pending.get(announcement_id, 0) + delta
+            raise
+
+        total = sum(batch.values())
+        logger.debug(f"Scrise {total} vizualizări pentru {len(batch)} anunțuri")
+        return total
+
+    def _prune_seen(self):
+        """Elimină intrările de deduplicare expirate (sunt în ordinea inserării)"""
+        now = time.monotonic()
+        while self._seen:
+            key, expires_at = next(iter(self._seen.items()))
+            if expires_at > now:
+                break
+            self._seen.popitem(last=False)
+
+    async def start(self):
+        await self._task.start()
+
+    async def stop(self):
+        await self._task.stop()
+
+
+# Instanța globală per worker
+announcement_view_counter = background_services.register(
+    AnnouncementViewCounter(
+        flush_interval=settings.ANNOUNCEMENT_VIEWS_FLUSH_INTERVAL,
+        dedup_window=settings.ANNOUNCEMENT_VIEWS_DEDUP_WINDOW
+    )
+)
@@ -0,0 +1,167 @@
+"""
+Registrul șabloanelor documentelor oficiale (Jinja2)
+
+Șabloanele sunt căutate, în ordine, în:
+  1. înlocuirile din DB (tabelul document_templates, setate de services/document_template_service.py)
+  2. DOCUMENT_TEMPLATE_DIR, dacă este configurat (fișiere modificate fără deploy)
+  3. app/templates/documents (șabloanele livrate cu aplicația)
+
+Toate au la bază base.html; CSS-ul comun este în documents.css și se trimite
+separat la randarea PDF. Șabloanele sunt modificabile din administrare, deci
+rulează într-un mediu sandbox (fără acces la atribute interne, de ex.
+__globals__ sau __subclasses__), iar accesul la atribute "_..." este respins
+încă de la salvare. Mediul Jinja este creat o singură dată per proces,
+șabloanele compilate sunt păstrate în memorie, iar bytecode-ul pe disc, așa că
+un worker nou nu mai recompilează șabloanele neschimbate.
+"""
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import jinja2
+from jinja2 import nodes
+from jinja2.sandbox import ImmutableSandboxedEnvironment
+
+BUILTIN_DIR = Path(__file__).resolve().parent.parent / "templates" / "documents"
+STYLESHEET = "documents.css"
+FALLBACK_TEMPLATE = "generic.html"
+
+# Conținutul și momentul modificării unui șablon din DB
+Override = Tuple[str, datetime]
+
+
+class _OverrideLoader(jinja2.BaseLoader):
+    """Șabloanele din DB; o versiune nouă a setului invalidează șabloanele compilate din el"""
+
+    def __init__(self):
+        self.overrides: Mapping[str, Override] = {}
+        self.version = 0
+
+    def get_source(self, environment: jinja2.Environment, template: str) -> Tuple[str, Optional[str], Callable[[], bool]]:
+        override = self.overrides.get(template)
+        if override is None:
+            raise jinja2.TemplateNotFound(template)
+        version = self.version
+        return override[0], f"db:{template}", lambda: self.version == version
+
+    def list_templates(self) -> List[str]:
+        return sorted(self.overrides)
+
+
+class DocumentTemplateRegistry:
+    """Mediul Jinja al documentelor oficiale, partajat de toate cererile procesului"""
+
+    def __init__(
+        self,
+        template_dir: Optional[str] = None,
+        bytecode_cache_dir: Optional[str] = None,
+        auto_reload: bool = True
+    ):
+        self._overrides = _OverrideLoader()
+        loaders: List[jinja2.BaseLoader] = [self._overrides]
+        if template_dir:
+            loaders.append(jinja2.FileSystemLoader(template_dir))
+        loaders.append(jinja2.FileSystemLoader(str(BUILTIN_DIR)))
+
+        cache_dir = Path(bytecode_cache_dir or Path(tempfile.gettempdir()) / "document-templates")
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.env = ImmutableSandboxedEnvironment(
+            loader=jinja2.ChoiceLoader(loaders),
+            bytecode_cache=jinja2.FileSystemBytecodeCache(str(cache_dir)),
+            autoescape=jinja2.select_autoescape(["html", "xml"]),
+            # Cu auto_reload, fișierele modificate pe disc se recompilează la următoarea randare
+            auto_reload=auto_reload,
+            cache_size=400,
+            trim_blocks=True,
+            lstrip_blocks=True
+        )
+        self._lock = threading.Lock()
+        self._stylesheet: Optional[Tuple[str, Callable[[], bool]]] = None
+
+    def set_overrides(self, overrides: Mapping[str, Override]):
+        """Înlocuiește setul de șabloane din DB (apelat la fiecare versiune nouă a instantaneului)"""
+        with self._lock:
+            if overrides is self._overrides.overrides:
+                return
+            self._overrides.overrides = overrides
+            self._overrides.version += 1
+            # Un șablon din DB poate umbri unul de pe disc deja compilat
+            if self.env.cache is not None:
+                self.env.cache.clear()
+            self._stylesheet = None
+
+    def template_name(self, document_type: str) -> str:
+        return f"{document_type}.html"
+
+    def names(self) -> List[str]:
+        """Șabloanele disponibile (fără layout și componente)"""
+        return [
+            name for name in self.env.list_templates(extensions=["html"])
+            if name != "base.html" and not name.startswith("_")
+        ]
+
+    def source(self, name: str) -> Tuple[str, str]:
+        """Sursa unui șablon și originea ei (db, director configurat sau aplicație)"""
+        source, filename, _ = self.env.loader.get_source(self.env, name)
+        if filename and filename.startswith("db:"):
+            return source, "db"
+        if filename and Path(filename).resolve().is_relative_to(BUILTIN_DIR):
+            return source, "builtin"
+        return source, "disk"
+
+    def stylesheet(self) -> str:
+        """CSS-ul comun, recitit doar când sursa lui s-a schimbat"""
+        cached = self._stylesheet
+        if cached is not None and (not self.env.auto_reload or cached[1]()):
+            return cached[0]
+        source, _, uptodate = self.env.loader.get_source(self.env, STYLESHEET)
+        self._stylesheet = (source, uptodate or (lambda: True))
+        return source
+
+    def validate(self, name: str, source: str) -> Optional[str]:
+        """Eroarea de sintaxă a unui șablon nou sau None (înainte de salvarea în DB)"""
+        if name.endswith(".css"):
+            return None
+        try:
+            ast = self.env.parse(source, name=name)
+        except jinja2.TemplateSyntaxError as e:
+            return f"Linia {e.lineno}: {e.message}"
+        # Sandbox-ul blochează oricum accesul la randare; aici eroarea apare la salvare
+        for node in ast.find_all((nodes.Getattr, nodes.Getitem)):
+            attribute = node.attr if isinstance(node, nodes.Getattr) else getattr(node.arg, "value", None)
+            if isinstance(attribute, str) and attribute.startswith("_"):
+                return f"Linia {node.lineno}: accesul la atributul '{attribute}' nu este permis"
+        return None
+
+    def precompile(self) -> Dict[str, float]:
+        """Compilează toate șabloanele (la pornire); returnează durata per șablon în ms"""
+        durations = {}
+        for name in self.names():
+            started = time.perf_counter()
+            self.env.get_template(name)
+            durations[name] = round((time.perf_counter() - started) * 1000, 3)
+        return durations
+
+    def render(
+        self,
+        document_type: str,
+        data: Dict[str, Any],
+        municipality_config: Mapping[str, Any],
+        inline_css: bool = False
+    ) -> str:
+        """
+        HTML-ul documentului; cu inline_css foaia de stil este inclusă în
+        pagină (previzualizare), altfel se trimite separat la randarea PDF.
+        """
+        template = self.env.select_template([self.template_name(document_type), FALLBACK_TEMPLATE])
+        return template.render(
+            data=data,
+            form=data.get("submission_data") or {},
+            municipality=municipality_config,
+            current_date=datetime.now().strftime("%d.%m.%Y"),
+            stylesheet=self.stylesheet() if inline_css else None
+        )
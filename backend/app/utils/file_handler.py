@@ -3,12 +3,18 @@ Utilități pentru gestionarea upload-ului de fișiere
 """
 import os
 import uuid
+import hashlib
 import mimetypes
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple, Union
 from fastapi import UploadFile
 import aiofiles
+import aiofiles.os
 from pathlib import Path
 
+from ..core.config import get_settings
+
+settings = get_settings()
+
 
 # Configurări pentru tipurile de fișiere acceptate
 FILE_CONFIGS = {
@@ -38,6 +44,65 @@ UPLOAD_DIRS = {
 }
 
 
+class FileTooLargeError(ValueError):
+    """Fișierul a depășit dimensiunea maximă în timpul upload-ului"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"Fișierul depășește dimensiunea maximă de {max_bytes // (1024 * 1024)}MB")
+
+
+async def stream_upload_to_path(
+    file: UploadFile,
+    dest_path: Union[str, Path],
+    max_bytes: int,
+    chunk_size: int = None
+) -> Tuple[int, str]:
+    """
+    Copiază un fișier uploadat pe disc în bucăți, fără a-l ține în memorie
+    
+    Conținutul este scris într-un fișier temporar din același director, iar
+    SHA-256 este calculat în timpul copierii. La depășirea limitei copierea se
+    oprește imediat și fișierul temporar este șters. Doar un fișier complet
+    ajunge la dest_path (redenumire atomică).
+    
+    Args:
+        file: Fișierul uploadat
+        dest_path: Calea finală
+        max_bytes: Dimensiunea maximă permisă
+        chunk_size: Dimensiunea unei bucăți (implicit UPLOAD_CHUNK_SIZE)
+    
+    Returns:
+        Tuple (dimensiune în octeți, hash SHA-256 hex)
+    """
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    dest_path = str(dest_path)
+    temp_path = f"{dest_path}.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(temp_path, 'wb') as out:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise FileTooLargeError(max_bytes)
+                digest.update(chunk)
+                await out.write(chunk)
+        await aiofiles.os.replace(temp_path, dest_path)
+    except BaseException:
+        try:
+            await aiofiles.os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    return size, digest.hexdigest()
+
+
 def validate_file(file: UploadFile, file_type: str = "document") -> Dict[str, Any]:
     """
     Validează un fișier înainte de upload
@@ -98,31 +163,23 @@ async def save_uploaded_file(file: UploadFile, file_type: str = "document") -> D
     Returns:
         Dict cu informațiile fișierului salvat
     """
+    # Import local: blob_store folosește stream_upload_to_path din acest modul
+    from ..services.blob_store import blob_store
+    
     if file_type not in UPLOAD_DIRS:
         raise ValueError(f"Tip de fișier necunoscut: {file_type}")
     
     config = FILE_CONFIGS[file_type]
-    upload_dir = UPLOAD_DIRS[file_type]
     
-    # Creează directorul dacă nu există
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Generează numele fișierului
-    file_extension = Path(file.filename).suffix.lower()
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(upload_dir, unique_filename)
-    
-    # Verifică dimensiunea în timpul citirii
-    content = await file.read()
-    file_size = len(content)
+    # Fișierul este stocat după conținut, fără referințe: referința se adaugă
+    # la trimiterea cererii/sesizării care îl atașează
     max_size_bytes = config["max_size_mb"] * 1024 * 1024
-    
-    if file_size > max_size_bytes:
-        raise ValueError(f"Fișierul depășește dimensiunea maximă de {config['max_size_mb']}MB")
-    
-    # Salvează fișierul
-    async with aiofiles.open(file_path, 'wb') as f:
-        await f.write(content)
+    stored = await blob_store.store(
+        file,
+        max_size_bytes,
+        extension=Path(file.filename).suffix.lower(),
+        mime_type=file.content_type
+    )
     
     # Detectează tipul MIME dacă nu este specificat corect
     detected_mime_type, _ = mimetypes.guess_type(file.filename)
@@ -132,10 +189,11 @@ async def save_uploaded_file(file: UploadFile, file_type: str = "document") -> D
         mime_type = file.content_type
     
     return {
-        "filename": unique_filename,
+        "filename": Path(stored.storage_path).name,
         "original_filename": file.filename,
-        "file_path": file_path,
-        "file_size": file_size,
+        "file_path": stored.storage_path,
+        "file_size": stored.size,
+        "file_hash": stored.sha256,
         "mime_type": mime_type,
         "upload_id": str(uuid.uuid4())
     }
@@ -222,34 +280,34 @@ def cleanup_old_files(days: int = 30) -> List[str]:
     return deleted_files
 
 
-def get_upload_stats() -> Dict[str, Any]:
+async def get_upload_stats() -> Dict[str, Any]:
     """
-    Obține statistici despre fișierele uploadate
+    Obține statistici despre fișierele uploadate (din manifestul de stocare,
+    după extensiile acceptate pentru fiecare tip; thumbnail-urile nu se numără)
     
     Returns:
         Dict cu statisticile
     """
+    # Import local: serviciile de stocare depind de acest modul
+    from ..core.database import async_session_maker
+    from ..models.documents import StorageUsage
+    from sqlalchemy import select
+    
+    async with async_session_maker() as db:
+        rows = (await db.execute(
+            select(StorageUsage).where(StorageUsage.subfolder != "thumbnails")
+        )).scalars().all()
+    
     stats = {
         "total_files": 0,
         "total_size_mb": 0,
         "by_type": {}
     }
     
-    for file_type, upload_dir in UPLOAD_DIRS.items():
-        if not os.path.exists(upload_dir):
-            stats["by_type"][file_type] = {"count": 0, "size_mb": 0}
-            continue
-        
-        type_count = 0
-        type_size = 0
-        
-        for filename in os.listdir(upload_dir):
-            file_path = os.path.join(upload_dir, filename)
-            
-            if os.path.isfile(file_path):
-                file_stat = os.stat(file_path)
-                type_count += 1
-                type_size += file_stat.st_size
+    for file_type, config in FILE_CONFIGS.items():
+        type_rows = [row for row in rows if row.extension in config["extensions"]]
+        type_count = sum(row.files_count for row in type_rows)
+        type_size = sum(row.total_size for row in type_rows)
         
         stats["by_type"][file_type] = {
             "count": type_count,
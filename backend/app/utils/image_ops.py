@@ -0,0 +1,119 @@
+"""
+Operații pe imagini rulate în procesele din pool (vezi services/image_service.py)
+
+Funcțiile sunt sincrone, la nivel de modul și primesc doar căi și tupluri,
+ca să poată fi trimise altui proces. Modulul importă doar PIL, deci pornirea
+unui proces nou nu încarcă restul aplicației.
+"""
+import hashlib
+import os
+import time
+import uuid
+from typing import Any, Dict, Tuple
+
+from PIL import Image
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def generate_thumbnail(image_path: str, thumbnail_path: str, size: Tuple[int, int]) -> Dict[str, Any]:
+    """Generează thumbnail-ul JPEG; fișierul apare atomic (scris într-un temporar)"""
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+    temp_path = f"{thumbnail_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with Image.open(image_path) as img:
+            # Convertește la RGB dacă e necesar
+            if img.mode in ('RGBA', 'P'):
+                img = img.convert('RGB')
+            
+            # Redimensionează păstrând proporțiile
+            img.thumbnail(size, Image.Resampling.LANCZOS)
+            img.save(temp_path, 'JPEG', quality=85, optimize=True)
+        os.replace(temp_path, thumbnail_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return {"thumbnail_ms": _elapsed_ms(started)}
+
+
+def image_dimensions(image_path: str) -> Tuple[int, int]:
+    """Dimensiunile imaginii, citite doar din antet (fără decodare)"""
+    with Image.open(image_path) as img:
+        return img.size
+
+
+def optimize_image(image_path: str, output_path: str, max_size: Tuple[int, int]) -> Dict[str, Any]:
+    """
+    Scrie în `output_path` imaginea redimensionată, dacă depășește `max_size`, în
+    formatul originalului (extensia și tipul MIME rămân valide). Originalul nu
+    este modificat; hash-ul și dimensiunea rezultatului sunt returnate, ca fișierul
+    să fie înregistrat după conținutul final.
+    """
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"resized": False}
+    temp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with Image.open(image_path) as img:
+            result["original_size"] = list(img.size)
+            image_format = img.format
+            # Animațiile nu se redimensionează (s-ar pierde cadrele)
+            if getattr(img, "n_frames", 1) == 1 and (img.size[0] > max_size[0] or img.size[1] > max_size[1]):
+                img.thumbnail(max_size, Image.Resampling.LANCZOS)
+                if image_format == "JPEG":
+                    img.save(temp_path, "JPEG", quality=90, optimize=True)
+                elif image_format in ("PNG", "WEBP"):
+                    img.save(temp_path, image_format, optimize=True, quality=90)
+                else:
+                    img.save(temp_path, image_format)
+                result["resized"] = True
+        if result["resized"]:
+            os.replace(temp_path, output_path)
+            digest = hashlib.sha256()
+            with open(output_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            result["sha256"] = digest.hexdigest()
+            result["size"] = os.path.getsize(output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    result["optimize_ms"] = _elapsed_ms(started)
+    return result
+
+
+def render_variant(image_path: str, variant_path: str, width: int, image_format: str, quality: int) -> Dict[str, Any]:
+    """
+    Varianta redimensionată la `width` px lățime (fără mărire), în formatul cerut.
+    Scrisă într-un temporar și redenumită, ca cititorii să vadă doar fișiere complete.
+    """
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(variant_path), exist_ok=True)
+    temp_path = f"{variant_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with Image.open(image_path) as img:
+            img.draft("RGB", (width, width * img.height // max(img.width, 1)))  # decodare JPEG redusă
+            if img.width > width:
+                img.thumbnail((width, img.height), Image.Resampling.LANCZOS)
+            
+            if image_format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            elif img.mode == "P":
+                img = img.convert("RGBA")
+            
+            if image_format == "WEBP":
+                img.save(temp_path, "WEBP", quality=quality, method=4)
+            else:
+                img.save(temp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+            output_size = img.size
+        os.replace(temp_path, variant_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return {
+        "render_ms": _elapsed_ms(started),
+        "size": list(output_size),
+        "bytes": os.path.getsize(variant_path)
+    }
@@ -0,0 +1,174 @@
+"""
+Randarea PDF-urilor (WeasyPrint) în procesele din pool (vezi services/pdf_service.py)
+
+Fiecare proces încarcă o singură dată, la pornire, configurația de fonturi și
+foaia de stil de bază, apoi randează un document mic, ca fontconfig/pango să
+aibă fonturile deja încărcate la prima cerere reală. Foile de stil ale
+șabloanelor sunt parsate o dată per proces și păstrate după conținut, așa că
+același tip de document randat de mii de ori parsează CSS-ul o singură dată.
+
+Șabloanele și foaia de stil pot fi editate din administrare, deci resursele
+referite (imagini, fonturi, atașamente) se încarcă doar ca data: sau din
+directorul de fonturi și din UPLOAD_DIR; orice altă adresă (file:///etc/...,
+http://) este refuzată.
+"""
+import hashlib
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+# Foaia de stil comună tuturor documentelor oficiale
+BASE_CSS = """
+@page { size: A4; margin: 18mm 16mm; }
+html { font-family: "DejaVu Serif", "Times New Roman", serif; }
+"""
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".woff", ".woff2")
+MAX_CACHED_STYLESHEETS = 64
+
+_STYLE_RE = re.compile(r"<style[^>]*>(.*?)</style>", re.IGNORECASE | re.DOTALL)
+
+# Starea procesului, creată de init_worker
+_font_config = None
+_base_stylesheets: List[Any] = []
+_stylesheets: "OrderedDict[str, Any]" = OrderedDict()
+_base_url: Optional[str] = None
+_allowed_roots: Tuple[str, ...] = ()
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def font_face_rules(font_dir: Optional[str]) -> str:
+    """Reguli @font-face pentru fonturile din `font_dir` (familia din numele fișierului: Familie-Bold.ttf)"""
+    if not font_dir or not os.path.isdir(font_dir):
+        return ""
+    rules = []
+    for path in sorted(Path(font_dir).iterdir()):
+        if path.suffix.lower() not in FONT_EXTENSIONS:
+            continue
+        family, _, variant = path.stem.partition("-")
+        variant = variant.lower()
+        weight = "bold" if "bold" in variant else "normal"
+        style = "italic" if ("italic" in variant or "oblique" in variant) else "normal"
+        rules.append(
+            f'@font-face {{ font-family: "{family}"; src: url("{path.resolve().as_uri()}"); '
+            f"font-weight: {weight}; font-style: {style}; }}"
+        )
+    return "\n".join(rules)
+
+
+def _is_allowed_file(url: str) -> bool:
+    parsed = urlparse(url)
+    if parsed.scheme != "file" or parsed.netloc not in ("", "localhost"):
+        return False
+    path = os.path.realpath(unquote(parsed.path))
+    return any(path == root or path.startswith(root + os.sep) for root in _allowed_roots)
+
+
+def url_fetcher(url: str, *args, **kwargs) -> Dict[str, Any]:
+    """Încarcă doar data: și fișierele din directoarele permise (fonturi, UPLOAD_DIR)"""
+    from weasyprint.urls import default_url_fetcher
+
+    if url.startswith("data:") or _is_allowed_file(url):
+        return default_url_fetcher(url, *args, **kwargs)
+    # WeasyPrint înregistrează eroarea și randează documentul fără resursă
+    raise ValueError(f"Resursă nepermisă în document: {url[:200]}")
+
+
+def init_worker(font_dir: Optional[str] = None, base_url: Optional[str] = None):
+    """Inițializatorul procesului: fonturi, foaia de stil de bază și o randare de încălzire"""
+    # Importat aici: procesul API nu încarcă WeasyPrint/pango, doar procesele din pool
+    from weasyprint import CSS, HTML
+    from weasyprint.text.fonts import FontConfiguration
+
+    global _font_config, _base_stylesheets, _base_url, _allowed_roots
+    _base_url = base_url
+    _allowed_roots = tuple(os.path.realpath(root) for root in (font_dir, base_url) if root)
+    _font_config = FontConfiguration()
+    _base_stylesheets = [
+        CSS(string=font_face_rules(font_dir) + BASE_CSS, font_config=_font_config, url_fetcher=url_fetcher)
+    ]
+    HTML(string="<p>Ă Â Î Ș Ț ă â î ș ț</p>", url_fetcher=url_fetcher).write_pdf(
+        stylesheets=_base_stylesheets, font_config=_font_config
+    )
+
+
+def _split_styles(html: str) -> Tuple[str, str]:
+    """Separă CSS-ul din <style> de restul documentului"""
+    css = "\n".join(match.group(1) for match in _STYLE_RE.finditer(html))
+    return _STYLE_RE.sub("", html), css
+
+
+def _stylesheet(css: str) -> Tuple[Any, bool]:
+    """Foaia de stil parsată, din cache-ul procesului (LRU după conținut)"""
+    from weasyprint import CSS
+
+    key = hashlib.sha1(css.encode("utf-8")).hexdigest()
+    stylesheet = _stylesheets.get(key)
+    if stylesheet is not None:
+        _stylesheets.move_to_end(key)
+        return stylesheet, True
+    stylesheet = CSS(string=css, font_config=_font_config, base_url=_base_url, url_fetcher=url_fetcher)
+    _stylesheets[key] = stylesheet
+    if len(_stylesheets) > MAX_CACHED_STYLESHEETS:
+        _stylesheets.popitem(last=False)
+    return stylesheet, False
+
+
+def _prepare(html: str, css: Optional[str]) -> Tuple[Any, List[Any], bool]:
+    """Documentul WeasyPrint și foile de stil (cea a șablonului din cache-ul procesului)"""
+    from weasyprint import HTML
+
+    if _font_config is None:
+        # Apel în afara pool-ului (scripturi, generare sincronă)
+        init_worker()
+
+    if css is None:
+        body, css = _split_styles(html)
+    else:
+        body = html
+    stylesheets = list(_base_stylesheets)
+    stylesheet_cached = True
+    if css.strip():
+        stylesheet, stylesheet_cached = _stylesheet(css)
+        stylesheets.append(stylesheet)
+    return HTML(string=body, base_url=_base_url, url_fetcher=url_fetcher), stylesheets, stylesheet_cached
+
+
+def _write_atomic(pdf: bytes, output_path: str):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    temp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(pdf)
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def render_pdf(html: str, output_path: str, css: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Randează `html` în `output_path`; fișierul apare atomic (scris într-un temporar).
+    Foaia de stil vine din `css` sau, fără el, din blocurile <style> ale documentului.
+    Returnează dimensiunea, hash-ul SHA-256 al conținutului și durata.
+    """
+    started = time.perf_counter()
+    document, stylesheets, stylesheet_cached = _prepare(html, css)
+    pdf = document.write_pdf(stylesheets=stylesheets, font_config=_font_config)
+    _write_atomic(pdf, output_path)
+
+    return {
+        "size": len(pdf),
+        "sha256": hashlib.sha256(pdf).hexdigest(),
+        "render_ms": _elapsed_ms(started),
+        "stylesheet_cached": stylesheet_cached
+    }
+
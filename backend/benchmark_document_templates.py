@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark pentru șabloanele documentelor oficiale
+Rulare: python benchmark_document_templates.py [--iterations 2000] [--pdf 20]
+
+Măsoară compilarea șabloanelor (fără și cu bytecode pe disc), costul randării
+HTML per document și, cu --pdf, randarea PDF (prima, cu încărcarea fonturilor,
+și următoarele, cu foaia de stil din cache).
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adaugă calea către modulele aplicației
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.utils.document_templates import DocumentTemplateRegistry
+
+MUNICIPALITY = {
+    "name": "comunei Exemplu",
+    "official_name": "PRIMĂRIA COMUNEI EXEMPLU",
+    "address": "Str. Principală nr. 1",
+    "contact_phone": "0256 123 456",
+    "contact_email": "contact@primarie.ro",
+    "mayor_name": "Ion Popescu",
+    "website_url": "www.primarie.ro"
+}
+
+SUBMISSION = {
+    "reference_number": "CU-2024-000123",
+    "citizen_name": "Maria Ionescu",
+    "citizen_cnp": "2850101123456",
+    "citizen_email": "maria@example.ro",
+    "citizen_address": "Str. Florilor nr. 5",
+    "status": "approved",
+    "submitted_at": "2024-05-02T10:00:00",
+    "form_type_name": "Certificat de urbanism",
+    "submission_data": {
+        "property_address": "Str. Florilor nr. 5",
+        "property_cadastral": "401234",
+        "property_area": 650,
+        "construction_type": "Locuință P+1",
+        "building_area": 140,
+        "certificate_purpose": "Vânzare imobil",
+        "address": "Str. Florilor nr. 5",
+        "residence_type": "proprietar",
+        "purpose": "Bancă"
+    }
+}
+
+
+def print_header(title):
+    print(f"\n{'='*60}")
+    print(f"📄 {title}")
+    print(f"{'='*60}")
+
+
+def compile_all(cache_dir: str) -> float:
+    registry = DocumentTemplateRegistry(bytecode_cache_dir=cache_dir)
+    started = time.perf_counter()
+    registry.precompile()
+    return (time.perf_counter() - started) * 1000
+
+
+def bench_render(registry: DocumentTemplateRegistry, iterations: int):
+    print(f"{'șablon':<32} {'µs/doc':>10} {'p95 µs':>10} {'octeți':>8}")
+    for name in registry.names():
+        document_type = name[:-len(".html")]
+        registry.render(document_type, SUBMISSION, MUNICIPALITY)
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            html = registry.render(document_type, SUBMISSION, MUNICIPALITY)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        timings.sort()
+        print(
+            f"{name:<32} {statistics.mean(timings):>10.1f} "
+            f"{timings[int(len(timings) * 0.95)]:>10.1f} {len(html):>8}"
+        )
+
+
+def bench_pdf(registry: DocumentTemplateRegistry, count: int):
+    from app.utils.pdf_render import render_pdf
+
+    css = registry.stylesheet()
+    html = registry.render("certificat-urbanism", SUBMISSION, MUNICIPALITY)
+    with tempfile.TemporaryDirectory() as output_dir:
+        started = time.perf_counter()
+        first = render_pdf(html, f"{output_dir}/first.pdf", css)
+        print(f"Primul PDF (cu încărcarea fonturilor): {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        timings = [render_pdf(html, f"{output_dir}/{i}.pdf", css)["render_ms"] for i in range(count)]
+        print(f"Următoarele {count} PDF-uri: medie {statistics.mean(timings):.1f} ms, "
+              f"max {max(timings):.1f} ms, {first['size']} octeți")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="randări HTML per șablon")
+    parser.add_argument("--pdf", type=int, default=0, help="numărul de PDF-uri randate (necesită WeasyPrint)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        print_header("Compilarea șabloanelor")
+        print(f"Fără bytecode pe disc: {compile_all(cache_dir):.1f} ms")
+        print(f"Cu bytecode pe disc (worker nou): {compile_all(cache_dir):.1f} ms")
+
+        registry = DocumentTemplateRegistry(bytecode_cache_dir=cache_dir)
+        registry.precompile()
+
+        print_header(f"Randare HTML ({args.iterations} documente per șablon)")
+        bench_render(registry, args.iterations)
+
+        if args.pdf:
+            print_header(f"Randare PDF ({args.pdf} documente)")
+            bench_pdf(registry, args.pdf)
+
+
+if __name__ == "__main__":
+    main()
@@ -220,6 +220,96 @@ async def create_database_schema():
         """)
         print("✅ Created mol_documents table")
         
+        # Create content-addressed file storage table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS stored_blobs (
+                sha256 VARCHAR(64) PRIMARY KEY,
+                storage_path VARCHAR(500) UNIQUE NOT NULL,
+                size INTEGER NOT NULL,
+                mime_type VARCHAR(100),
+                ref_count INTEGER DEFAULT 0 NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+                last_referenced_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+            )
+        """)
+        print("✅ Created stored_blobs table")
+        
+        # Create storage manifest tables
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS storage_manifest (
+                path VARCHAR(500) PRIMARY KEY,
+                subfolder VARCHAR(100) NOT NULL,
+                extension VARCHAR(20) DEFAULT '' NOT NULL,
+                size BIGINT NOT NULL,
+                mime_type VARCHAR(100),
+                sha256 VARCHAR(64),
+                owner_type VARCHAR(50),
+                owner_id VARCHAR(100),
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+            )
+        """)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS storage_usage (
+                subfolder VARCHAR(100) NOT NULL,
+                extension VARCHAR(20) NOT NULL,
+                files_count BIGINT DEFAULT 0 NOT NULL,
+                total_size BIGINT DEFAULT 0 NOT NULL,
+                PRIMARY KEY (subfolder, extension)
+            )
+        """)
+        print("✅ Created storage_manifest and storage_usage tables")
+        
+        # Create background jobs table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS background_jobs (
+                id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+                kind VARCHAR(100) NOT NULL,
+                payload JSONB NOT NULL,
+                status VARCHAR(20) DEFAULT 'pending' NOT NULL,
+                attempts INTEGER DEFAULT 0 NOT NULL,
+                result JSONB,
+                error TEXT,
+                progress JSONB,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+                started_at TIMESTAMP WITH TIME ZONE,
+                heartbeat_at TIMESTAMP WITH TIME ZONE,
+                finished_at TIMESTAMP WITH TIME ZONE,
+                duration_ms DOUBLE PRECISION
+            )
+        """)
+        print("✅ Created background_jobs table")
+        
+        # Create resumable uploads table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS resumable_uploads (
+                id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+                filename VARCHAR(255) NOT NULL,
+                mime_type VARCHAR(100) NOT NULL,
+                total_size BIGINT NOT NULL,
+                status VARCHAR(20) DEFAULT 'uploading' NOT NULL,
+                storage_path VARCHAR(500),
+                sha256 VARCHAR(64),
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+                expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                completed_at TIMESTAMP WITH TIME ZONE
+            )
+        """)
+        print("✅ Created resumable_uploads table")
+        
+        # Create document templates table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS document_templates (
+                id SERIAL PRIMARY KEY,
+                name VARCHAR(100) UNIQUE NOT NULL,
+                content TEXT NOT NULL,
+                is_active BOOLEAN DEFAULT TRUE NOT NULL,
+                updated_by UUID REFERENCES admin_users(id),
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+            )
+        """)
+        print("✅ Created document_templates table")
+        
         # Create form types table
         await conn.execute("""
             CREATE TABLE IF NOT EXISTS form_types (
@@ -269,6 +359,26 @@ async def create_database_schema():
         """)
         print("✅ Created form_submissions table")
         
+        # Create generated documents table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS generated_documents (
+                id SERIAL PRIMARY KEY,
+                reference_number VARCHAR(50) NOT NULL,
+                version INTEGER NOT NULL,
+                document_type VARCHAR(100) NOT NULL,
+                storage_path VARCHAR(500) UNIQUE NOT NULL,
+                file_name VARCHAR(255) NOT NULL,
+                mime_type VARCHAR(100) DEFAULT 'application/pdf' NOT NULL,
+                file_size BIGINT NOT NULL,
+                sha256 VARCHAR(64) NOT NULL,
+                submission_id UUID REFERENCES form_submissions(id) ON DELETE SET NULL,
+                generated_by UUID REFERENCES admin_users(id),
+                generated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+                CONSTRAINT uq_generated_documents_reference_version UNIQUE (reference_number, version)
+            )
+        """)
+        print("✅ Created generated_documents table")
+        
         # Create attachments table
         await conn.execute("""
             CREATE TABLE IF NOT EXISTS attachments (
@@ -324,7 +434,9 @@ async def create_database_schema():
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_admin_users_email ON admin_users(email)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_admin_users_role ON admin_users(role)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_admin_sessions_user_id ON admin_sessions(user_id)")
-        await conn.execute("CREATE INDEX IF NOT EXISTS idx_admin_sessions_access_token ON admin_sessions(access_token_hash)")
+        await conn.execute("DROP INDEX IF EXISTS idx_admin_sessions_access_token")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_admin_sessions_active_access_token ON admin_sessions(access_token_hash) WHERE is_revoked = FALSE")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_admin_sessions_refresh_expires_at ON admin_sessions(refresh_expires_at)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_admin_sessions_refresh_token ON admin_sessions(refresh_token_hash)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_admin_audit_user_id ON admin_audit_log(user_id)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_admin_audit_action ON admin_audit_log(action)")
@@ -344,6 +456,13 @@ async def create_database_schema():
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_mol_documents_category ON mol_documents(category)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_mol_documents_type ON mol_documents(document_type)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_mol_documents_published_date ON mol_documents(published_date)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_stored_blobs_unreferenced ON stored_blobs(last_referenced_at) WHERE ref_count = 0")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_storage_manifest_size ON storage_manifest(size DESC)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_storage_manifest_owner ON storage_manifest(owner_type, owner_id)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_storage_manifest_sha256 ON storage_manifest(sha256)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_background_jobs_claimable ON background_jobs(created_at) WHERE status IN ('pending', 'running')")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_background_jobs_kind_status ON background_jobs(kind, status)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_resumable_uploads_expires ON resumable_uploads(expires_at)")
         
         # Forms indexes
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_form_types_slug ON form_types(slug)")
@@ -353,6 +472,7 @@ async def create_database_schema():
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_form_submissions_reference ON form_submissions(reference_number)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_form_submissions_citizen_email ON form_submissions(citizen_email)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_form_submissions_created_at ON form_submissions(created_at)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_generated_documents_generated_at ON generated_documents(generated_at)")
         
         # Search and analytics indexes
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_search_content_type ON search_index(content_type)")
@@ -46,10 +46,11 @@ async def migrate_admin_sessions():
         print("Created new admin_sessions table with JWT support")
         
         # Creează indexuri
-        await conn.execute("CREATE INDEX idx_admin_sessions_access_token_hash ON admin_sessions(access_token_hash)")
+        await conn.execute("CREATE INDEX idx_admin_sessions_active_access_token ON admin_sessions(access_token_hash) WHERE is_revoked = FALSE")
         await conn.execute("CREATE INDEX idx_admin_sessions_refresh_token_hash ON admin_sessions(refresh_token_hash)")
         await conn.execute("CREATE INDEX idx_admin_sessions_user_id ON admin_sessions(user_id)")
         await conn.execute("CREATE INDEX idx_admin_sessions_expires_at ON admin_sessions(access_expires_at)")
+        await conn.execute("CREATE INDEX idx_admin_sessions_refresh_expires_at ON admin_sessions(refresh_expires_at)")
         print("Created indexes for admin_sessions table")
         
         print("Migration completed successfully!")
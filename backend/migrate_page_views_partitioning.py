@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Migration script pentru partiționarea lunară a tabelei page_views
+și crearea tabelei de agregate zilnice page_view_daily_stats
+"""
+import asyncio
+import sys
+from datetime import date, timedelta
+
+import asyncpg
+from app.core.config import get_settings
+
+settings = get_settings()
+
+MONTHS_AHEAD = 2
+
+
+def next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+async def migrate_page_views(drop_legacy: bool = False):
+    """Convertește page_views într-o tabelă partiționată după view_date"""
+
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+
+    try:
+        print("Starting migration for page_views table...")
+
+        already_partitioned = await conn.fetchval(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass('page_views'))"
+        )
+        if already_partitioned:
+            print("page_views is already partitioned, nothing to do")
+            return
+
+        async with conn.transaction():
+            has_legacy = await conn.fetchval("SELECT to_regclass('page_views') IS NOT NULL")
+            if has_legacy:
+                await conn.execute("ALTER TABLE page_views RENAME TO page_views_legacy")
+                await conn.execute("ALTER INDEX IF EXISTS idx_page_views_date RENAME TO idx_page_views_legacy_date")
+                await conn.execute("ALTER INDEX IF EXISTS idx_page_views_url RENAME TO idx_page_views_legacy_url")
+                print("Renamed old page_views table to page_views_legacy")
+
+            await conn.execute("""
+            CREATE TABLE page_views (
+                id SERIAL,
+                page_url VARCHAR(500) NOT NULL,
+                page_title VARCHAR(255),
+                visitor_ip INET,
+                user_agent TEXT,
+                referrer VARCHAR(500),
+                session_id VARCHAR(255),
+                view_date DATE NOT NULL,
+                view_time TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+                PRIMARY KEY (id, view_date)
+            ) PARTITION BY RANGE (view_date)
+            """)
+            await conn.execute("CREATE INDEX idx_page_views_date ON page_views(view_date)")
+            await conn.execute("CREATE INDEX idx_page_views_url ON page_views(page_url)")
+            print("Created partitioned page_views table")
+
+            # Partiții de la cea mai veche vizualizare până la MONTHS_AHEAD luni în viitor
+            first_day = date.today()
+            if has_legacy:
+                first_day = await conn.fetchval("SELECT MIN(view_date) FROM page_views_legacy") or first_day
+
+            month = first_day.replace(day=1)
+            last = date.today().replace(day=1)
+            for _ in range(MONTHS_AHEAD):
+                last = next_month(last)
+
+            while month <= last:
+                following = next_month(month)
+                await conn.execute(
+                    f"CREATE TABLE page_views_{month:%Y_%m} PARTITION OF page_views "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+                )
+                print(f"Created partition page_views_{month:%Y_%m}")
+                month = following
+
+            await conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_view_daily_stats (
+                view_date DATE NOT NULL,
+                page_url VARCHAR(500) NOT NULL,
+                views INTEGER DEFAULT 0 NOT NULL,
+                sampled_views INTEGER DEFAULT 0 NOT NULL,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+                PRIMARY KEY (view_date, page_url)
+            )
+            """)
+            print("Created page_view_daily_stats table")
+
+            if has_legacy:
+                copied = await conn.execute("""
+                INSERT INTO page_views (page_url, page_title, visitor_ip, user_agent,
+                                        referrer, session_id, view_date, view_time)
+                SELECT page_url, page_title, visitor_ip::inet, user_agent,
+                       referrer, session_id, view_date, COALESCE(view_time, view_date::timestamptz)
+                FROM page_views_legacy
+                """)
+                print(f"Copied legacy rows: {copied}")
+
+                await conn.execute("""
+                INSERT INTO page_view_daily_stats (view_date, page_url, views, sampled_views)
+                SELECT view_date, page_url, COUNT(*), COUNT(*)
+                FROM page_views_legacy
+                GROUP BY view_date, page_url
+                ON CONFLICT (view_date, page_url) DO UPDATE
+                SET views = EXCLUDED.views, sampled_views = EXCLUDED.sampled_views
+                """)
+                print("Backfilled daily aggregates from legacy rows")
+
+                if drop_legacy:
+                    await conn.execute("DROP TABLE page_views_legacy")
+                    print("Dropped page_views_legacy")
+                else:
+                    print("Kept page_views_legacy (run with --drop-legacy to remove it)")
+
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        raise
+    finally:
+        await conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_page_views(drop_legacy="--drop-legacy" in sys.argv))
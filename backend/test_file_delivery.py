@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Teste pentru livrarea fișierelor: Range, cereri condiționate și contorizare
+Rulare: python test_file_delivery.py (sau pytest test_file_delivery.py)
+"""
+
+import os
+import sys
+from email.utils import formatdate
+from pathlib import Path
+
+# Adaugă calea către modulele aplicației
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi import HTTPException, Request, Response
+
+from app.core.file_delivery import (
+    _if_range_matches,
+    file_etag,
+    is_new_download,
+    is_not_modified,
+    parse_range,
+)
+
+BROWSER = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120 Safari/537.36"
+STAT = os.stat_result((0o100644, 0, 0, 1, 0, 0, 1000, 1_700_000_000, 1_700_000_000, 1_700_000_000))
+
+
+def make_request(**headers) -> Request:
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def expect_416(header: str, size: int):
+    try:
+        parse_range(header, size)
+    except HTTPException as e:
+        assert e.status_code == 416, header
+        assert e.headers["Content-Range"] == f"bytes */{size}"
+        return
+    raise AssertionError(f"{header} trebuia să dea 416")
+
+
+def test_parse_range():
+    assert parse_range(None, 1000) is None
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=500-", 1000) == (500, 999)
+    # Sfârșitul peste dimensiune este trunchiat
+    assert parse_range("bytes=900-5000", 1000) == (900, 999)
+    # Sufix: ultimii n octeți, cel mult tot fișierul
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=-5000", 1000) == (0, 999)
+    # Nesuportate sau invalide: se servește tot fișierul
+    assert parse_range("bytes=0-10,20-30", 1000) is None
+    assert parse_range("bytes=-", 1000) is None
+    assert parse_range("bytes=50-10", 1000) is None
+    assert parse_range("items=0-10", 1000) is None
+
+
+def test_parse_range_not_satisfiable():
+    expect_416("bytes=1000-", 1000)
+    expect_416("bytes=2000-3000", 1000)
+    expect_416("bytes=-0", 1000)
+
+
+def test_is_not_modified():
+    etag = file_etag(STAT)
+    assert is_not_modified(make_request(if_none_match=etag), etag, STAT)
+    assert not is_not_modified(make_request(if_none_match='"altceva"'), etag, STAT)
+    # If-None-Match are prioritate față de If-Modified-Since
+    later = formatdate(STAT.st_mtime + 3600, usegmt=True)
+    assert not is_not_modified(make_request(if_none_match='"altceva"', if_modified_since=later), etag, STAT)
+    assert is_not_modified(make_request(if_modified_since=later), etag, STAT)
+    earlier = formatdate(STAT.st_mtime - 3600, usegmt=True)
+    assert not is_not_modified(make_request(if_modified_since=earlier), etag, STAT)
+    assert not is_not_modified(make_request(if_modified_since="nu este o dată"), etag, STAT)
+    assert not is_not_modified(make_request(), etag, STAT)
+
+
+def test_if_range():
+    etag = file_etag(STAT)
+    last_modified = formatdate(STAT.st_mtime, usegmt=True)
+    assert _if_range_matches(make_request(), etag, last_modified)
+    assert _if_range_matches(make_request(if_range=etag), etag, last_modified)
+    assert _if_range_matches(make_request(if_range=last_modified), etag, last_modified)
+    # Fișierul s-a schimbat: se trimite tot, nu un interval din versiunea nouă
+    assert not _if_range_matches(make_request(if_range='"vechi"'), etag, last_modified)
+
+
+def test_is_new_download():
+    ok = Response(status_code=200)
+    assert is_new_download(make_request(user_agent=BROWSER), ok)
+    assert is_new_download(make_request(user_agent=BROWSER, range="bytes=0-1023"), Response(status_code=206))
+    # Reluarea unei descărcări și răspunsurile 304 nu se numără
+    assert not is_new_download(make_request(user_agent=BROWSER, range="bytes=1024-"), Response(status_code=206))
+    assert not is_new_download(make_request(user_agent=BROWSER), Response(status_code=304))
+    # Crawlerele (URL-urile din sitemap) și clienții fără User-Agent nu se numără
+    assert not is_new_download(make_request(user_agent="Mozilla/5.0 (compatible; Googlebot/2.1)"), ok)
+    assert not is_new_download(make_request(), ok)
+
+
+def main():
+    failed = 0
+    for test in (
+        test_parse_range,
+        test_parse_range_not_satisfiable,
+        test_is_not_modified,
+        test_if_range,
+        test_is_new_download,
+    ):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Teste pentru antetele upload-urilor reluabile
+Rulare: python test_resumable_uploads.py (sau pytest test_resumable_uploads.py)
+"""
+
+import base64
+import sys
+from pathlib import Path
+
+# Adaugă calea către modulele aplicației
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi import HTTPException
+
+from app.api.endpoints.files import _parse_upload_metadata
+
+
+def b64(value: str) -> str:
+    return base64.b64encode(value.encode("utf-8")).decode("ascii")
+
+
+def test_parse_upload_metadata():
+    header = f"filename {b64('Hotărâre nr. 12.pdf')},filetype {b64('application/pdf')}"
+    assert _parse_upload_metadata(header) == {"filename": "Hotărâre nr. 12.pdf", "filetype": "application/pdf"}
+    # Cheie fără valoare, spații în jurul perechilor, perechi goale
+    assert _parse_upload_metadata(f" is_confidential , filename {b64('a.pdf')},,") == {
+        "is_confidential": "",
+        "filename": "a.pdf"
+    }
+    assert _parse_upload_metadata(None) == {}
+    assert _parse_upload_metadata("") == {}
+
+
+def test_parse_upload_metadata_invalid():
+    not_utf8 = base64.b64encode(b"\xff\xfe").decode("ascii")
+    for header in ("filename !!!nu-e-base64", f"filename {not_utf8}"):
+        try:
+            _parse_upload_metadata(header)
+        except HTTPException as e:
+            assert e.status_code == 400, header
+            continue
+        raise AssertionError(f"{header} trebuia respins")
+
+
+def main():
+    failed = 0
+    for test in (
+        test_parse_upload_metadata,
+        test_parse_upload_metadata_invalid,
+    ):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
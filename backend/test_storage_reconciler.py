@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Teste pentru regulile reconcilierii stocării (fără baza de date)
+Rulare: python test_storage_reconciler.py (sau pytest test_storage_reconciler.py)
+"""
+
+import sys
+from pathlib import Path
+
+# Adaugă calea către modulele aplicației
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.storage_reconciler import StorageReconciler
+
+
+def make_reconciler(**kwargs) -> StorageReconciler:
+    return StorageReconciler(root="/srv/uploads", **kwargs)
+
+
+def test_normalize():
+    reconciler = make_reconciler()
+    assert reconciler.normalize("documents/a.pdf") == "documents/a.pdf"
+    # Înregistrările vechi: prefixul directorului de upload, separatori Windows, spații
+    assert reconciler.normalize("uploads/documents/a.pdf") == "documents/a.pdf"
+    assert reconciler.normalize("/uploads/documents/a.pdf") == "documents/a.pdf"
+    assert reconciler.normalize(" documents\\a.pdf ") == "documents/a.pdf"
+    assert reconciler.normalize("") is None
+    assert reconciler.normalize("   ") is None
+    assert reconciler.normalize(None) is None
+    assert reconciler.normalize(42) is None
+
+
+def test_is_referenced():
+    reconciler = make_reconciler()
+    referenced = {"documents/a.pdf", "blobs/ab/cd/abcd.jpg"}
+    names = {Path(path).name for path in referenced}
+    assert reconciler._is_referenced("documents/a.pdf", referenced, names)
+    assert not reconciler._is_referenced("documents/b.pdf", referenced, names)
+    # Thumbnail-ul rămâne cât timp sursa lui este referită
+    assert reconciler._is_referenced("thumbnails/thumb_abcd.jpg", referenced, names)
+    assert not reconciler._is_referenced("thumbnails/thumb_other.jpg", referenced, names)
+    # Arhivele loturilor au retenție proprie
+    assert reconciler._is_referenced("documents/batches/abc.zip", referenced, names)
+
+
+def test_grace_hours_floor():
+    reconciler = make_reconciler(grace_hours=1, min_grace_hours=24)
+    assert reconciler.grace_hours == 24
+    assert reconciler.effective_grace_hours(0) == 24
+    assert reconciler.effective_grace_hours(72) == 72
+    assert reconciler.effective_grace_hours() == 24
+
+
+def main():
+    failed = 0
+    for test in (
+        test_normalize,
+        test_is_referenced,
+        test_grace_hours_floor,
+    ):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
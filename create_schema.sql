@@ -158,6 +158,87 @@ CREATE TABLE IF NOT EXISTS mol_documents (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
 );
 
+-- Create content-addressed file storage table (deduplicare după SHA-256)
+CREATE TABLE IF NOT EXISTS stored_blobs (
+    sha256 VARCHAR(64) PRIMARY KEY,
+    storage_path VARCHAR(500) UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mime_type VARCHAR(100),
+    ref_count INTEGER DEFAULT 0 NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+    last_referenced_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stored_blobs_unreferenced ON stored_blobs(last_referenced_at) WHERE ref_count = 0;
+
+-- Create storage manifest (fișierele din uploads, fără scanarea discului)
+CREATE TABLE IF NOT EXISTS storage_manifest (
+    path VARCHAR(500) PRIMARY KEY,
+    subfolder VARCHAR(100) NOT NULL,
+    extension VARCHAR(20) DEFAULT '' NOT NULL,
+    size BIGINT NOT NULL,
+    mime_type VARCHAR(100),
+    sha256 VARCHAR(64),
+    owner_type VARCHAR(50),
+    owner_id VARCHAR(100),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_storage_manifest_size ON storage_manifest(size DESC);
+CREATE INDEX IF NOT EXISTS idx_storage_manifest_owner ON storage_manifest(owner_type, owner_id);
+CREATE INDEX IF NOT EXISTS idx_storage_manifest_sha256 ON storage_manifest(sha256);
+
+CREATE TABLE IF NOT EXISTS storage_usage (
+    subfolder VARCHAR(100) NOT NULL,
+    extension VARCHAR(20) NOT NULL,
+    files_count BIGINT DEFAULT 0 NOT NULL,
+    total_size BIGINT DEFAULT 0 NOT NULL,
+    PRIMARY KEY (subfolder, extension)
+);
+
+-- Create background jobs table (procesare imagini, generări în lot)
+CREATE TABLE IF NOT EXISTS background_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    kind VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL,
+    status VARCHAR(20) DEFAULT 'pending' NOT NULL,
+    attempts INTEGER DEFAULT 0 NOT NULL,
+    result JSONB,
+    error TEXT,
+    progress JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+    started_at TIMESTAMP WITH TIME ZONE,
+    heartbeat_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    duration_ms DOUBLE PRECISION
+);
+CREATE INDEX IF NOT EXISTS idx_background_jobs_claimable ON background_jobs(created_at) WHERE status IN ('pending', 'running');
+CREATE INDEX IF NOT EXISTS idx_background_jobs_kind_status ON background_jobs(kind, status);
+
+-- Create resumable uploads table (upload în fragmente, de tip tus)
+CREATE TABLE IF NOT EXISTS resumable_uploads (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    filename VARCHAR(255) NOT NULL,
+    mime_type VARCHAR(100) NOT NULL,
+    total_size BIGINT NOT NULL,
+    status VARCHAR(20) DEFAULT 'uploading' NOT NULL,
+    storage_path VARCHAR(500),
+    sha256 VARCHAR(64),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+CREATE INDEX IF NOT EXISTS idx_resumable_uploads_expires ON resumable_uploads(expires_at);
+
+-- Create document templates table (șabloane modificate din administrare)
+CREATE TABLE IF NOT EXISTS document_templates (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) UNIQUE NOT NULL,
+    content TEXT NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE NOT NULL,
+    updated_by UUID REFERENCES admin_users(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+);
+
 -- Create form types table
 CREATE TABLE IF NOT EXISTS form_types (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -201,6 +282,24 @@ CREATE TABLE IF NOT EXISTS form_submissions (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
 );
 
+-- Create generated documents table (versiunile documentelor oficiale generate)
+CREATE TABLE IF NOT EXISTS generated_documents (
+    id SERIAL PRIMARY KEY,
+    reference_number VARCHAR(50) NOT NULL,
+    version INTEGER NOT NULL,
+    document_type VARCHAR(100) NOT NULL,
+    storage_path VARCHAR(500) UNIQUE NOT NULL,
+    file_name VARCHAR(255) NOT NULL,
+    mime_type VARCHAR(100) DEFAULT 'application/pdf' NOT NULL,
+    file_size BIGINT NOT NULL,
+    sha256 VARCHAR(64) NOT NULL,
+    submission_id UUID REFERENCES form_submissions(id) ON DELETE SET NULL,
+    generated_by UUID REFERENCES admin_users(id),
+    generated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+    CONSTRAINT uq_generated_documents_reference_version UNIQUE (reference_number, version)
+);
+CREATE INDEX IF NOT EXISTS idx_generated_documents_generated_at ON generated_documents(generated_at);
+
 -- Create attachments table
 CREATE TABLE IF NOT EXISTS attachments (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -245,7 +344,9 @@ CREATE TABLE IF NOT EXISTS page_views (
 CREATE INDEX IF NOT EXISTS idx_admin_users_email ON admin_users(email);
 CREATE INDEX IF NOT EXISTS idx_admin_users_role ON admin_users(role);
 CREATE INDEX IF NOT EXISTS idx_admin_sessions_user_id ON admin_sessions(user_id);
-CREATE INDEX IF NOT EXISTS idx_admin_sessions_access_token ON admin_sessions(access_token_hash);
+DROP INDEX IF EXISTS idx_admin_sessions_access_token;
+CREATE INDEX IF NOT EXISTS idx_admin_sessions_active_access_token ON admin_sessions(access_token_hash) WHERE is_revoked = FALSE;
+CREATE INDEX IF NOT EXISTS idx_admin_sessions_refresh_expires_at ON admin_sessions(refresh_expires_at);
 CREATE INDEX IF NOT EXISTS idx_admin_sessions_refresh_token ON admin_sessions(refresh_token_hash);
 CREATE INDEX IF NOT EXISTS idx_admin_audit_user_id ON admin_audit_log(user_id);
 CREATE INDEX IF NOT EXISTS idx_admin_audit_action ON admin_audit_log(action);
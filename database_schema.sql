@@ -398,9 +398,10 @@ CREATE TABLE admin_audit_log (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
--- Statistici vizitatori (basic analytics)
+-- Statistici vizitatori (basic analytics), partiționată lunar după view_date.
+-- Partițiile lunare (page_views_YYYY_MM) sunt create de aplicație la pornire.
 CREATE TABLE page_views (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     page_url VARCHAR(500) NOT NULL,
     page_title VARCHAR(255),
     visitor_ip INET,
@@ -408,7 +409,18 @@ CREATE TABLE page_views (
     referrer VARCHAR(500),
     session_id VARCHAR(255),
     view_date DATE NOT NULL,
-    view_time TIMESTAMP DEFAULT NOW()
+    view_time TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+    PRIMARY KEY (id, view_date)
+) PARTITION BY RANGE (view_date);
+
+-- Agregate zilnice per pagină (rapoarte de transparență)
+CREATE TABLE page_view_daily_stats (
+    view_date DATE NOT NULL,
+    page_url VARCHAR(500) NOT NULL,
+    views INTEGER DEFAULT 0 NOT NULL,
+    sampled_views INTEGER DEFAULT 0 NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+    PRIMARY KEY (view_date, page_url)
 );
 
 -- Statistici download documente